@@ -0,0 +1,99 @@
+"""
+Board のベンチマーク: ビットボード版と旧 Cell グリッド版の速度を比較する。
+
+    python -m benchmarks.bench_board [--games 200] [--seed 0]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from src.domain.board import Board
+from src.domain.player import Player
+from benchmarks.legacy_board import LegacyBoard
+
+
+def play_random_game(board_factory: Callable, rng: random.Random) -> int:
+    """ランダムな合法手で 1 局打ち切り、打った手数を返す"""
+    board = board_factory()
+    turn = Player.BLACK
+    plies = 0
+    while True:
+        moves = board.get_valid_moves(turn)
+        if not moves:
+            if not board.has_valid_move(turn.opponent()):
+                break
+            turn = turn.opponent()
+            continue
+        board.apply_move(rng.choice(moves), turn)
+        turn = turn.opponent()
+        plies += 1
+    board.count_discs()
+    return plies
+
+
+def collect_positions(games: int, seed: int) -> List[Tuple[List[List], Player]]:
+    """ランダム対局の途中局面を (盤面, 手番) のリストとして集める"""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        board = Board()
+        turn = Player.BLACK
+        while True:
+            moves = board.get_valid_moves(turn)
+            if not moves:
+                break
+            positions.append(([[cell.occupant for cell in row] for row in board.cells], turn))
+            board.apply_move(rng.choice(moves), turn)
+            turn = turn.opponent()
+    return positions
+
+
+def _load(board, state) -> None:
+    for row, values in zip(board.cells, state):
+        for cell, value in zip(row, values):
+            cell.occupant = value
+
+
+def time_valid_moves(board_factory: Callable, positions) -> float:
+    boards = []
+    for state, turn in positions:
+        board = board_factory()
+        _load(board, state)
+        boards.append((board, turn))
+    start = time.perf_counter()
+    for board, turn in boards:
+        board.get_valid_moves(turn)
+    return time.perf_counter() - start
+
+
+def time_games(board_factory: Callable, games: int, seed: int) -> Tuple[float, int]:
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    plies = sum(play_random_game(board_factory, rng) for _ in range(games))
+    return time.perf_counter() - start, plies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    positions = collect_positions(args.games, args.seed)
+    print(f'{len(positions)} positions, {args.games} random games')
+    print(f'{"":24}{"legacy":>12}{"bitboard":>12}{"speedup":>10}')
+
+    legacy = time_valid_moves(LegacyBoard, positions)
+    fast = time_valid_moves(Board, positions)
+    print(f'{"get_valid_moves [us]":24}{legacy / len(positions) * 1e6:12.1f}'
+          f'{fast / len(positions) * 1e6:12.1f}{legacy / fast:9.1f}x')
+
+    legacy, plies = time_games(LegacyBoard, args.games, args.seed)
+    fast, _ = time_games(Board, args.games, args.seed)
+    print(f'{"random games [games/s]":24}{args.games / legacy:12.1f}'
+          f'{args.games / fast:12.1f}{legacy / fast:9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Gym 形式の環境のベンチマーク: Board.cells から毎手入れ子リストの観測を作る従来のラッパー、
+OthelloEnv、SubprocVectorEnv の 1 秒あたりの step 数を比べる。
+
+    python -m benchmarks.bench_gym [--steps 20000] [--envs 16] [--workers 1,2,4]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.application.gym_env import OthelloEnv, SubprocVectorEnv
+from src.domain.game import OthelloGame
+from src.domain.position import Position
+
+
+class NestedListEnv:
+    """比較用: Board.cells を走査して観測を毎回新しい入れ子リストで作る"""
+
+    def __init__(self):
+        self.game = OthelloGame()
+
+    def _observation(self):
+        turn = self.game.current_turn
+        cells = self.game.board.cells
+        legal = set(self.game.board.get_valid_moves(turn))
+        return [[[1.0 if cell.occupant == turn else 0.0 for cell in row] for row in cells],
+                [[1.0 if cell.occupant == turn.opponent() else 0.0 for cell in row] for row in cells],
+                [[1.0 if cell.position in legal else 0.0 for cell in row] for row in cells]]
+
+    def reset(self):
+        self.game = OthelloGame()
+        return self._observation()
+
+    def step(self, action: int):
+        mover = self.game.current_turn
+        self.game.make_move(Position(action // 8, action % 8))
+        if not self.game.board.has_valid_move(self.game.current_turn):
+            self.game.pass_turn()
+        done = self.game.is_game_over()
+        reward = self.game.calculate_reward(mover) if done else 0.0
+        return self._observation(), reward, done
+
+
+def _choose(rng: np.random.Generator, mask: np.ndarray) -> int:
+    return int(rng.choice(np.flatnonzero(mask)))
+
+
+def bench_nested(steps: int) -> float:
+    rng = np.random.default_rng(0)
+    env = NestedListEnv()
+    obs = env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        mask = np.array(obs[2], dtype=bool).reshape(-1)
+        obs, _, done = env.step(_choose(rng, mask))
+        if done:
+            obs = env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_env(steps: int) -> float:
+    rng = np.random.default_rng(0)
+    env = OthelloEnv()
+    _, info = env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _, info = env.step(_choose(rng, info['action_mask']))
+        if done:
+            _, info = env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_vector(steps: int, envs: int, workers: int) -> float:
+    rng = np.random.default_rng(0)
+    with SubprocVectorEnv(envs, workers=workers) as venv:
+        _, info = venv.reset()
+        rounds = max(1, steps // envs)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            # 合法手のマスにだけ乱数を振り、最大のものを選ぶ
+            scores = rng.random(info['action_mask'].shape)
+            scores[~info['action_mask']] = -1.0
+            _, _, _, _, info = venv.step(scores.argmax(axis=1))
+        return rounds * envs / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--envs', type=int, default=16)
+    parser.add_argument('--workers', default='1,2,4')
+    args = parser.parse_args()
+
+    nested = bench_nested(args.steps)
+    print(f'{"nested-list wrapper [steps/s]":<36}{nested:>10.0f}')
+    single = bench_env(args.steps)
+    print(f'{"OthelloEnv [steps/s]":<36}{single:>10.0f}{single / nested:>8.1f}x')
+    for workers in (int(w) for w in args.workers.split(',')):
+        rate = bench_vector(args.steps, args.envs, workers)
+        print(f'{f"SubprocVectorEnv x{workers} [steps/s]":<36}{rate:>10.0f}{rate / nested:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
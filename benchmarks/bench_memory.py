@@ -0,0 +1,86 @@
+"""
+メモリのベンチマーク: 生きているゲーム 1 局あたりのバイト数と、get_valid_moves 1 回あたりの
+確保ブロック数を、旧 Cell グリッド版 (LegacyBoard) と現在の Board で比べる。
+
+    python -m benchmarks.bench_memory [--games 2000] [--calls 20000]
+
+バイト数は tracemalloc で測る。ブロック数は sys.getallocatedblocks の増分で、
+返り値のリスト (とその要素) を保持したまま数えるので、呼び出しごとに新しく作られたオブジェクトの数になる。
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from typing import Callable
+
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from benchmarks.legacy_board import LegacyBoard
+
+
+def bytes_per_object(factory: Callable, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def blocks_per_call(func: Callable, calls: int) -> float:
+    gc.collect()
+    gc.disable()
+    try:
+        results = []
+        before = sys.getallocatedblocks()
+        for _ in range(calls):
+            results.append(func())
+        after = sys.getallocatedblocks()
+    finally:
+        gc.enable()
+    # results リスト自体の伸長分を除く
+    return (after - before - 1) / calls
+
+
+def _session_game() -> OthelloGame:
+    """API のセッションと同じく、合法手を一度求めた状態のゲーム"""
+    game = OthelloGame()
+    game.board.get_valid_moves(game.current_turn)
+    return game
+
+
+def _game_with_cells() -> OthelloGame:
+    game = _session_game()
+    game.board.cells
+    return game
+
+
+def _legacy_game() -> LegacyBoard:
+    board = LegacyBoard()
+    board.get_valid_moves(Player.BLACK)
+    return board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    board = Board()
+    legacy = LegacyBoard()
+    print(f'{"bytes per live game (legacy)":<40}{bytes_per_object(_legacy_game, args.games):>10.0f}')
+    print(f'{"bytes per live game":<40}{bytes_per_object(_session_game, args.games):>10.0f}')
+    print(f'{"bytes per live game (cells view)":<40}'
+          f'{bytes_per_object(_game_with_cells, args.games):>10.0f}')
+    print(f'{"blocks per get_valid_moves (legacy)":<40}'
+          f'{blocks_per_call(lambda: legacy.get_valid_moves(Player.BLACK), args.calls):>10.2f}')
+    print(f'{"blocks per get_valid_moves":<40}'
+          f'{blocks_per_call(lambda: board.get_valid_moves(Player.BLACK), args.calls):>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
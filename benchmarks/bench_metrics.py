@@ -0,0 +1,60 @@
+"""
+計測 (src.application.metrics) のオーバーヘッドのベンチマーク。
+無効時の stages() と lap() 4 回のコストと、/move の処理 (game_service.process_move) 1 回あたりの時間を
+計測の無効・有効それぞれで比べる。
+
+    python -m benchmarks.bench_metrics [--requests 20000]
+"""
+import argparse
+import time
+
+from src.application import game_service, metrics
+
+
+def time_process_move(data: dict, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        game_service.process_move(dict(data))
+    return (time.perf_counter() - start) / requests
+
+
+def time_disabled_stages(iterations: int) -> float:
+    """process_move と同じく stages() を 1 回、lap() を 4 回呼ぶコスト"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        stages = metrics.stages()
+        stages.lap('load')
+        stages.lap('make_move')
+        stages.lap('encode')
+        stages.lap('game_over')
+    with_timer = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    empty = time.perf_counter() - start
+    return (with_timer - empty) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    data = dict(game_service.get_initial_state(), row=2, col=3)
+    metrics.enable(False)
+    stage_cost = time_disabled_stages(args.requests * 10)
+    disabled = time_process_move(data, args.requests)
+    metrics.enable(True)
+    enabled = time_process_move(data, args.requests)
+    metrics.enable(False)
+    metrics.reset()
+
+    print(f'{"disabled stage timing [ns]":<32}{stage_cost * 1e9:>10.0f}')
+    print(f'{"process_move, disabled [us]":<32}{disabled * 1e6:>10.1f}')
+    print(f'{"process_move, enabled [us]":<32}{enabled * 1e6:>10.1f}')
+    print(f'{"disabled overhead [%]":<32}{stage_cost / disabled * 100:>10.2f}')
+    print(f'{"enabled overhead [%]":<32}{(enabled - disabled) / disabled * 100:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
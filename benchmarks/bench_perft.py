@@ -0,0 +1,89 @@
+"""
+perft ベンチマーク: 指定深さまでの全局面を数え、make/unmake による探索速度 (nodes/s) を測る。
+比較用に、ノードごとに盤面を deepcopy する従来のやり方も計測する。
+--engine-depth を指定すると、src.engine.perft (ビットボード + 置換表 + プロセスプール) も計測する。
+
+    python -m benchmarks.bench_perft [--depth 6] [--copy-depth 5] [--engine-depth 9 --workers 4]
+
+パスも 1 手として数え、終局局面はその時点で 1 葉とする。
+"""
+import argparse
+import copy
+import time
+
+from src.domain.game import OthelloGame
+from src.engine import perft as engine_perft
+
+
+def perft(game: OthelloGame, depth: int) -> int:
+    """1 つの OthelloGame 上で make_move / unmake_move を繰り返して葉を数える"""
+    if depth == 0:
+        return 1
+    moves = game.board.get_valid_moves(game.current_turn)
+    if not moves:
+        if not game.board.has_valid_move(game.current_turn.opponent()):
+            return 1
+        game.pass_turn()
+        nodes = perft(game, depth - 1)
+        game.unmake_move()
+        return nodes
+    nodes = 0
+    for move in moves:
+        game.make_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def perft_copy(game: OthelloGame, depth: int) -> int:
+    """比較用: 子ノードごとに OthelloGame を deepcopy する"""
+    if depth == 0:
+        return 1
+    moves = game.board.get_valid_moves(game.current_turn)
+    if not moves:
+        if not game.board.has_valid_move(game.current_turn.opponent()):
+            return 1
+        child = copy.deepcopy(game)
+        child.current_turn = child.current_turn.opponent()
+        return perft_copy(child, depth - 1)
+    nodes = 0
+    for move in moves:
+        child = copy.deepcopy(game)
+        child.make_move(move)
+        nodes += perft_copy(child, depth - 1)
+    return nodes
+
+
+def _measure(func, depth: int):
+    start = time.perf_counter()
+    nodes = func(OthelloGame(), depth)
+    return nodes, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--copy-depth', type=int, default=5,
+                        help='deepcopy 版を計測する深さ (0 で省略)')
+    parser.add_argument('--engine-depth', type=int, default=0,
+                        help='src.engine.perft を計測する深さ (0 で省略)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='src.engine.perft のワーカー数')
+    args = parser.parse_args()
+
+    for depth in range(1, args.depth + 1):
+        nodes, elapsed = _measure(perft, depth)
+        print(f'make/unmake depth {depth}: {nodes:>10} nodes '
+              f'{elapsed:8.3f}s {nodes / elapsed:12.0f} nodes/s')
+    if args.copy_depth:
+        nodes, elapsed = _measure(perft_copy, args.copy_depth)
+        print(f'deepcopy    depth {args.copy_depth}: {nodes:>10} nodes '
+              f'{elapsed:8.3f}s {nodes / elapsed:12.0f} nodes/s')
+    if args.engine_depth:
+        result = engine_perft.perft(OthelloGame(), args.engine_depth, workers=args.workers)
+        print(f'engine      depth {args.engine_depth}: {result.nodes:>10} nodes '
+              f'{result.elapsed:8.3f}s {result.nodes_per_second:12.0f} nodes/s')
+
+
+if __name__ == '__main__':
+    main()
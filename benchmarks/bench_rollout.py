@@ -0,0 +1,50 @@
+"""
+rollout のベンチマーク: OthelloGame の API で 1 手ずつ打つ素朴なループと、
+src.application.rollout.rollout の 1 秒あたりのプレイアウト数を比べる。
+
+    python -m benchmarks.bench_rollout [--playouts 20000] [--naive 300] [--workers 1]
+"""
+import argparse
+import random
+import time
+
+from src.application.rollout import rollout
+from src.domain.game import OthelloGame
+
+
+def naive_playouts(game_factory, n: int, seed: int) -> None:
+    """get_valid_moves / make_move / is_game_over とパスの手動処理による従来のやり方"""
+    rng = random.Random(seed)
+    for _ in range(n):
+        game = game_factory()
+        while not game.is_game_over():
+            moves = game.board.get_valid_moves(game.current_turn)
+            if not moves:
+                game.pass_turn()
+                continue
+            game.make_move(rng.choice(moves))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--playouts', type=int, default=20000)
+    parser.add_argument('--naive', type=int, default=300, help='素朴なループで打つ局数')
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    naive_playouts(OthelloGame, args.naive, seed=0)
+    naive = args.naive / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    result = rollout(OthelloGame(), args.playouts, seed=0, workers=args.workers)
+    fast = args.playouts / (time.perf_counter() - start)
+
+    print(f'{"naive loop [playouts/s]":<28}{naive:>12.0f}')
+    print(f'{"rollout [playouts/s]":<28}{fast:>12.0f}{fast / naive:>9.1f}x')
+    print(f'black: {result.wins} wins, {result.draws} draws, {result.losses} losses, '
+          f'mean disc diff {result.mean_disc_diff:+.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+ベンチマーク用の固定局面集。
+
+ランダム対局から石数で序盤・中盤・終盤に分けて局面を集め、benchmarks/data/positions.json に
+'string' 形式 (codec.board_to_string) で保存する。ベンチマークはこのファイルを読むだけなので、
+実装が変わっても同じ局面で比較できる。
+
+    python -m benchmarks.corpus [--per-phase 100] [--seed 0]
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+from src.application import codec
+from src.domain.board import Board
+from src.domain.player import Player
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'positions.json')
+
+# 石数による区分 (両端を含む)
+PHASES = {
+    'opening': (4, 20),
+    'midgame': (21, 44),
+    'endgame': (45, 64),
+}
+
+
+def _phase(discs: int) -> str:
+    for name, (low, high) in PHASES.items():
+        if low <= discs <= high:
+            return name
+    raise ValueError(discs)
+
+
+def generate(per_phase: int, seed: int) -> Dict[str, List[dict]]:
+    """手番側に合法手がある局面を、区分ごとに per_phase 個ずつ集める"""
+    rng = random.Random(seed)
+    phases: Dict[str, List[dict]] = {name: [] for name in PHASES}
+    while any(len(positions) < per_phase for positions in phases.values()):
+        board = Board()
+        turn = Player.BLACK
+        while True:
+            moves = board.get_valid_moves(turn)
+            if not moves:
+                if not board.has_valid_move(turn.opponent()):
+                    break
+                turn = turn.opponent()
+                continue
+            bucket = phases[_phase(sum(board.count_discs()))]
+            # 1 局から同じ区分の局面ばかり取らないよう間引く
+            if len(bucket) < per_phase and rng.random() < 0.25:
+                bucket.append({'board': codec.board_to_string(board), 'turn': turn.value})
+            board.apply_move(rng.choice(moves), turn)
+            turn = turn.opponent()
+    return phases
+
+
+def load(path: str = CORPUS_PATH) -> Dict[str, List[Tuple[Board, Player]]]:
+    """区分ごとの (盤面, 手番) のリスト"""
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        name: [(codec.board_from_string(p['board'], data['size']),
+                Player.BLACK if p['turn'] == 'B' else Player.WHITE) for p in positions]
+        for name, positions in data['phases'].items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--per-phase', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    data = {'seed': args.seed, 'size': 8, 'phases': generate(args.per_phase, args.seed)}
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        # 1 局面 1 行にして差分を読みやすくする
+        f.write(f'{{"seed": {args.seed}, "size": 8, "phases": {{\n')
+        for i, (name, positions) in enumerate(data['phases'].items()):
+            f.write(f'  "{name}": [\n')
+            f.write(',\n'.join('    ' + json.dumps(p) for p in positions))
+            f.write('\n  ]' + (',' if i < len(data['phases']) - 1 else '') + '\n')
+        f.write('}}\n')
+    print(f'{args.output}: ' + ', '.join(f'{name} {len(positions)}'
+                                         for name, positions in data['phases'].items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+本番サーバー (src.infrastructure.production) に /move の負荷をかけ、
+ワーカー数ごとのスループット (requests/s) とレイテンシ (p50 / p99) を表示する。
+
+    python -m benchmarks.load_test [--workers 1 4 16] [--clients 32] [--duration 5]
+
+クライアントは複数プロセス x 複数スレッドで、keep-alive の接続を使い回す。
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import List
+
+from src.application import game_service
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(port: int, timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('サーバーが起動しませんでした')
+
+
+def _client_thread(port: int, body: bytes, deadline: float, latencies: List[float]) -> None:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        conn.request('POST', '/move', body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def _client_process(args) -> List[float]:
+    port, threads, duration, body = args
+    deadline = time.perf_counter() + duration
+    latencies: List[float] = []
+    workers = [threading.Thread(target=_client_thread, args=(port, body, deadline, latencies))
+               for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def run_load(workers: int, threads: int, clients: int, duration: float) -> dict:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'src.infrastructure.production', '--port', str(port),
+         '--workers', str(workers), '--threads', str(threads)],
+        stderr=subprocess.DEVNULL,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        _wait_until_healthy(port)
+        body = json.dumps(dict(game_service.get_initial_state(), row=2, col=3)).encode()
+        processes = min(clients, os.cpu_count() or 1)
+        per_process = max(1, clients // processes)
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_client_process, [(port, per_process, duration, body)] * processes)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    latencies = sorted(latency for result in results for latency in result)
+    return {
+        'workers': workers,
+        'requests': len(latencies),
+        'rps': len(latencies) / duration,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--threads', type=int, default=4, help='ワーカーごとのスレッド数')
+    parser.add_argument('--clients', type=int, default=32, help='同時接続数')
+    parser.add_argument('--duration', type=float, default=5.0, help='計測秒数')
+    args = parser.parse_args()
+
+    print(f'{"workers":>8}{"requests":>10}{"req/s":>10}{"p50 [ms]":>10}{"p99 [ms]":>10}')
+    for workers in args.workers:
+        result = run_load(workers, args.threads, args.clients, args.duration)
+        print(f'{result["workers"]:>8}{result["requests"]:>10}{result["rps"]:>10.0f}'
+              f'{result["p50_ms"]:>10.2f}{result["p99_ms"]:>10.2f}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+ドメイン層・サービス層・HTTP 層のベンチマークをまとめて実行し、結果を JSON で保存・比較する。
+
+    python -m benchmarks.suite run [--output benchmarks/results/latest.json] [--quick] [--only domain,http]
+    python -m benchmarks.suite compare [baseline.json] current.json [--threshold 0.10]
+
+局面は benchmarks/data/positions.json の固定局面集 (序盤・中盤・終盤) を使う。
+計測は repeat 回繰り返した最良値を採る。compare は基準より threshold を超えて悪化した項目と
+perft のノード数の不一致を表示し、1 つでもあれば終了コード 1 を返す。
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from webtest import TestApp
+
+from src.application import codec, game_service
+from src.application.rollout import rollout
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from benchmarks import corpus
+from benchmarks.bench_board import play_random_game
+from benchmarks.bench_perft import perft
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+BASELINE_PATH = os.path.join(RESULTS_DIR, 'baseline.json')
+LATEST_PATH = os.path.join(RESULTS_DIR, 'latest.json')
+
+# perft の既知のノード数 (初期局面から)
+PERFT_NODES = {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092}
+
+LOWER = 'lower'    # 小さいほど良い (時間)
+HIGHER = 'higher'  # 大きいほど良い (スループット)
+EQUAL = 'equal'    # 一致しなければならない (ノード数)
+
+
+def _result(value: float, unit: str, better: str) -> dict:
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def _best_of(repeat: int, setup: Callable, run: Callable) -> float:
+    """setup() の結果を run に渡して計測し、repeat 回の最短時間 (秒) を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        items = setup()
+        start = time.perf_counter()
+        run(items)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_domain(repeat: int) -> Dict[str, dict]:
+    """局面の区分ごとの get_valid_moves / apply_move / is_game_over と盤面の変換"""
+    results = {}
+    phases = corpus.load()
+    for phase, positions in phases.items():
+        states = [(codec.board_to_string(board), turn) for board, turn in positions]
+
+        def fresh_boards():
+            # 合法手のキャッシュが効かないよう、毎回作り直す
+            return [(codec.board_from_string(text), turn) for text, turn in states]
+
+        def valid_moves(items):
+            for board, turn in items:
+                board.get_valid_moves(turn)
+
+        def moves_setup():
+            items = fresh_boards()
+            return [(board, board.get_valid_moves(turn)[0], turn) for board, turn in items]
+
+        def apply_and_undo(items):
+            for board, move, turn in items:
+                board.undo_move(board.apply_move_undoable(move, turn))
+
+        def games_setup():
+            return [OthelloGame(board=board, current_turn=turn) for board, turn in fresh_boards()]
+
+        def game_over(items):
+            for game in items:
+                game.is_game_over()
+
+        n = len(positions)
+        results[f'domain.{phase}.get_valid_moves'] = _result(
+            _best_of(repeat, fresh_boards, valid_moves) / n * 1e6, 'us', LOWER)
+        results[f'domain.{phase}.apply_move'] = _result(
+            _best_of(repeat, moves_setup, apply_and_undo) / n * 1e6, 'us', LOWER)
+        results[f'domain.{phase}.is_game_over'] = _result(
+            _best_of(repeat, games_setup, game_over) / n * 1e6, 'us', LOWER)
+
+    all_boards = [board for positions in phases.values() for board, _ in positions]
+    lists = [codec.board_to_list(board) for board in all_boards]
+
+    def from_state(items):
+        for state in items:
+            OthelloGame.from_state(state, 'B')
+
+    def serialize(items):
+        for board in items:
+            game_service.serialize_board(board)
+
+    results['domain.from_state'] = _result(
+        _best_of(repeat, lambda: lists, from_state) / len(lists) * 1e6, 'us', LOWER)
+    results['domain.serialize_board'] = _result(
+        _best_of(repeat, lambda: all_boards, serialize) / len(all_boards) * 1e6, 'us', LOWER)
+    return results
+
+
+def bench_playouts(repeat: int, games: int) -> Dict[str, dict]:
+    def play(rng):
+        for _ in range(games):
+            play_random_game(Board, rng)
+
+    elapsed = _best_of(repeat, lambda: random.Random(0), play)
+    playouts = games * 20
+    rollout_elapsed = _best_of(repeat, lambda: OthelloGame(),
+                               lambda game: rollout(game, playouts, seed=0))
+    return {
+        'playout.random_games': _result(games / elapsed, 'games/s', HIGHER),
+        'playout.rollout': _result(playouts / rollout_elapsed, 'games/s', HIGHER),
+    }
+
+
+def bench_perft(depth: int) -> Dict[str, dict]:
+    start = time.perf_counter()
+    nodes = perft(OthelloGame(), depth)
+    elapsed = time.perf_counter() - start
+    results = {
+        f'perft.depth{depth}.nodes': _result(nodes, 'nodes', EQUAL),
+        f'perft.depth{depth}.speed': _result(nodes / elapsed, 'nodes/s', HIGHER),
+    }
+    if depth in PERFT_NODES and nodes != PERFT_NODES[depth]:
+        raise AssertionError(f'perft({depth}) = {nodes}, 期待値 {PERFT_NODES[depth]}')
+    return results
+
+
+def bench_http(repeat: int, requests: int) -> Dict[str, dict]:
+    """WebTest で Bottle アプリを直接呼び、ソケットを使わない /move のスループットを測る"""
+    from src.infrastructure.server import app
+
+    client = TestApp(app)
+    body = dict(game_service.get_initial_state(), row=2, col=3)
+    packed = dict(game_service.get_initial_state('packed'), format='packed', row=2, col=3)
+
+    def post(payload):
+        def run(_):
+            for _ in range(requests):
+                client.post_json('/move', payload)
+        return run
+
+    return {
+        'http.move_list': _result(
+            requests / _best_of(repeat, lambda: None, post(body)), 'req/s', HIGHER),
+        'http.move_packed': _result(
+            requests / _best_of(repeat, lambda: None, post(packed)), 'req/s', HIGHER),
+    }
+
+
+def run_suite(only: Optional[List[str]] = None, quick: bool = False) -> dict:
+    repeat = 3 if quick else 7
+    groups = {
+        'domain': lambda: bench_domain(repeat),
+        'playout': lambda: bench_playouts(repeat, 20 if quick else 100),
+        'perft': lambda: bench_perft(4 if quick else 6),
+        'http': lambda: bench_http(repeat, 100 if quick else 500),
+    }
+    results = {}
+    for name, bench in groups.items():
+        if only and name not in only:
+            continue
+        results.update(bench())
+    return {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """
+    共通の項目ごとに変化率を求める。悪化が threshold を超えたら 'regression'、
+    EQUAL の項目が一致しなければ 'mismatch' とする。
+    """
+    rows = []
+    for name, base in sorted(baseline['results'].items()):
+        cur = current['results'].get(name)
+        if cur is None:
+            continue
+        before, after = base['value'], cur['value']
+        change = (after - before) / before if before else 0.0
+        if base['better'] == EQUAL:
+            status = 'ok' if after == before else 'mismatch'
+        else:
+            worse = change > threshold if base['better'] == LOWER else change < -threshold
+            status = 'regression' if worse else 'ok'
+        rows.append({'name': name, 'baseline': before, 'current': after,
+                     'unit': base['unit'], 'change': change, 'status': status})
+    return rows
+
+
+def _save(data: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='ベンチマークを実行して JSON に保存する')
+    run_parser.add_argument('--output', default=LATEST_PATH)
+    run_parser.add_argument('--quick', action='store_true', help='反復回数を減らして短時間で回す')
+    run_parser.add_argument('--only', help='domain,playout,perft,http から選ぶ (カンマ区切り)')
+    compare_parser = commands.add_parser('compare', help='基準の結果と比べて悪化を検出する')
+    compare_parser.add_argument('files', nargs='+', metavar='FILE',
+                                help='[baseline.json] current.json (baseline の既定は results/baseline.json)')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        data = run_suite(args.only.split(',') if args.only else None, quick=args.quick)
+        for name, result in sorted(data['results'].items()):
+            print(f'{name:<36}{result["value"]:>14.2f} {result["unit"]}')
+        _save(data, args.output)
+        print(f'saved: {args.output}')
+        return 0
+
+    baseline_path, current_path = ([BASELINE_PATH] + args.files)[-2:]
+    missing = [path for path in (baseline_path, current_path) if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f'not found: {path}', file=sys.stderr)
+        if baseline_path in missing:
+            print(f'基準の結果がありません。基準にしたい版で\n'
+                  f'    python -m benchmarks.suite run --output {baseline_path}\n'
+                  f'を実行して作成してください (計測値はマシンに依存するのでリポジトリには含めない)',
+                  file=sys.stderr)
+        return 2
+    rows = compare(_load(baseline_path), _load(current_path), args.threshold)
+    failed = [row for row in rows if row['status'] != 'ok']
+    print(f'{"":<36}{"baseline":>14}{"current":>14}{"change":>9}')
+    for row in rows:
+        mark = '' if row['status'] == 'ok' else f'  <- {row["status"]}'
+        print(f'{row["name"]:<36}{row["baseline"]:>14.2f}{row["current"]:>14.2f}'
+              f'{row["change"] * 100:>8.1f}%{mark}')
+    print(f'{len(failed)} regression(s) beyond {args.threshold:.0%}' if failed else 'no regressions')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
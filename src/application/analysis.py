@@ -0,0 +1,79 @@
+"""
+局面の特徴量。
+
+analyze(board, turn) は手番側 (turn) から見た着手可能数・フロンティア石・確定石・角と X の占有・
+石数・空きマスの偶奇を、ビットボードの演算だけで 1 度に求める。
+analyze_batch は多数の局面を列ごとの整数リスト (FEATURES の順) にまとめ、/analyze の応答にする。
+特徴量はどれも盤面の回転・鏡映で変わらないので、cache (PositionCache) を渡すと
+対称な局面どうしで結果を共有する。
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.domain import bitboard
+from src.domain.board import Board
+from src.domain.geometry import geometry
+from src.domain.player import Player
+
+if TYPE_CHECKING:
+    from src.application.position_cache import PositionCache
+
+
+class Analysis(NamedTuple):
+    mobility: int
+    opponent_mobility: int
+    frontier: int               # 空きマスに接している石の数
+    opponent_frontier: int
+    stable: int                 # 確定石の数 (bitboard.stable_discs)
+    opponent_stable: int
+    corners: int
+    opponent_corners: int
+    x_squares: int
+    opponent_x_squares: int
+    discs: int
+    opponent_discs: int
+    empties: int
+    parity: int                 # 空きマス数の偶奇 (奇数なら 1)
+
+
+FEATURES: Tuple[str, ...] = Analysis._fields
+
+
+def analyze(board: Board, turn: Player) -> Analysis:
+    size = board.size
+    g = geometry(size)
+    popcount = bitboard.popcount
+    if turn == Player.BLACK:
+        own, opp = board.black, board.white
+    else:
+        own, opp = board.white, board.black
+    empty = g.full & ~(own | opp)
+    near_empty = bitboard.dilate(empty, size)
+    empties = popcount(empty)
+    return Analysis(
+        mobility=popcount(board.legal_moves_mask(turn)),
+        opponent_mobility=popcount(board.legal_moves_mask(turn.opponent())),
+        frontier=popcount(own & near_empty),
+        opponent_frontier=popcount(opp & near_empty),
+        stable=popcount(bitboard.stable_discs(own, opp, size)),
+        opponent_stable=popcount(bitboard.stable_discs(opp, own, size)),
+        corners=popcount(own & g.corners),
+        opponent_corners=popcount(opp & g.corners),
+        x_squares=popcount(own & g.x_squares),
+        opponent_x_squares=popcount(opp & g.x_squares),
+        discs=popcount(own),
+        opponent_discs=popcount(opp),
+        empties=empties,
+        parity=empties & 1,
+    )
+
+
+def analyze_batch(positions: Iterable[Tuple[Board, Player]],
+                  cache: Optional['PositionCache'] = None) -> Dict[str, List[int]]:
+    """局面ごとの特徴量を、特徴量名 -> 局面順の値のリスト の列形式で返す"""
+    columns: List[List[int]] = [[] for _ in FEATURES]
+    appenders = [column.append for column in columns]
+    for board, turn in positions:
+        features = analyze(board, turn) if cache is None else cache.evaluate(analyze, board, turn)
+        for append, value in zip(appenders, features):
+            append(value)
+    return dict(zip(FEATURES, columns))
@@ -0,0 +1,231 @@
+"""
+N 局を同時に進めるベクトル化環境。
+
+各局の盤面は黒・白それぞれ uint64 のビットボードとして NumPy 配列に保持し、
+合法手生成・反転・パス・終局判定・報酬計算をバッチ全体に対してまとめて行う。
+1 局ごとの挙動は OthelloGame.make_move / is_game_over / get_winner /
+calculate_reward と一致する (合法手がない側は自動でパスする)。
+"""
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.geometry import geometry
+from src.domain.player import Player
+
+# 手番の表現: 0 = 黒, 1 = 白
+BLACK = 0
+WHITE = 1
+
+
+class BatchStepResult(NamedTuple):
+    rewards: np.ndarray   # (N,) 着手した側から見た報酬。終局した局のみ非 0
+    dones: np.ndarray     # (N,) 終局しているか
+    valid: np.ndarray     # (N,) 着手が受理されたか
+    passed: np.ndarray    # (N,) 着手後に相手がパスしたか
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    as_bytes = values.astype('<u8').view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1).sum(axis=1, dtype=np.int64)
+
+
+class BatchOthelloEnv:
+    def __init__(self, num_envs: int, size: int = 8):
+        if size * size > 64:
+            raise ValueError('BatchOthelloEnv は 64 マス以下の盤面のみ対応しています')
+        self.num_envs = num_envs
+        self.size = size
+        self.num_squares = size * size
+        g = geometry(size)
+        self._full = np.uint64(g.full)
+        self._shifts = [
+            (amount > 0, np.uint64(abs(amount)), np.uint64(mask))
+            for amount, mask in g.shifts
+        ]
+        initial = Board(size=size)
+        self._initial_black = np.uint64(initial.black)
+        self._initial_white = np.uint64(initial.white)
+        self.black = np.empty(num_envs, dtype=np.uint64)
+        self.white = np.empty(num_envs, dtype=np.uint64)
+        self.turn = np.empty(num_envs, dtype=np.int8)
+        self.dones = np.empty(num_envs, dtype=bool)
+        self.reset()
+
+    @classmethod
+    def from_games(cls, games: Sequence[OthelloGame]) -> 'BatchOthelloEnv':
+        """
+        OthelloGame の列から環境を作る。全局の盤面サイズは揃っている必要がある。
+        手番側に合法手がなく相手にはある局は、step と同じく手番を相手に渡した状態にする。
+        """
+        env = cls(len(games), size=games[0].board.size)
+        for i, game in enumerate(games):
+            env.black[i] = game.board.black
+            env.white[i] = game.board.white
+            env.turn[i] = BLACK if game.current_turn == Player.BLACK else WHITE
+            env.dones[i] = game.is_game_over()
+        env._auto_pass()
+        return env
+
+    def reset(self, indices: Optional[np.ndarray] = None) -> None:
+        """全局、または indices で指定した局を初期局面に戻す"""
+        if indices is None:
+            indices = slice(None)
+        self.black[indices] = self._initial_black
+        self.white[indices] = self._initial_white
+        self.turn[indices] = BLACK
+        self.dones[indices] = False
+
+    def _shift(self, values: np.ndarray, left: bool, amount: np.uint64) -> np.ndarray:
+        return np.left_shift(values, amount) if left else np.right_shift(values, amount)
+
+    def _own_and_opponent(self):
+        white_to_move = self.turn == WHITE
+        own = np.where(white_to_move, self.white, self.black)
+        opp = np.where(white_to_move, self.black, self.white)
+        return own, opp
+
+    def _legal_bits(self, own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+        empty = ~(own | opp) & self._full
+        moves = np.zeros_like(own)
+        for left, amount, mask in self._shifts:
+            om = opp & mask
+            t = self._shift(own, left, amount) & om
+            for _ in range(self.size - 3):
+                t |= self._shift(t, left, amount) & om
+            moves |= self._shift(t, left, amount) & mask
+        return moves & empty
+
+    def _flip_bits(self, move: np.ndarray, own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+        flipped = np.zeros_like(own)
+        zero = np.uint64(0)
+        for left, amount, mask in self._shifts:
+            om = opp & mask
+            run = self._shift(move, left, amount) & om
+            for _ in range(self.size - 3):
+                run |= self._shift(run, left, amount) & om
+            bounded = (self._shift(run, left, amount) & mask & own) != 0
+            flipped |= np.where(bounded, run, zero)
+        return flipped
+
+    def _to_mask(self, bits: np.ndarray) -> np.ndarray:
+        as_bytes = bits.astype('<u8').view(np.uint8).reshape(-1, 8)
+        unpacked = np.unpackbits(as_bytes, axis=1, bitorder='little')
+        return unpacked[:, :self.num_squares].astype(bool)
+
+    def _auto_pass(self) -> np.ndarray:
+        """
+        OthelloGame.step と同じ規則で、手番側に合法手がなく相手にはある局の手番を相手に渡し、
+        双方に合法手がない局を終局にする。パスした局を返す。
+        """
+        own, opp = self._own_and_opponent()
+        stuck = (self._legal_bits(own, opp) == 0) & ~self.dones
+        other = self._legal_bits(opp, own)
+        passed = stuck & (other != 0)
+        self.dones = self.dones | (stuck & (other == 0))
+        self.turn = np.where(passed, 1 - self.turn, self.turn).astype(np.int8)
+        return passed
+
+    def legal_moves_mask(self) -> np.ndarray:
+        """(N, size*size) の bool 配列。終局済みの局はすべて False"""
+        own, opp = self._own_and_opponent()
+        bits = np.where(self.dones, np.uint64(0), self._legal_bits(own, opp))
+        return self._to_mask(bits)
+
+    def disc_counts(self) -> np.ndarray:
+        """(N, 2) の配列で (黒, 白) の石数を返す"""
+        return np.stack([_popcount(self.black), _popcount(self.white)], axis=1)
+
+    def winners(self) -> np.ndarray:
+        """get_winner 相当。黒勝ち 1、白勝ち -1、引き分け 0"""
+        counts = self.disc_counts()
+        return np.sign(counts[:, 0] - counts[:, 1]).astype(np.int8)
+
+    def step(self, actions: np.ndarray) -> BatchStepResult:
+        """
+        各局の手番側が actions[i] (row * size + col) に着手する。
+        終局済みの局と不正な手は盤面を変更せず valid=False を返す。
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        own, opp = self._own_and_opponent()
+        legal = self._legal_bits(own, opp)
+
+        in_range = (actions >= 0) & (actions < self.num_squares) & ~self.dones
+        safe = np.where(in_range, actions, 0).astype(np.uint64)
+        move = np.left_shift(np.uint64(1), safe)
+        valid = in_range & ((legal & move) != 0)
+        move = np.where(valid, move, np.uint64(0))
+
+        flipped = self._flip_bits(move, own, opp)
+        own = own | move | flipped
+        opp = opp & ~flipped
+        mover = self.turn.copy()
+        white_moved = mover == WHITE
+        self.black = np.where(valid, np.where(white_moved, opp, own), self.black)
+        self.white = np.where(valid, np.where(white_moved, own, opp), self.white)
+
+        # 着手した局は手番を交代し、相手に合法手がなければパスして手番を戻す
+        self.turn = np.where(valid, 1 - mover, mover).astype(np.int8)
+        passed = self._auto_pass()
+        finished = valid & self.dones
+
+        # calculate_reward 相当: 着手した側から見た勝敗
+        winners = self.winners()
+        mover_sign = np.where(white_moved, -1, 1)
+        rewards = np.where(finished, winners * mover_sign, 0).astype(np.float32)
+        return BatchStepResult(rewards, self.dones.copy(), valid, passed)
+
+    def play_random(self, rng: np.random.Generator) -> None:
+        """
+        終局していない全局を、手番側が一様ランダムな合法手を打つ形で終局まで進める。
+        合法手がない側はパスする。1 手ごとの合法手生成と反転はそれぞれ全局まとめて 1 回で済ませ、
+        相手側の合法手は手番側に合法手がない局があるときだけ求める。
+        """
+        own, opp = self._own_and_opponent()
+        white_to_move = self.turn == WHITE
+        dones = self.dones.copy()
+        legal = self._legal_bits(own, opp)
+        zero = np.uint64(0)
+        one = np.uint64(1)
+        while True:
+            stuck = (legal == 0) & ~dones
+            if stuck.any():
+                other = self._legal_bits(opp, own)
+                dones |= stuck & (other == 0)
+                passing = stuck & (other != 0)
+                own, opp = np.where(passing, opp, own), np.where(passing, own, opp)
+                white_to_move ^= passing
+                legal = np.where(passing, other, legal)
+            active = ~dones
+            if not active.any():
+                break
+            # 合法手のマスにだけ乱数を振り、最大のものを選ぶ (合法手の中で一様)
+            mask = self._to_mask(np.where(active, legal, zero))
+            scores = rng.random(mask.shape)
+            scores[~mask] = -1.0
+            actions = scores.argmax(axis=1).astype(np.uint64)
+            move = np.where(active, np.left_shift(one, actions), zero)
+            flipped = self._flip_bits(move, own, opp)
+            # 着手した局は手番を交代する
+            own, opp = (np.where(active, opp & ~flipped, own),
+                        np.where(active, own | move | flipped, opp))
+            white_to_move ^= active
+            legal = self._legal_bits(own, opp)
+        self.black = np.where(white_to_move, opp, own)
+        self.white = np.where(white_to_move, own, opp)
+        self.turn = np.where(white_to_move, WHITE, BLACK).astype(np.int8)
+        self.dones = dones
+
+    def to_game(self, index: int) -> OthelloGame:
+        """index 番目の局を OthelloGame として取り出す"""
+        board = Board(size=self.size)
+        board.set_bitboards(int(self.black[index]), int(self.white[index]))
+        turn = Player.BLACK if self.turn[index] == BLACK else Player.WHITE
+        return OthelloGame(board=board, current_turn=turn)
+
+    def to_games(self) -> List[OthelloGame]:
+        return [self.to_game(i) for i in range(self.num_envs)]
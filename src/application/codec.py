@@ -0,0 +1,172 @@
+"""
+盤面のワイヤーフォーマット。
+
+- 'list'   : 従来の入れ子リスト ("B" / "W" / None)。既定の形式
+- 'string' : 行優先の size*size 文字 ("B" / "W" / ".")
+- 'packed' : 黒・白のビットボードをそれぞれ (size*size+7)//8 バイトのリトルエンディアンで
+             連結したものを base64 にした文字列 (8x8 なら 16 バイト)
+- 'bytes'  : 'packed' の base64 前の生バイト列 (application/octet-stream 用)
+"""
+import base64
+from typing import Union
+
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+
+FORMATS = ('list', 'string', 'packed', 'bytes')
+# リクエストで受け付ける盤面サイズ (偶数のみ)。盤面サイズごとの表を作るので上限を設ける
+MIN_SIZE = 4
+MAX_SIZE = 16
+
+
+class CodecError(ValueError):
+    pass
+
+
+def check_size(size) -> int:
+    """リクエストの盤面サイズを検証して返す。範囲外・奇数・整数以外なら CodecError"""
+    if (isinstance(size, bool) or not isinstance(size, int) or size % 2
+            or not MIN_SIZE <= size <= MAX_SIZE):
+        raise CodecError(f'盤面サイズは {MIN_SIZE} 以上 {MAX_SIZE} 以下の偶数である必要があります: {size!r}')
+    return size
+
+
+def _bitboard_bytes(size: int) -> int:
+    return (size * size + 7) // 8
+
+
+def board_to_list(board: Board) -> list:
+    return [[None if c == '.' else c for c in row]
+            for row in _rows(board_to_string(board), board.size)]
+
+
+def board_to_string(board: Board) -> str:
+    chars = ['.'] * (board.size * board.size)
+    black, white = board.black, board.white
+    while black:
+        low = black & -black
+        chars[low.bit_length() - 1] = 'B'
+        black ^= low
+    while white:
+        low = white & -white
+        chars[low.bit_length() - 1] = 'W'
+        white ^= low
+    return ''.join(chars)
+
+
+def board_from_string(text: str, size: int = 8) -> Board:
+    if not isinstance(text, str) or len(text) != size * size:
+        raise CodecError(f'盤面文字列の長さが {size * size} ではありません')
+    if text.count('B') + text.count('W') + text.count('.') != len(text):
+        raise CodecError('盤面文字列に不正な文字が含まれています')
+    # 文字列を 2 進数とみなして一度に変換する (ビット 0 が先頭の文字)
+    reversed_text = text[::-1]
+    black = int(reversed_text.translate(_BLACK_TABLE), 2)
+    white = int(reversed_text.translate(_WHITE_TABLE), 2)
+    board = Board(size=size)
+    board.set_bitboards(black, white)
+    return board
+
+
+_BLACK_TABLE = str.maketrans({'B': '1', 'W': '0', '.': '0'})
+_WHITE_TABLE = str.maketrans({'B': '0', 'W': '1', '.': '0'})
+
+
+def pack_board(board: Board) -> bytes:
+    length = _bitboard_bytes(board.size)
+    return board.black.to_bytes(length, 'little') + board.white.to_bytes(length, 'little')
+
+
+def unpack_board(data: bytes, size: int = 8) -> Board:
+    length = _bitboard_bytes(size)
+    if len(data) != 2 * length:
+        raise CodecError(f'パックされた盤面は {2 * length} バイトである必要があります')
+    black = int.from_bytes(data[:length], 'little')
+    white = int.from_bytes(data[length:], 'little')
+    if black & white or (black | white) >> (size * size):
+        raise CodecError('パックされた盤面が不正です')
+    board = Board(size=size)
+    board.set_bitboards(black, white)
+    return board
+
+
+def board_from_list(board_state: list) -> Board:
+    if isinstance(board_state, (list, tuple)):
+        check_size(len(board_state))
+    try:
+        return OthelloGame.from_state(board_state, 'B').board
+    except ValueError as e:
+        raise CodecError(str(e)) from e
+
+
+def encode_board(board: Board, fmt: str = 'list') -> Union[list, str, bytes]:
+    if fmt == 'list':
+        return board_to_list(board)
+    if fmt == 'string':
+        return board_to_string(board)
+    if fmt == 'packed':
+        return base64.b64encode(pack_board(board)).decode('ascii')
+    if fmt == 'bytes':
+        return pack_board(board)
+    raise CodecError(f'未対応の盤面形式です: {fmt}')
+
+
+def decode_board(payload, fmt: str = 'list', size: int = 8) -> Board:
+    """
+    リクエストの盤面を復元する。'list' は行数、それ以外は size を盤面サイズとし、
+    どちらも check_size の範囲外なら CodecError を送出する。
+    """
+    if fmt == 'list':
+        return board_from_list(payload)
+    check_size(size)
+    if fmt == 'string':
+        return board_from_string(payload, size)
+    if fmt == 'packed':
+        try:
+            raw = base64.b64decode(payload, validate=True)
+        except (ValueError, TypeError) as e:
+            raise CodecError('packed 形式の base64 が不正です') from e
+        return unpack_board(raw, size)
+    if fmt == 'bytes':
+        if not isinstance(payload, (bytes, bytearray)):
+            raise CodecError('bytes 形式の盤面はバイト列である必要があります')
+        return unpack_board(bytes(payload), size)
+    raise CodecError(f'未対応の盤面形式です: {fmt}')
+
+
+def decode_binary_move(body: bytes, size: int = 8) -> dict:
+    """
+    application/octet-stream の /move リクエストを辞書に変換する。
+    形式: パックされた盤面 + 手番 (b'B' / b'W') + row (uint8) + col (uint8)
+    """
+    length = 2 * _bitboard_bytes(size)
+    if len(body) != length + 3:
+        raise CodecError(f'バイナリのリクエストは {length + 3} バイトである必要があります')
+    return {
+        'format': 'bytes',
+        'board': body[:length],
+        'current_turn': chr(body[length]),
+        'row': body[length + 1],
+        'col': body[length + 2],
+    }
+
+
+def encode_binary_response(response: dict) -> bytes:
+    """
+    board を 'bytes' 形式で持つレスポンス辞書をバイナリにする。
+    形式: パックされた盤面 + 手番 (1 バイト) [+ 受理 (0/1) + 終局 (0/1) + 勝者 (b'B' / b'W' / b'D' / b'-')]
+    /init のように status を持たないレスポンスは盤面と手番だけになる。
+    """
+    body = bytes(response['board']) + response['current_turn'].encode('ascii')
+    if 'status' in response:
+        winner = response.get('winner', '-')
+        body += bytes([
+            1 if response['status'] == 'move accepted' else 0,
+            1 if response.get('game_over') else 0,
+            ord('D' if winner == 'draw' else winner),
+        ])
+    return body
+
+
+def _rows(text: str, size: int):
+    return [text[i:i + size] for i in range(0, size * size, size)]
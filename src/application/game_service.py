@@ -1,7 +1,50 @@
-import pprint
-from src.domain.game import OthelloGame
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from src.domain import bitboard
+from src.domain.game import OthelloGame, StepResult
 from src.domain.position import Position
 from src.domain.player import Player
+from src.application import analysis, codec, metrics
+from src.application.position_cache import PositionCache
+from src.application.session_store import GameSessionStore
+from src.engine.opening_book import OpeningBook
+from src.engine.search import Searcher, search
+
+# セッション API で使うゲームの保存先 (プロセス内)
+sessions = GameSessionStore()
+
+DEFAULT_SEARCH_TIME_MS = 1000
+MAX_SEARCH_TIME_MS = 10000
+# これより短い time_ms は切り上げる (0 以下でも深さ 1 の探索は行われるが、意図した指定ではない)
+MIN_SEARCH_TIME_MS = 10
+_searchers = threading.local()
+
+# 定石 (load_opening_book で読み込む)。None なら定石を使わない
+opening_book: Optional[OpeningBook] = None
+# 定石ごとの読み出し中のスレッド数。load_opening_book で外した定石は、最後の読み出しが終わってから閉じる
+_book_readers: Dict[OpeningBook, int] = {}
+_book_lock = threading.Lock()
+
+# /legal-moves の結果のキャッシュ (回転・鏡映で重なる局面は共有する)
+LEGAL_MOVES_CACHE_SIZE = 100000
+legal_moves_cache = PositionCache(max_entries=LEGAL_MOVES_CACHE_SIZE)
+metrics.register_gauge('othello_legal_moves_cache_entries', lambda: len(legal_moves_cache),
+                       'Entries in the /legal-moves cache.')
+metrics.register_gauge('othello_legal_moves_cache_hits_total', lambda: legal_moves_cache.hits,
+                       'Cache hits for /legal-moves.', kind='counter')
+metrics.register_gauge('othello_legal_moves_cache_misses_total',
+                       lambda: legal_moves_cache.misses,
+                       'Cache misses for /legal-moves.', kind='counter')
+
+# /analyze の特徴量のキャッシュ (対称な局面は共有する)
+ANALYSIS_CACHE_SIZE = 100000
+analysis_cache = PositionCache(max_entries=ANALYSIS_CACHE_SIZE)
+
+# /move/debug の盤面の出力先。既定ではどこにも出さない
+# (production の --debug-log で、キュー経由で別スレッドが書き出すようにする)
+debug_log = logging.getLogger(__name__ + '.debug')
 
 
 def process_move(data: dict) -> dict:
@@ -12,30 +55,176 @@ def process_move(data: dict) -> dict:
     if board_state is None or current_turn is None or row is None or col is None:
         return {'status': 'error', 'message': '必要なパラメータが不足しています'}
 
-    game = OthelloGame.from_state(board_state, current_turn)
-    pos = Position(row, col)
-    move_result = game.make_move(pos)
+    stages = metrics.stages()
+    try:
+        game = _load_game(data)
+    except codec.CodecError as e:
+        return {'status': 'error', 'message': str(e)}
+    stages.lap('load')
+    result = game.step(Position(row, col))
+    stages.lap('make_move')
+    if result is not None and metrics.enabled():
+        _record_move_metrics(result)
+    response = _move_response(game, result, data)
+    stages.lap('encode')
+    # ゲーム終了の場合は、勝者と報酬情報を付与する
+    _attach_game_over(response, game, result.game_over if result else None)
+    stages.lap('game_over')
+    return response
+
+
+def _move_response(game: OthelloGame, result: Optional[StepResult], data: dict) -> dict:
+    """
+    /move と /move/debug の共通部分。着手できた場合は step の結果 (反転したマス・
+    自動パスしたか・次の手番の合法手) も返すので、クライアントはパスのために再度問い合わせなくてよい。
+    """
     response = {
-        'status': 'move accepted' if move_result else 'invalid move',
+        'status': 'move accepted' if result else 'invalid move',
+        'board': codec.encode_board(game.board, _response_format(data)),
+        'current_turn': game.current_turn.value,
+    }
+    if result is not None:
+        response['flipped'] = _positions(result.flipped)
+        response['passed'] = result.passed
+        response['legal_moves'] = _positions(result.legal_moves)
+    return response
+
+
+def _record_move_metrics(result: StepResult) -> None:
+    metrics.count('othello_moves_applied_total')
+    metrics.count('othello_flips_total', len(result.flipped))
+    metrics.count('othello_moves_generated_total', len(result.legal_moves))
+
+
+def process_moves(data: dict) -> dict:
+    """
+    /moves/batch 用の処理。iter_process_moves の結果を 1 つのレスポンスにまとめる。
+    """
+    results = []
+    response = {'status': 'ok'}
+    for item in iter_process_moves(data):
+        # 手ごと・ジョブごとのエラーは結果に含め、リクエスト全体のエラーだけを返す
+        if item.get('status') == 'error' and 'ply' not in item and 'index' not in item:
+            return item
+        if item.get('final'):
+            del item['final']
+            response.update(item)
+        else:
+            results.append(item)
+    response['results'] = results
+    return response
+
+
+def iter_process_moves(data: dict) -> Iterator[dict]:
+    """
+    複数の着手を 1 回の呼び出しで処理し、結果を 1 件ずつ返すジェネレータ。
+
+    - board / current_turn / moves を渡すと、1 つの盤面に moves ([row, col] のリスト、
+      None はパス) を順に適用する。着手は /move と同じく OthelloGame.step で行うので、
+      相手に合法手がなければ自動でパスする (結果の passed が真になる)。
+      各手の status と手番を返し、最後に最終盤面を 'final': True の要素として返す。
+      include_states が真なら各手の盤面も付与する。
+      形式の不正な手は {'ply': i, 'status': 'error'} を返し、盤面を変えずに次の手へ進む。
+    - jobs を渡すと、各要素 (board / current_turn / row / col) を独立に
+      process_move と同じ規則で処理する。
+    """
+    jobs = data.get("jobs")
+    if jobs is not None:
+        if not isinstance(jobs, list):
+            yield {'status': 'error', 'message': 'jobs はリストである必要があります'}
+            return
+        for index, job in enumerate(jobs):
+            if not isinstance(job, dict):
+                yield {'index': index, 'status': 'error', 'message': 'ジョブはオブジェクトである必要があります'}
+                continue
+            result = process_move(job)
+            result['index'] = index
+            yield result
+        return
+
+    board_state = data.get("board")
+    current_turn = data.get("current_turn")
+    moves = data.get("moves")
+    if board_state is None or current_turn is None or moves is None:
+        yield {'status': 'error', 'message': '必要なパラメータが不足しています'}
+        return
+    if not isinstance(moves, list):
+        yield {'status': 'error', 'message': 'moves はリストである必要があります'}
+        return
+    try:
+        game = _load_game(data)
+    except codec.CodecError as e:
+        yield {'status': 'error', 'message': str(e)}
+        return
+
+    include_states = bool(data.get("include_states", False))
+    for ply, move in enumerate(moves):
+        if move is None:
+            game.pass_turn()
+            result = {'ply': ply, 'status': 'pass'}
+        elif not _is_square(move):
+            yield {'ply': ply, 'status': 'error',
+                   'message': f'着手は [row, col] の整数の組である必要があります: {move!r}'}
+            continue
+        else:
+            step = game.step(Position(move[0], move[1]))
+            result = {
+                'ply': ply,
+                'status': 'move accepted' if step else 'invalid move',
+                'passed': bool(step and step.passed),
+            }
+        result['current_turn'] = game.current_turn.value
+        if include_states:
+            result['board'] = serialize_board(game.board)
+        yield result
+
+    final = {
+        'final': True,
         'board': serialize_board(game.board),
         'current_turn': game.current_turn.value,
     }
-    # ゲーム終了の場合は、勝者と報酬情報を付与する
-    if game.is_game_over():
+    _attach_game_over(final, game)
+    yield final
+
+
+def _is_square(move) -> bool:
+    return (isinstance(move, (list, tuple)) and len(move) == 2
+            and all(isinstance(v, int) and not isinstance(v, bool) for v in move))
+
+
+def _attach_game_over(response: dict, game: OthelloGame,
+                      game_over: Optional[bool] = None) -> None:
+    """
+    終局していれば勝者と各プレイヤーの報酬（勝ち:+1, 負け:-1, 引き分け:0）を付与する。
+    終局かどうかが分かっていれば game_over に渡すと判定の走査を省く。
+    """
+    if game_over is None:
+        game_over = game.is_game_over()
+    if game_over:
         winner = game.get_winner()
         response['game_over'] = True
         response['winner'] = winner.value if winner else 'draw'
-        # 各プレイヤーの報酬（シンプルに、勝ち:+1, 負け:-1, 引き分け:0）
         response['reward_BLACK'] = game.calculate_reward(Player.BLACK)
         response['reward_WHITE'] = game.calculate_reward(Player.WHITE)
     else:
         response['game_over'] = False
 
-    return response
-
 
 def process_move_debug(data: dict) -> dict:
-    """/move/debug 用の処理。move の結果と、テキストでの盤面可視化も返す"""
+    """
+    /move/debug 用の処理。move の結果と、テキストでの盤面可視化も返す。
+    metrics.enable(profile=True) のときは cProfile の結果を profile に付ける
+    (他のリクエストを計測中なら付けない)。
+    """
+    if metrics.profiling():
+        response, profile = metrics.profile_call(_process_move_debug, data)
+        if profile is not None:
+            response['profile'] = profile
+        return response
+    return _process_move_debug(data)
+
+
+def _process_move_debug(data: dict) -> dict:
     board_state = data.get("board")
     current_turn = data.get("current_turn")
     row = data.get("row")
@@ -43,45 +232,334 @@ def process_move_debug(data: dict) -> dict:
     if board_state is None or current_turn is None or row is None or col is None:
         return {'status': 'error', 'message': '必要なパラメータが不足しています'}
 
-    game = OthelloGame.from_state(board_state, current_turn)
-    pos = Position(row, col)
-    move_result = game.make_move(pos)
+    try:
+        game = _load_game(data)
+    except codec.CodecError as e:
+        return {'status': 'error', 'message': str(e)}
+    result = game.step(Position(row, col))
     board_str = _debug_board_str(game.board)
-    pprint.pprint(board_str)
+    if debug_log.isEnabledFor(logging.DEBUG):
+        debug_log.debug('move (%s, %s) -> %s\n%s', row, col,
+                        'accepted' if result else 'invalid', board_str)
+    response = _move_response(game, result, data)
+    response['debug_board'] = board_str
+    _attach_game_over(response, game, result.game_over if result else None)
+    return response
+
+
+def get_legal_moves(data: dict) -> dict:
+    """
+    /legal-moves 用の処理。board / current_turn の局面で手番側の合法手と、
+    それぞれに打ったときに反転するマスを返す。盤面は変更しないので、着手の前の確認に使う。
+    """
+    if data.get("board") is None or data.get("current_turn") is None:
+        return {'status': 'error', 'message': '必要なパラメータが不足しています'}
+    try:
+        game = _load_game(data)
+    except codec.CodecError as e:
+        return {'status': 'error', 'message': str(e)}
+    board = game.board
+    size = board.size
+    moves = legal_moves_cache.legal_moves_with_flips(board, game.current_turn)
+    return {
+        'status': 'ok',
+        'current_turn': game.current_turn.value,
+        'moves': [{
+            'row': index // size,
+            'col': index % size,
+            'flipped': [[i // size, i % size] for i in bitboard.iter_bits(flipped)],
+        } for index, flipped in moves],
+        'game_over': not moves and legal_moves_cache.is_game_over(board),
+    }
+
+
+def legal_moves_cache_stats() -> dict:
+    return dict(legal_moves_cache.stats(), status='ok')
+
+
+def create_game(data: dict) -> dict:
+    """
+    新しいゲームセッションを作成する。
+    board / current_turn が指定されていればその局面から、なければ初期局面から始める。
+    """
+    board_state = data.get("board")
+    if board_state is not None:
+        try:
+            board = codec.decode_board(board_state, 'list')
+        except codec.CodecError as e:
+            return {'status': 'error', 'message': str(e)}
+        turn = Player.BLACK if data.get("current_turn", "B") == 'B' else Player.WHITE
+        game = OthelloGame(board=board, current_turn=turn)
+    else:
+        game = OthelloGame()
+    game_id = sessions.create(game)
     response = {
-        'status': 'move accepted' if move_result else 'invalid move',
+        'status': 'created',
+        'game_id': game_id,
         'board': serialize_board(game.board),
+    }
+    response.update(_session_state(game))
+    return response
+
+
+def get_game_state(game_id: str) -> dict:
+    """セッションの現在の盤面全体を返す (クライアントの再同期用)"""
+    with sessions.locked(game_id) as game:
+        if game is None:
+            return {'status': 'error', 'message': 'ゲームが見つかりません'}
+        response = {
+            'status': 'ok',
+            'game_id': game_id,
+            'board': serialize_board(game.board),
+        }
+        response.update(_session_state(game))
+        return response
+
+
+def process_session_move(game_id: str, data: dict) -> dict:
+    """
+    セッション上のゲームに着手し、差分 (置いたマス・反転したマス・次の手番・合法手) だけを返す。
+    相手に合法手がなければ自動でパスし、passed を真にして着手側の手番のまま返す。
+    """
+    row = data.get("row")
+    col = data.get("col")
+    if row is None or col is None:
+        return {'status': 'error', 'message': '必要なパラメータが不足しています'}
+    # 同じゲームへの着手が別スレッドで同時に来ても、盤面と履歴を 1 手ずつ変更する
+    with sessions.locked(game_id) as game:
+        if game is None:
+            return {'status': 'error', 'message': 'ゲームが見つかりません'}
+
+        result = game.step(Position(row, col))
+        if result is None:
+            response = {'status': 'invalid move'}
+            response.update(_session_state(game))
+            return response
+        response = {
+            'status': 'move accepted',
+            'placed': [row, col],
+            'flipped': _positions(result.flipped),
+            'passed': result.passed,
+            'current_turn': result.current_turn.value,
+            'legal_moves': _positions(result.legal_moves),
+        }
+        _attach_game_over(response, game, result.game_over)
+        return response
+
+
+def _session_state(game: OthelloGame) -> dict:
+    """次の手番・合法手・終局情報。合法手が見つかれば終局判定の走査を省く"""
+    legal_moves = game.board.get_valid_moves(game.current_turn)
+    state = {
         'current_turn': game.current_turn.value,
-        'debug_board': board_str,
+        'legal_moves': _positions(legal_moves),
     }
-    if game.is_game_over():
-        winner = game.get_winner()
-        response['game_over'] = True
-        response['winner'] = winner.value if winner else 'draw'
-        response['reward_BLACK'] = game.calculate_reward(Player.BLACK)
-        response['reward_WHITE'] = game.calculate_reward(Player.WHITE)
+    if legal_moves:
+        state['game_over'] = False
     else:
-        response['game_over'] = False
-    return response
+        _attach_game_over(state, game)
+    return state
+
+
+def _positions(positions) -> list:
+    return [[pos.row, pos.col] for pos in positions]
+
+
+def find_best_move(data: dict) -> dict:
+    """
+    /bestmove 用の処理。board / current_turn の局面で手番側の最善手を探索して返す。
+    time_ms (既定 1000, MIN_SEARCH_TIME_MS 〜 MAX_SEARCH_TIME_MS に丸める) と
+    max_depth (1 以上の整数) で探索量を制限できる。
+    """
+    board_state = data.get("board")
+    current_turn = data.get("current_turn")
+    if board_state is None or current_turn is None:
+        return {'status': 'error', 'message': '必要なパラメータが不足しています'}
+    time_ms = data.get("time_ms", DEFAULT_SEARCH_TIME_MS)
+    if isinstance(time_ms, bool) or not isinstance(time_ms, (int, float)) or time_ms != time_ms:
+        return {'status': 'error', 'message': f'time_ms は数値である必要があります: {time_ms!r}'}
+    time_ms = min(max(float(time_ms), MIN_SEARCH_TIME_MS), MAX_SEARCH_TIME_MS)
+    max_depth = data.get("max_depth")
+    if max_depth is not None and (isinstance(max_depth, bool) or not isinstance(max_depth, int)
+                                  or max_depth < 1):
+        return {'status': 'error', 'message': f'max_depth は 1 以上の整数である必要があります: {max_depth!r}'}
+
+    min_games = data.get("min_games", 1)
+    if not _is_positive_int(min_games):
+        return {'status': 'error', 'message': f'min_games は 1 以上の整数である必要があります: {min_games!r}'}
+
+    try:
+        game = _load_game(data)
+    except codec.CodecError as e:
+        return {'status': 'error', 'message': str(e)}
+    # 定石にある局面は探索しない (use_book: false で無効にできる)
+    book_move = None
+    if data.get("use_book", True):
+        with _using_book() as book:
+            if book is not None:
+                book_move = book.best_move(game.board, game.current_turn, min_games)
+    if book_move is not None:
+        return {
+            'status': 'ok',
+            'row': book_move.position.row,
+            'col': book_move.position.col,
+            'source': 'book',
+            'games': book_move.games,
+            'win_rate': round(book_move.win_rate, 4),
+        }
+    result = search(game, time_ms=time_ms, max_depth=max_depth, searcher=_thread_searcher(game))
+    return {
+        'status': 'ok',
+        'row': result.move.row if result.move else None,
+        'col': result.move.col if result.move else None,
+        'source': 'search',
+        'score': result.score,
+        'depth': result.depth,
+        'exact': result.exact,
+        'nodes': result.nodes,
+        'elapsed_ms': round(result.elapsed_ms, 3),
+    }
 
 
-def get_initial_state() -> dict:
+def lookup_book(data: dict) -> dict:
+    """
+    /book 用の処理。board / current_turn の局面の定石手を勝率の高い順に返す。
+    定石が読み込まれていない、または定石にない局面では moves が空になる。
+    """
+    if data.get("board") is None or data.get("current_turn") is None:
+        return {'status': 'error', 'message': '必要なパラメータが不足しています'}
+    min_games = data.get("min_games", 1)
+    if not _is_positive_int(min_games):
+        return {'status': 'error', 'message': f'min_games は 1 以上の整数である必要があります: {min_games!r}'}
+    try:
+        game = _load_game(data)
+    except codec.CodecError as e:
+        return {'status': 'error', 'message': str(e)}
+    moves = []
+    with _using_book() as book:
+        if book is not None:
+            moves = book.lookup(game.board, game.current_turn, min_games)
+    return {
+        'status': 'ok',
+        'moves': [{
+            'row': move.position.row,
+            'col': move.position.col,
+            'games': move.games,
+            'wins': move.wins,
+            'draws': move.draws,
+            'win_rate': round(move.win_rate, 4),
+        } for move in moves],
+    }
+
+
+def analyze_positions(data: dict) -> dict:
+    """
+    /analyze 用の処理。boards (format / size で指定した形式の盤面のリスト) と
+    turns (各局面の手番 'B' / 'W' のリスト、または "BWB..." の文字列) を受け取り、
+    手番側から見た特徴量を analysis.FEATURES の列ごとの整数リストで返す。
+    board / current_turn で 1 局面だけ渡してもよい。
+    """
+    if data.get("board") is not None:
+        boards, turns = [data["board"]], [data.get("current_turn")]
+    else:
+        boards, turns = data.get("boards"), data.get("turns")
+    if boards is None or turns is None:
+        return {'status': 'error', 'message': '必要なパラメータが不足しています'}
+    if not isinstance(boards, list) or not isinstance(turns, (list, str)):
+        return {'status': 'error', 'message': 'boards はリスト、turns はリストか文字列である必要があります'}
+    if len(boards) != len(turns):
+        return {'status': 'error', 'message': 'boards と turns の長さが一致しません'}
+
+    fmt = data.get("format", "list")
+    size = data.get("size", 8)
+    positions = []
+    for index, (payload, turn) in enumerate(zip(boards, turns)):
+        if turn not in ('B', 'W'):
+            return {'status': 'error', 'message': f'{index} 番目の手番が不正です: {turn}'}
+        try:
+            board = codec.decode_board(payload, fmt, size)
+        except codec.CodecError as e:
+            return {'status': 'error', 'message': f'{index} 番目の盤面: {e}'}
+        positions.append((board, Player.BLACK if turn == 'B' else Player.WHITE))
+    return {
+        'status': 'ok',
+        'count': len(positions),
+        'features': analysis.analyze_batch(positions, cache=analysis_cache),
+    }
+
+
+def load_opening_book(path: Optional[str]) -> None:
+    """
+    定石ファイルを読み込む。None を渡すと定石を外す。
+    前の定石は、読み出し中のリクエストがあればそれが終わったときに閉じる。
+    """
+    global opening_book
+    book = OpeningBook(path) if path else None
+    with _book_lock:
+        old, opening_book = opening_book, book
+        close_now = old is not None and old not in _book_readers
+    if close_now:
+        old.close()
+
+
+@contextmanager
+def _using_book() -> Iterator[Optional[OpeningBook]]:
+    """現在の定石を取り出し、ブロックを抜けるまで閉じられないようにする"""
+    with _book_lock:
+        book = opening_book
+        if book is not None:
+            _book_readers[book] = _book_readers.get(book, 0) + 1
+    try:
+        yield book
+    finally:
+        if book is not None:
+            with _book_lock:
+                _book_readers[book] -= 1
+                close = not _book_readers[book] and book is not opening_book
+                if not _book_readers[book]:
+                    del _book_readers[book]
+            if close:
+                book.close()
+
+
+def _is_positive_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+
+def _thread_searcher(game: OthelloGame) -> Searcher:
+    # 置換表を使い回すため、スレッドごとに Searcher を保持する
+    searcher = getattr(_searchers, 'searcher', None)
+    if searcher is None or searcher.size != game.board.size:
+        searcher = Searcher(size=game.board.size)
+        _searchers.searcher = searcher
+    return searcher
+
+
+def get_initial_state(fmt: str = 'list') -> dict:
     game = OthelloGame()
     return {
-        'board': serialize_board(game.board),
+        'board': codec.encode_board(game.board, fmt),
         'current_turn': game.current_turn.value,
     }
 
 
 def serialize_board(board) -> list:
-    serialized = []
-    for row in board.cells:
-        serialized_row = []
-        for cell in row:
-            serialized_row.append(
-                cell.occupant.value if cell.occupant else None)
-        serialized.append(serialized_row)
-    return serialized
+    return codec.board_to_list(board)
+
+
+def _load_game(data: dict) -> OthelloGame:
+    """
+    リクエストの board を format (既定 'list') に従って復元する。
+    'list' 以外の形式では size (既定 8) で盤面サイズを指定する。
+    """
+    board = codec.decode_board(data["board"], data.get("format", "list"), data.get("size", 8))
+    turn = Player.BLACK if data["current_turn"] == 'B' else Player.WHITE
+    return OthelloGame(board=board, current_turn=turn)
+
+
+def _response_format(data: dict) -> str:
+    """応答の盤面形式。response_format がなければリクエストと同じ形式で返す"""
+    return data.get("response_format") or data.get("format", "list")
 
 
 def _debug_board_str(board) -> str:
@@ -0,0 +1,262 @@
+"""
+強化学習向けの Gym 形式の環境。
+
+OthelloEnv は OthelloGame を reset() / step(action) で操作する 1 局分の環境で、
+観測は手番側から見た (自分の石, 相手の石, 合法手) の 3 枚の盤面 (PLANES, size, size) を
+あらかじめ確保した float32 の配列に書き込んで返す (同じ配列を使い回すので、保持する場合は複製すること)。
+行動は row * size + col、action_mask は合法手の bool 配列。合法手のない側は step で自動的にパスする。
+報酬は終局時に着手した側から見た calculate_reward、それ以外は 0。
+
+SubprocVectorEnv は K 個の環境をワーカープロセスに分けて同時に進める。観測・行動・報酬は
+共有メモリ上の配列でやり取りし、パイプにはコマンドだけを流す。終局した環境は自動で reset する。
+
+gymnasium がインストールされていれば OthelloEnv は gymnasium.Env を継承し、
+observation_space / action_space を持つ。
+"""
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.application import codec
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.geometry import geometry
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+except ImportError:  # gymnasium は任意の依存
+    gymnasium = None
+
+PLANES = 3   # 自分の石, 相手の石, 合法手
+
+_EnvBase = gymnasium.Env if gymnasium is not None else object
+
+
+class OthelloEnv(_EnvBase):
+    """
+    observation / action_mask に書き込み先の配列を渡すと、その配列に直接書き込む
+    (SubprocVectorEnv が共有メモリ上の配列を渡すのに使う)。
+    """
+    metadata = {'render_modes': ['ansi']}
+
+    def __init__(self, size: int = 8, observation: Optional[np.ndarray] = None,
+                 action_mask: Optional[np.ndarray] = None):
+        self.size = size
+        self.num_actions = size * size
+        if observation is None:
+            observation = np.zeros((PLANES, size, size), dtype=np.float32)
+        if action_mask is None:
+            action_mask = np.zeros(self.num_actions, dtype=bool)
+        self.observation = observation
+        self.action_mask = action_mask
+        self._planes = observation.reshape(PLANES, self.num_actions)
+        self._nbytes = (self.num_actions + 7) // 8
+        self._positions = geometry(size).positions
+        if gymnasium is not None:
+            self.observation_space = spaces.Box(0.0, 1.0, (PLANES, size, size), np.float32)
+            self.action_space = spaces.Discrete(self.num_actions)
+        self.game = OthelloGame(board=Board(size=size))
+        self._write_observation()
+
+    def _write_observation(self) -> None:
+        board = self.game.board
+        turn = self.game.current_turn
+        nbytes = self._nbytes
+        data = (board.bitboard(turn).to_bytes(nbytes, 'little')
+                + board.bitboard(turn.opponent()).to_bytes(nbytes, 'little')
+                + board.legal_moves_mask(turn).to_bytes(nbytes, 'little'))
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(PLANES, nbytes),
+                             axis=1, count=self.num_actions, bitorder='little')
+        self._planes[:] = bits
+        np.not_equal(bits[2], 0, out=self.action_mask)
+
+    def _info(self, passed: bool) -> dict:
+        return {
+            'action_mask': self.action_mask,
+            'current_turn': self.game.current_turn.value,
+            'passed': passed,
+        }
+
+    def reset(self, *, seed: Optional[int] = None,
+              options: Optional[dict] = None) -> Tuple[np.ndarray, dict]:
+        # 環境自体は決定的だが、gymnasium の np_random は呼び出し側の方策などが使う
+        if gymnasium is not None:
+            super().reset(seed=seed)
+        self.game = OthelloGame(board=Board(size=self.size))
+        self._write_observation()
+        return self.observation, self._info(False)
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        """(観測, 報酬, 終局したか, 打ち切りか (常に False), 情報) を返す"""
+        if not 0 <= action < self.num_actions:
+            raise ValueError(f'行動は 0 以上 {self.num_actions} 未満です: {action}')
+        mover = self.game.current_turn
+        result = self.game.step(self._positions[action])
+        if result is None:
+            raise ValueError(f'不正な着手です: {self._positions[action]}')
+        reward = self.game.calculate_reward(mover) if result.game_over else 0.0
+        self._write_observation()
+        return self.observation, reward, result.game_over, False, self._info(result.passed)
+
+    def render(self) -> str:
+        text = codec.board_to_string(self.game.board)
+        return '\n'.join(text[i:i + self.size] for i in range(0, len(text), self.size))
+
+
+class _SharedArrays:
+    """1 つの共有メモリ領域を観測・合法手・行動・報酬・終局フラグの配列に分けて使う"""
+
+    def __init__(self, num_envs: int, size: int, name: Optional[str] = None):
+        squares = size * size
+        self._layout = [
+            ('observations', (num_envs, PLANES, size, size), np.float32),
+            ('action_masks', (num_envs, squares), np.bool_),
+            ('actions', (num_envs,), np.int64),
+            ('rewards', (num_envs,), np.float32),
+            ('terminated', (num_envs,), np.bool_),
+        ]
+        length = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize
+                     for _, shape, dtype in self._layout)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=length)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        offset = 0
+        for attr, shape, dtype in self._layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, attr, array)
+            offset += array.nbytes
+
+    def close(self) -> None:
+        # 配列が共有メモリを参照したままだと close できない
+        for attr, _, _ in self._layout:
+            setattr(self, attr, None)
+        try:
+            self.shm.close()
+        except BufferError:
+            # 呼び出し側が配列を保持している。領域はその配列が解放されたときに閉じられる
+            pass
+
+
+def _serve(conn, arrays: _SharedArrays, size: int, start: int, stop: int) -> None:
+    envs = [OthelloEnv(size, observation=arrays.observations[i],
+                       action_mask=arrays.action_masks[i]) for i in range(start, stop)]
+    while True:
+        command = conn.recv()
+        if command == 'close':
+            return
+        try:
+            for i, env in enumerate(envs, start):
+                if command == 'reset':
+                    env.reset()
+                    arrays.rewards[i] = 0.0
+                    arrays.terminated[i] = False
+                    continue
+                _, reward, terminated, _, _ = env.step(int(arrays.actions[i]))
+                arrays.rewards[i] = reward
+                arrays.terminated[i] = terminated
+                if terminated:
+                    env.reset()
+            conn.send(None)
+        except ValueError as e:
+            conn.send(f'環境 {i}: {e}')
+
+
+def _worker(conn, name: str, num_envs: int, size: int, start: int, stop: int) -> None:
+    arrays = _SharedArrays(num_envs, size, name=name)
+    try:
+        _serve(conn, arrays, size, start, stop)
+    finally:
+        arrays.close()
+        conn.close()
+
+
+class SubprocVectorEnv:
+    """
+    num_envs 個の OthelloEnv を workers 個のプロセスに分けて進める。
+    reset() / step() が返す配列は共有メモリ上の同じ配列で、次の step で上書きされる。
+    close() のあとは使わないこと。
+    """
+
+    def __init__(self, num_envs: int, size: int = 8, workers: Optional[int] = None):
+        self.num_envs = num_envs
+        self.size = size
+        self.num_actions = size * size
+        workers = min(num_envs, workers or os.cpu_count() or 1)
+        self._arrays = _SharedArrays(num_envs, size)
+        self._truncated = np.zeros(num_envs, dtype=bool)
+        self._conns = []
+        self._processes = []
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, args=(child, self._arrays.shm.name, num_envs, size,
+                                      int(start), int(stop)), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self._closed = False
+
+    @property
+    def observations(self) -> np.ndarray:
+        return self._arrays.observations
+
+    @property
+    def action_masks(self) -> np.ndarray:
+        return self._arrays.action_masks
+
+    def _broadcast(self, command: str) -> None:
+        for conn in self._conns:
+            conn.send(command)
+        errors: List[str] = [error for error in (conn.recv() for conn in self._conns) if error]
+        if errors:
+            raise ValueError('; '.join(errors))
+
+    def reset(self) -> Tuple[np.ndarray, dict]:
+        self._broadcast('reset')
+        return self._arrays.observations, {'action_mask': self._arrays.action_masks}
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        各環境で actions[i] を打つ。終局した環境は reset されるので、
+        その環境の観測は次の局の初期局面になる。
+        不正な行動が 1 つでもあれば、どの環境も進めずに ValueError を送出する。
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f'行動は {self.num_envs} 個必要です: {actions.shape}')
+        in_range = (actions >= 0) & (actions < self.num_actions)
+        legal = in_range.copy()
+        legal[in_range] = self._arrays.action_masks[np.flatnonzero(in_range), actions[in_range]]
+        if not legal.all():
+            invalid = np.flatnonzero(~legal)
+            raise ValueError('不正な行動です: ' + ', '.join(
+                f'環境 {i}: {actions[i]}' for i in invalid))
+        self._arrays.actions[:] = actions
+        self._broadcast('step')
+        return (self._arrays.observations, self._arrays.rewards, self._arrays.terminated,
+                self._truncated, {'action_mask': self._arrays.action_masks})
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            conn.send('close')
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._arrays.close()
+        self._arrays.shm.unlink()
+
+    def __enter__(self) -> 'SubprocVectorEnv':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,189 @@
+"""
+リクエスト処理の計測 (opt-in)。
+
+enable() するまでは stages() は共有の何もしないタイマーを返し、count() / observe() は
+フラグを見てすぐ戻るので、無効時のコストは呼び出しごとに関数呼び出し 1 回分に収まる
+(benchmarks/bench_metrics.py で確認できる)。
+集計値はプロセスごとに持つ。render() で Prometheus のテキスト形式にする。
+キャッシュの件数のように他のオブジェクトが持っている値は register_gauge で登録し、
+計測が有効なときの render() のたびに読み出す。
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+# 秒単位のヒストグラムのバケット上限
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_SECONDS = 'othello_stage_duration_seconds'
+REQUEST_SECONDS = 'othello_request_duration_seconds'
+
+_HELP = {
+    STAGE_SECONDS: 'Time spent in each stage of request processing.',
+    REQUEST_SECONDS: 'Request latency per route.',
+    'othello_moves_applied_total': 'Moves applied to a board.',
+    'othello_flips_total': 'Discs flipped by applied moves.',
+    'othello_moves_generated_total': 'Legal moves generated for the side to move.',
+}
+
+_flags = {'enabled': False, 'profile': False}
+_lock = threading.Lock()
+
+Labels = Tuple[Tuple[str, str], ...]
+_counters: Dict[Tuple[str, Labels], float] = {}
+# (名前, ラベル) -> [バケットごとの件数..., 合計秒, 件数]
+_histograms: Dict[Tuple[str, Labels], list] = {}
+# (名前, 種類, 値を返す関数)
+_gauges: List[Tuple[str, str, Callable[[], float]]] = []
+# profile_call を同時に 1 つだけにする
+_profile_lock = threading.Lock()
+
+
+def enable(enabled: bool = True, profile: bool = False) -> None:
+    """計測を有効にする。profile=True なら /move/debug に cProfile の結果を付ける"""
+    _flags['enabled'] = enabled
+    _flags['profile'] = profile
+
+
+def enabled() -> bool:
+    return _flags['enabled']
+
+
+def profiling() -> bool:
+    return _flags['profile']
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def register_gauge(name: str, func: Callable[[], float], help_text: str = '',
+                   kind: str = 'gauge') -> None:
+    """render() のたびに func() を呼んで name の値として出力する。同じ名前の登録は置き換える"""
+    with _lock:
+        _gauges[:] = [gauge for gauge in _gauges if gauge[0] != name]
+        _gauges.append((name, kind, func))
+        if help_text:
+            _HELP[name] = help_text
+
+
+def count(name: str, amount: float = 1, **labels: str) -> None:
+    if not _flags['enabled']:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    if not _flags['enabled']:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+                break
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+
+class StageTimer:
+    """
+    処理の段階ごとの所要時間を測る。lap(stage) は前回の lap (最初は生成時) からの時間を
+    stage のヒストグラムに記録する。
+    """
+    __slots__ = ('last',)
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        observe(STAGE_SECONDS, now - self.last, stage=stage)
+        self.last = now
+
+
+class _NullStageTimer:
+    __slots__ = ()
+
+    def lap(self, stage: str) -> None:
+        pass
+
+
+_NULL_TIMER = _NullStageTimer()
+
+
+def stages():
+    """計測が有効なら新しい StageTimer を、無効なら何もしないタイマーを返す"""
+    if not _flags['enabled']:
+        return _NULL_TIMER
+    return StageTimer()
+
+
+def profile_call(func: Callable, *args, limit: int = 25):
+    """
+    func(*args) を cProfile 付きで実行し、(戻り値, 累積時間順の上位 limit 件の表) を返す。
+    プロファイラはプロセスに 1 つしか動かせない (3.12 以降は 2 つ目が例外になる) ので、
+    別のスレッドが計測中なら計測せずに実行し、表の代わりに None を返す。
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return func(*args), None
+    try:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args)
+    finally:
+        _profile_lock.release()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return result, out.getvalue()
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+def render() -> str:
+    """Prometheus のテキスト形式 (version 0.0.4)"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(value)) for key, value in _histograms.items())
+        gauges = list(_gauges) if _flags['enabled'] else []
+    lines = []
+    seen = set()
+
+    def header(name: str, kind: str) -> None:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f'# HELP {name} {_HELP.get(name, name)}')
+            lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), value in counters:
+        header(name, 'counter')
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+    for name, kind, func in gauges:
+        header(name, kind)
+        lines.append(f'{name} {func()}')
+    for (name, labels), values in histograms:
+        header(name, 'histogram')
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS, values):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{_format_labels(labels, (("le", f"{bound:g}"),))} '
+                         f'{cumulative}')
+        lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {values[-1]}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {values[-2]:.9g}')
+        lines.append(f'{name}_count{_format_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,75 @@
+"""
+自己対局・対戦で使う着手方策。
+方策は (game, rng) を受け取り、手番側の着手 Position を返す呼び出し可能オブジェクト。
+合法手がない局面では呼ばれない。
+"""
+import random
+from typing import Callable, Optional, Union
+
+from src.domain.game import OthelloGame
+from src.domain.position import Position
+from src.engine.search import Searcher
+
+Policy = Callable[[OthelloGame, random.Random], Position]
+
+
+def random_policy(game: OthelloGame, rng: random.Random) -> Position:
+    """合法手から一様に選ぶ"""
+    return rng.choice(game.board.get_valid_moves(game.current_turn))
+
+
+def greedy_policy(game: OthelloGame, rng: random.Random) -> Position:
+    """反転枚数が最大の手を選ぶ。同数の手からはランダムに選ぶ"""
+    board = game.board
+    best = []
+    best_count = 0
+    for pos in board.get_valid_moves(game.current_turn):
+        count = len(board.get_flips(pos, game.current_turn))
+        if count > best_count:
+            best, best_count = [pos], count
+        elif count == best_count:
+            best.append(pos)
+    return rng.choice(best)
+
+
+class EnginePolicy:
+    """探索エンジンの最善手を選ぶ。置換表は対局をまたいで使い回す"""
+
+    def __init__(self, time_ms: float = 100.0, max_depth: Optional[int] = None):
+        self.time_ms = time_ms
+        self.max_depth = max_depth
+        self._searcher = None
+
+    def __call__(self, game: OthelloGame, rng: random.Random) -> Position:
+        if self._searcher is None or self._searcher.size != game.board.size:
+            self._searcher = Searcher(size=game.board.size, table_bits=18)
+        result = self._searcher.search(game, time_ms=self.time_ms, max_depth=self.max_depth)
+        return result.move
+
+    def __getstate__(self):
+        # 置換表はプロセスへ送らない
+        return {'time_ms': self.time_ms, 'max_depth': self.max_depth, '_searcher': None}
+
+
+POLICIES = {
+    'random': random_policy,
+    'greedy': greedy_policy,
+}
+
+
+def make_policy(spec: Union[str, dict, Policy]) -> Policy:
+    """
+    方策の指定から方策を作る。
+    'random' / 'greedy' / 'engine'、{'type': 'engine', 'time_ms': 50, 'max_depth': 4} のような辞書、
+    または呼び出し可能オブジェクトをそのまま受け付ける。
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, str):
+        spec = {'type': spec}
+    kind = spec.get('type')
+    if kind in POLICIES:
+        return POLICIES[kind]
+    if kind == 'engine':
+        return EnginePolicy(time_ms=spec.get('time_ms', 100.0), max_depth=spec.get('max_depth'))
+    raise ValueError(f'未知の方策です: {kind}')
@@ -0,0 +1,216 @@
+"""
+対称性を同一視した局面キャッシュ。
+
+回転・鏡映で重なる局面は合法手・終局判定・評価値が (変換を除いて) 等しいので、
+局面を代表形 (symmetry.canonical) に直してからキャッシュを引く。
+PositionCache はプロセス内の LRU キャッシュ、SharedPositionTable は共有メモリ上の
+固定長ハッシュ表で、自己対局のワーカープロセス間で評価値を共有するために使う。
+"""
+import struct
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+
+from src.domain import bitboard, symmetry
+from src.domain.board import Board
+from src.domain.geometry import geometry
+from src.domain.player import Player
+from src.domain.position import Position
+from src.engine.transposition import zobrist_keys
+
+# 評価関数: (board, current_turn) -> int。盤面の回転・鏡映で値が変わらないこと
+# (プロセス内のキャッシュだけなら analysis.analyze のように int 以外を返してもよい)
+Evaluator = Callable[[Board, Player], int]
+
+_LEGAL = 'legal'
+_FLIPS = 'flips'
+_GAME_OVER = 'game_over'
+
+
+class SharedPositionTable:
+    """
+    共有メモリ上の 64 ビットキー -> 64 ビット符号付き整数の表。
+    スロットはキーの下位ビットで決まり、衝突したら上書きする。
+    ロックは取らず、(キー XOR 値, 値) の組で書き込むことで、
+    書き込み途中のスロットを読んでも検証に失敗して未登録として扱われる。
+    pickle するとセグメント名だけが渡り、受け取ったプロセスで同じ領域に接続する。
+    """
+
+    _SLOT = struct.Struct('<Qq')
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, size_bits: int = 20, name: Optional[str] = None):
+        self.size_bits = size_bits
+        self._mask = (1 << size_bits) - 1
+        length = self._SLOT.size << size_bits
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=length)
+            self._shm.buf[:length] = bytes(length)
+            self.owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def get(self, key: int) -> Optional[int]:
+        key &= self._MASK64
+        offset = (key & self._mask) * self._SLOT.size
+        check, value = self._SLOT.unpack_from(self._shm.buf, offset)
+        # 全ビット 0 のスロットは空き
+        if check == (key ^ value) & self._MASK64 and (check or value):
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key: int, value: int) -> None:
+        key &= self._MASK64
+        offset = (key & self._mask) * self._SLOT.size
+        self._SLOT.pack_into(self._shm.buf, offset, (key ^ value) & self._MASK64, value)
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """作成したプロセスが最後に呼んで共有メモリを解放する"""
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __getstate__(self):
+        return {'size_bits': self.size_bits, 'name': self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['size_bits'], name=state['name'])
+
+    def __enter__(self) -> 'SharedPositionTable':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.unlink()
+
+
+class PositionCache:
+    """
+    (代表形の局面, 手番) をキーにした LRU キャッシュ。
+    合法手・終局判定・評価関数の結果をメモ化し、ヒット数・ミス数を数える。
+    shared を渡すと evaluate は共有メモリの表も引き、結果を書き込む
+    (共有表は評価関数を区別しないので、1 つの評価関数専用にすること)。
+    """
+
+    def __init__(self, max_entries: int = 100000,
+                 shared: Optional[SharedPositionTable] = None):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[tuple, object]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, key: tuple):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key: tuple, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def legal_moves_mask(self, board: Board, current_turn: Player) -> int:
+        """board.legal_moves_mask と同じ値を返す"""
+        key, sym = symmetry.canonical_key(board, current_turn)
+        moves = self._lookup((_LEGAL, key))
+        if moves is None:
+            # 代表形の向きで保存し、取り出すときに元の向きへ戻す
+            moves = symmetry.transform(board.legal_moves_mask(current_turn), board.size, sym)
+            self._store((_LEGAL, key), moves)
+        return symmetry.transform(moves, board.size, symmetry.inverse(sym))
+
+    def valid_moves(self, board: Board, current_turn: Player) -> List[Position]:
+        """board.get_valid_moves と同じ値を返す"""
+        positions = geometry(board.size).positions
+        return [positions[index] for index in
+                bitboard.iter_bits(self.legal_moves_mask(board, current_turn))]
+
+    def legal_moves_with_flips(self, board: Board,
+                               current_turn: Player) -> Tuple[Tuple[int, int], ...]:
+        """合法手ごとの (マス番号, 反転する石のマスク) をマス番号の昇順に返す"""
+        key, sym = symmetry.canonical_key(board, current_turn)
+        size = board.size
+        moves = self._lookup((_FLIPS, key))
+        if moves is None:
+            own, opp = ((board.black, board.white) if current_turn == Player.BLACK
+                        else (board.white, board.black))
+            moves = tuple(sorted(
+                (symmetry.transform_index(index, size, sym),
+                 symmetry.transform(bitboard.flips(index, own, opp, size), size, sym))
+                for index in bitboard.iter_bits(board.legal_moves_mask(current_turn))))
+            self._store((_FLIPS, key), moves)
+        if sym == 0:
+            return moves
+        back = symmetry.inverse(sym)
+        return tuple(sorted((symmetry.transform_index(index, size, back),
+                             symmetry.transform(flipped, size, back))
+                            for index, flipped in moves))
+
+    def is_game_over(self, board: Board) -> bool:
+        """両者とも合法手がないか (OthelloGame.is_game_over と同じ判定)"""
+        key, _ = symmetry.canonical_key(board, Player.BLACK)
+        over = self._lookup((_GAME_OVER, key))
+        if over is None:
+            over = int(not board.has_valid_move(Player.BLACK)
+                       and not board.has_valid_move(Player.WHITE))
+            self._store((_GAME_OVER, key), over)
+        return bool(over)
+
+    def evaluate(self, evaluator: Evaluator, board: Board, current_turn: Player) -> int:
+        """evaluator(board, current_turn) をメモ化して返す"""
+        black, white, _ = symmetry.canonical(board.black, board.white, board.size)
+        white_to_move = current_turn == Player.WHITE
+        key = (evaluator, symmetry.position_key(black, white, white_to_move, board.size))
+        value = self._lookup(key)
+        if value is not None:
+            return value
+        shared_key = None
+        if self.shared is not None:
+            shared_key = zobrist_keys(board.size).hash(black, white, white_to_move)
+            value = self.shared.get(shared_key)
+        if value is None:
+            value = evaluator(board, current_turn)
+            if shared_key is not None:
+                self.shared.put(shared_key, value)
+        self._store(key, value)
+        return value
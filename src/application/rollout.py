@@ -0,0 +1,116 @@
+"""
+ランダムプレイアウト (Monte Carlo rollout)。
+
+rollout(game, n, seed) は game の局面から n 局を一様ランダムな合法手で終局まで打ち、
+手番側から見た勝ち・引き分け・負けの数と平均石差を返す。
+64 マス以下の盤面では BatchOthelloEnv.play_random で CHUNK 局ずつまとめて進め、
+それより大きい盤面ではビットボードの整数演算だけのループで 1 局ずつ打つ。
+局は CHUNK 局ごとに (seed, チャンク番号) から乱数を作るので、workers の数によらず結果は同じになる。
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.application.batch_env import BLACK, WHITE, BatchOthelloEnv
+from src.domain import bitboard
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+
+CHUNK = 4096
+
+# (black, white, 白番か, 盤面サイズ, 局数, seed, チャンク番号)
+_Task = Tuple[int, int, bool, int, int, int, int]
+
+
+class RolloutResult(NamedTuple):
+    playouts: int
+    wins: int
+    draws: int
+    losses: int
+    mean_disc_diff: float   # 手番側の石数 - 相手の石数 の平均
+
+    @property
+    def win_rate(self) -> float:
+        """引き分けを 0.5 勝とした勝率"""
+        return (self.wins + 0.5 * self.draws) / self.playouts if self.playouts else 0.0
+
+
+def _rollout_batch(task: _Task) -> Tuple[int, int, int, int]:
+    black, white, white_to_move, size, count, seed, chunk = task
+    env = BatchOthelloEnv(count, size=size)
+    env.black[:] = black
+    env.white[:] = white
+    env.turn[:] = WHITE if white_to_move else BLACK
+    env.dones[:] = False
+    env.play_random(np.random.default_rng([seed, chunk]))
+    counts = env.disc_counts()
+    diff = counts[:, 0] - counts[:, 1]
+    if white_to_move:
+        diff = -diff
+    return (int((diff > 0).sum()), int((diff == 0).sum()), int((diff < 0).sum()),
+            int(diff.sum()))
+
+
+def _rollout_scalar(task: _Task) -> Tuple[int, int, int, int]:
+    black, white, white_to_move, size, count, seed, chunk = task
+    rng = random.Random(f'{seed}:{chunk}')
+    randrange = rng.randrange
+    legal_moves = bitboard.legal_moves
+    flips = bitboard.flips
+    wins = draws = losses = total = 0
+    for _ in range(count):
+        own, opp = (white, black) if white_to_move else (black, white)
+        # 1 局の間は own / opp を入れ替えながら打ち、parity で開始時の手番側かどうかを追う
+        parity = 0
+        passes = 0
+        while passes < 2:
+            moves = legal_moves(own, opp, size)
+            if not moves:
+                passes += 1
+            else:
+                passes = 0
+                for _ in range(randrange(bitboard.popcount(moves))):
+                    moves &= moves - 1
+                bit = moves & -moves
+                flipped = flips(bit.bit_length() - 1, own, opp, size)
+                own |= bit | flipped
+                opp &= ~flipped
+            own, opp = opp, own
+            parity ^= 1
+        if parity:
+            own, opp = opp, own
+        diff = bitboard.popcount(own) - bitboard.popcount(opp)
+        total += diff
+        if diff > 0:
+            wins += 1
+        elif diff == 0:
+            draws += 1
+        else:
+            losses += 1
+    return wins, draws, losses, total
+
+
+def rollout(game: OthelloGame, n: int, seed: int = 0,
+            workers: Optional[int] = 1) -> RolloutResult:
+    """
+    game の局面から n 局のランダムプレイアウトを行う。game 自体は変更しない。
+    workers が 2 以上 (None なら CPU 数) のときは CHUNK 局ごとにプロセスへ分けて並列に打つ。
+    """
+    board = game.board
+    size = board.size
+    worker = _rollout_batch if size * size <= 64 else _rollout_scalar
+    tasks = [(board.black, board.white, game.current_turn == Player.WHITE, size,
+              min(CHUNK, n - start), seed, chunk)
+             for chunk, start in enumerate(range(0, n, CHUNK))]
+    if workers == 1 or len(tasks) <= 1:
+        results = [worker(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(worker, tasks))
+    wins = sum(r[0] for r in results)
+    draws = sum(r[1] for r in results)
+    losses = sum(r[2] for r in results)
+    total = sum(r[3] for r in results)
+    return RolloutResult(n, wins, draws, losses, total / n if n else 0.0)
@@ -0,0 +1,85 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+from src.domain.game import OthelloGame
+
+
+class GameSessionStore:
+    """
+    サーバープロセス内でゲームを保持するストア。
+    最大件数を超えると最も長く使われていないゲームから破棄し (LRU)、
+    最後のアクセスから ttl_seconds を過ぎたゲームも破棄する (TTL)。
+    ゲームごとにロックを持ち、locked() のブロック内では同じゲームへの他の操作を待たせる。
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # game_id -> (ゲーム, 最終アクセス時刻, そのゲームのロック)
+        self._games: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def create(self, game: OthelloGame) -> str:
+        game_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict_expired()
+            self._games[game_id] = (game, self._clock(), threading.Lock())
+            while len(self._games) > self.max_sessions:
+                self._games.popitem(last=False)
+        return game_id
+
+    def get(self, game_id: str) -> Optional[OthelloGame]:
+        """ゲームを取り出し、最終アクセス時刻を更新する。存在しない・期限切れなら None"""
+        with self._lock:
+            entry = self._touch(game_id)
+        return None if entry is None else entry[0]
+
+    @contextmanager
+    def locked(self, game_id: str) -> Iterator[Optional[OthelloGame]]:
+        """
+        get と同じくゲームを取り出し、ブロックを抜けるまでそのゲームのロックを保持する。
+        スレッドをまたいで同じゲームを変更するときはこちらを使う。
+        """
+        with self._lock:
+            entry = self._touch(game_id)
+        if entry is None:
+            yield None
+            return
+        game, game_lock = entry
+        with game_lock:
+            yield game
+
+    def _touch(self, game_id: str) -> Optional[Tuple[OthelloGame, threading.Lock]]:
+        entry = self._games.get(game_id)
+        if entry is None:
+            return None
+        game, last_access, game_lock = entry
+        now = self._clock()
+        if now - last_access > self.ttl_seconds:
+            del self._games[game_id]
+            return None
+        self._games[game_id] = (game, now, game_lock)
+        self._games.move_to_end(game_id)
+        return game, game_lock
+
+    def delete(self, game_id: str) -> bool:
+        with self._lock:
+            return self._games.pop(game_id, None) is not None
+
+    def _evict_expired(self) -> None:
+        # 先頭ほど古いので、期限内のものが出てきた時点で打ち切れる
+        deadline = self._clock() - self.ttl_seconds
+        while self._games:
+            _, (_, last_access, _) = next(iter(self._games.items()))
+            if last_access >= deadline:
+                break
+            self._games.popitem(last=False)
@@ -0,0 +1,129 @@
+"""
+ビットボード演算のヘルパー。
+
+盤面の (row, col) を row * size + col 番目のビットに対応させ、
+各プレイヤーの石の配置を1つの整数で表す。Python の int は任意精度なので、
+8x8 以外の盤面サイズでも同じ演算をそのまま使える。
+方向ごとのマスクや各マスからの直線は geometry モジュールで盤面サイズごとに一度だけ作る。
+"""
+from typing import Iterator
+
+from .geometry import AXES, geometry
+
+
+def popcount(bb: int) -> int:
+    return bin(bb).count('1')
+
+
+def iter_bits(bb: int) -> Iterator[int]:
+    """立っているビットの番号を昇順に返す"""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def legal_moves(player: int, opponent: int, size: int) -> int:
+    """手番側 player が打てるマスをビットマスクで返す"""
+    g = geometry(size)
+    empty = g.full & ~(player | opponent)
+    moves = 0
+    for amount, mask in g.shifts:
+        om = opponent & mask
+        if amount > 0:
+            t = (player << amount) & om
+            for _ in range(size - 3):
+                t |= (t << amount) & om
+            moves |= (t << amount) & mask
+        else:
+            amount = -amount
+            t = (player >> amount) & om
+            for _ in range(size - 3):
+                t |= (t >> amount) & om
+            moves |= (t >> amount) & mask
+    return moves & empty
+
+
+def flips(index: int, player: int, opponent: int, size: int) -> int:
+    """
+    index に player が石を置いたときに反転する相手の石をビットマスクで返す。
+    空きマスかどうかは呼び出し側で確認すること。
+    """
+    flipped = 0
+    for ray in geometry(size).rays[index]:
+        line = 0
+        for bit in ray:
+            if bit & opponent:
+                line |= bit
+            else:
+                if bit & player:
+                    flipped |= line
+                break
+    return flipped
+
+
+def has_legal_move(player: int, opponent: int, size: int) -> bool:
+    """legal_moves と同じ判定を、最初に合法手が見つかった方向で打ち切って行う"""
+    g = geometry(size)
+    empty = g.full & ~(player | opponent)
+    for amount, mask in g.shifts:
+        om = opponent & mask
+        if amount > 0:
+            t = (player << amount) & om
+            for _ in range(size - 3):
+                t |= (t << amount) & om
+            if (t << amount) & mask & empty:
+                return True
+        else:
+            amount = -amount
+            t = (player >> amount) & om
+            for _ in range(size - 3):
+                t |= (t >> amount) & om
+            if (t >> amount) & mask & empty:
+                return True
+    return False
+
+
+def dilate(bb: int, size: int) -> int:
+    """bb の各マスの周囲 8 マスを集めたマスクを返す (bb 自身は含まない)"""
+    result = 0
+    for amount, mask in geometry(size).shifts:
+        if amount > 0:
+            result |= (bb << amount) & mask
+        else:
+            result |= (bb >> -amount) & mask
+    return result & ~bb
+
+
+def shift(bb: int, amount: int, mask: int) -> int:
+    """Geometry.shifts の (amount, mask) で bb の各マスを 1 マス隣へ動かす"""
+    if amount > 0:
+        return (bb << amount) & mask
+    return (bb >> -amount) & mask
+
+
+def stable_discs(player: int, opponent: int, size: int) -> int:
+    """
+    player の確定石 (以後どう打たれても返らない石) をビットマスクで返す。
+    4 つの軸それぞれで「その軸の直線が埋まっている・盤端に接している・軸上の隣が player の確定石」の
+    いずれかを満たす石を確定石とし、確定石が増えなくなるまで繰り返す。
+    すべての確定石を見つけるとは限らないが、返した石は必ず確定している。
+    """
+    g = geometry(size)
+    occupied = player | opponent
+    axes = []
+    for (first, second), lines, edge in zip(AXES, g.lines, g.axis_edges):
+        safe = edge
+        for line in lines:
+            if line & occupied == line:
+                safe |= line
+        axes.append((safe, g.shifts[first], g.shifts[second]))
+
+    stable = 0
+    while True:
+        candidates = player
+        for safe, (a1, m1), (a2, m2) in axes:
+            candidates &= safe | shift(stable, a1, m1) | shift(stable, a2, m2)
+        if candidates == stable:
+            return stable
+        stable = candidates
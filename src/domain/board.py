@@ -1,85 +1,204 @@
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import List, NamedTuple, Tuple, Optional
 from .cell import Cell
 from .position import Position
 from .player import Player
+from . import bitboard
+from .geometry import geometry
+
+
+class MoveRecord(NamedTuple):
+    """着手の取り消しに必要な情報。flipped は反転した石のビットマスク"""
+    index: int
+    flipped: int
+    player: Player
+    frontier: int
+    legal_cache: dict
+
+    @property
+    def flipped_indices(self) -> List[int]:
+        return list(bitboard.iter_bits(self.flipped))
 
 
-@dataclass
 class Board:
-    size: int = 8
-    cells: List[List[Cell]] = field(init=False)
-
-    def __post_init__(self):
-        # 各座標に Cell を生成し初期状態にセット
-        self.cells = [
-            [Cell(Position(row, col)) for col in range(self.size)]
-            for row in range(self.size)
-        ]
+    """
+    ビットボードで表現した盤面。
+    黒・白の石の配置をそれぞれ1つの整数 (black, white) で保持する。
+    cells は従来の Cell グリッドと同じ形のビューで、読み書きはビットボードへ反映される。
+    black / white を直接書き換えず、盤面の変更は apply_move / set_bitboards / cells を通すこと
+    (石数などの導出値を差分更新しているため)。
+    セッションごとに多数生成されるので __slots__ で属性を固定している。
+    """
+    __slots__ = ('size', 'black', 'white', '_cells',
+                 # 以下はビットボードから導出される値で、着手のたびに差分更新する
+                 '_black_count', '_white_count', '_empty_count',
+                 # フロンティア: 石に隣接する空きマス。合法手は必ずこの中にある
+                 '_frontier',
+                 # 手番ごとの合法手マスク (盤面が変わるまで再利用する)
+                 '_legal_cache')
+
+    def __init__(self, size: int = 8):
+        self.size = size
+        self._cells: Optional[List[List[Cell]]] = None
+        self._legal_cache: dict = {}
         self.initialize()
 
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.size, self.black, self.white) == (other.size, other.black, other.white)
+
+    # 可変なのでハッシュ不可 (dataclass だったときと同じ)
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'Board(size={self.size!r}, black={self.black!r}, white={self.white!r})'
+
     def initialize(self) -> None:
         mid = self.size // 2
-        self.cells[mid - 1][mid - 1].occupant = Player.WHITE
-        self.cells[mid][mid].occupant = Player.WHITE
-        self.cells[mid - 1][mid].occupant = Player.BLACK
-        self.cells[mid][mid - 1].occupant = Player.BLACK
+        size = self.size
+        white = (1 << ((mid - 1) * size + (mid - 1))) | (1 << (mid * size + mid))
+        black = (1 << ((mid - 1) * size + mid)) | (1 << (mid * size + (mid - 1)))
+        self.set_bitboards(black, white)
+
+    @property
+    def cells(self) -> List[List[Cell]]:
+        # Cell ビューは必要になったときに一度だけ生成する
+        if self._cells is None:
+            self._cells = [
+                [Cell(Position(row, col), board=self) for col in range(self.size)]
+                for row in range(self.size)
+            ]
+        return self._cells
+
+    def bitboard(self, player: Player) -> int:
+        return self.black if player == Player.BLACK else self.white
+
+    def set_bitboards(self, black: int, white: int) -> None:
+        """盤面全体をビットボードで置き換える"""
+        self.black = black
+        self.white = white
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """導出値 (石数・空きマス数・フロンティア) をビットボードから計算し直す"""
+        occupied = self.black | self.white
+        self._black_count = bitboard.popcount(self.black)
+        self._white_count = bitboard.popcount(self.white)
+        self._empty_count = self.size * self.size - self._black_count - self._white_count
+        self._frontier = bitboard.dilate(occupied, self.size) & ~occupied
+        self._legal_cache.clear()
+
+    def _get_square(self, index: int) -> Optional[Player]:
+        bit = 1 << index
+        if self.black & bit:
+            return Player.BLACK
+        if self.white & bit:
+            return Player.WHITE
+        return None
+
+    def _set_square(self, index: int, occupant: Optional[Player]) -> None:
+        bit = 1 << index
+        black = self.black & ~bit
+        white = self.white & ~bit
+        if occupant == Player.BLACK:
+            black |= bit
+        elif occupant == Player.WHITE:
+            white |= bit
+        self.set_bitboards(black, white)
+
+    def _in_bounds(self, pos: Position) -> bool:
+        return 0 <= pos.row < self.size and 0 <= pos.col < self.size
 
     def get_cell(self, pos: Position) -> Optional[Cell]:
-        if 0 <= pos.row < self.size and 0 <= pos.col < self.size:
+        if self._in_bounds(pos):
             return self.cells[pos.row][pos.col]
         return None
 
-    def is_valid_move(self, pos: Position, current_turn: Player) -> bool:
-        cell = self.get_cell(pos)
-        if cell is None or not cell.is_empty():
-            return False
+    def get_occupant(self, pos: Position) -> Optional[Player]:
+        if self._in_bounds(pos):
+            return self._get_square(pos.row * self.size + pos.col)
+        return None
 
-        for direction in self._directions():
-            if self._flippable_in_direction(pos, current_turn, direction):
-                return True
-        return False
+    def set_occupant(self, pos: Position, occupant: Optional[Player]) -> None:
+        if not self._in_bounds(pos):
+            raise ValueError(f'盤外の座標です: {pos}')
+        self._set_square(pos.row * self.size + pos.col, occupant)
+
+    def _own_and_opponent(self, current_turn: Player) -> Tuple[int, int]:
+        if current_turn == Player.BLACK:
+            return self.black, self.white
+        return self.white, self.black
+
+    def _flips(self, pos: Position, current_turn: Player) -> int:
+        """pos に打ったときの反転マスク。打てない場合は 0 を返す"""
+        if not self._in_bounds(pos):
+            return 0
+        index = pos.row * self.size + pos.col
+        if (self.black | self.white) >> index & 1:
+            return 0
+        own, opp = self._own_and_opponent(current_turn)
+        return bitboard.flips(index, own, opp, self.size)
+
+    def get_flips(self, pos: Position, current_turn: Player) -> List[Position]:
+        """pos に打ったときに反転する石の座標を返す。打てない場合は空リスト"""
+        positions = geometry(self.size).positions
+        return [positions[index]
+                for index in bitboard.iter_bits(self._flips(pos, current_turn))]
+
+    def is_valid_move(self, pos: Position, current_turn: Player) -> bool:
+        return self._flips(pos, current_turn) != 0
 
     def apply_move(self, pos: Position, current_turn: Player) -> bool:
-        if not self.is_valid_move(pos, current_turn):
-            return False
+        return self.apply_move_undoable(pos, current_turn) is not None
 
-        # 自身に石を置く
-        self.get_cell(pos).occupant = current_turn
-        # 各方向の反転対象を収集して反転
-        for direction in self._directions():
-            flippable = self._flippable_in_direction(
-                pos, current_turn, direction)
-            if isinstance(flippable, list) and flippable:
-                for cell in flippable:
-                    cell.occupant = current_turn
-        return True
-
-    def _directions(self) -> List[Tuple[int, int]]:
-        return [(-1, 0), (1, 0), (0, -1), (0, 1),
-                (-1, -1), (-1, 1), (1, -1), (1, 1)]
-
-    def _flippable_in_direction(self, pos: Position, current_turn: Player, direction: Tuple[int, int]) -> Optional[List[Cell]]:
+    def apply_move_undoable(self, pos: Position, current_turn: Player) -> Optional['MoveRecord']:
         """
-        指定方向において、反転可能な相手のセルのリストを返す。
-        反転対象が存在しない場合は None を返す。
+        apply_move と同じく着手し、undo_move で元に戻すための記録を返す。
+        不正な手の場合は盤面を変更せず None を返す。
         """
-        dr, dc = direction
-        r, c = pos.row + dr, pos.col + dc
-        flippable = []
-        opponent = current_turn.opponent()
-
-        while 0 <= r < self.size and 0 <= c < self.size:
-            cell = self.cells[r][c]
-            if cell.occupant == opponent:
-                flippable.append(cell)
-            elif cell.occupant == current_turn:
-                return flippable if flippable else None
-            else:
-                break
-            r += dr
-            c += dc
-        return None
+        flipped = self._flips(pos, current_turn)
+        if not flipped:
+            return None
+
+        # 自身に石を置き、反転対象をまとめて反転する
+        index = pos.row * self.size + pos.col
+        placed = 1 << index
+        count = bitboard.popcount(flipped)
+        record = MoveRecord(index, flipped, current_turn, self._frontier, self._legal_cache)
+        if current_turn == Player.BLACK:
+            self.black |= placed | flipped
+            self.white &= ~flipped
+            self._black_count += count + 1
+            self._white_count -= count
+        else:
+            self.white |= placed | flipped
+            self.black &= ~flipped
+            self._white_count += count + 1
+            self._black_count -= count
+        self._empty_count -= 1
+        self._frontier = (self._frontier | geometry(self.size).neighbours[index]) \
+            & ~(self.black | self.white)
+        self._legal_cache = {}
+        return record
+
+    def undo_move(self, record: 'MoveRecord') -> None:
+        """apply_move_undoable の着手を取り消す。記録は新しいものから順に渡すこと"""
+        placed = 1 << record.index
+        flipped = record.flipped
+        count = bitboard.popcount(flipped)
+        if record.player == Player.BLACK:
+            self.black &= ~(placed | flipped)
+            self.white |= flipped
+            self._black_count -= count + 1
+            self._white_count += count
+        else:
+            self.white &= ~(placed | flipped)
+            self.black |= flipped
+            self._white_count -= count + 1
+            self._black_count += count
+        self._empty_count += 1
+        self._frontier = record.frontier
+        self._legal_cache = record.legal_cache
 
     # ヘルパー: 全セルを反復するジェネレータ
     def iter_cells(self):
@@ -87,31 +206,35 @@ class Board:
             for cell in row:
                 yield cell
 
+    def legal_moves_mask(self, current_turn: Player) -> int:
+        """指定プレイヤーの合法手をビットマスクで返す"""
+        moves = self._legal_cache.get(current_turn)
+        if moves is None:
+            own, opp = self._own_and_opponent(current_turn)
+            moves = bitboard.legal_moves(own, opp, self.size) & self._frontier
+            self._legal_cache[current_turn] = moves
+        return moves
+
     # 追加: 指定プレイヤーの合法手のリストを返す
     def get_valid_moves(self, current_turn: Player) -> List[Position]:
-        moves = []
-        for row in range(self.size):
-            for col in range(self.size):
-                pos = Position(row, col)
-                if self.is_valid_move(pos, current_turn):
-                    moves.append(pos)
-        return moves
+        positions = geometry(self.size).positions
+        return [positions[index]
+                for index in bitboard.iter_bits(self.legal_moves_mask(current_turn))]
 
     # 追加: 指定プレイヤーに合法手が存在するか
     def has_valid_move(self, current_turn: Player) -> bool:
-        return len(self.get_valid_moves(current_turn)) > 0
+        moves = self._legal_cache.get(current_turn)
+        if moves is not None:
+            return moves != 0
+        if not self._frontier:
+            return False
+        own, opp = self._own_and_opponent(current_turn)
+        return bitboard.has_legal_move(own, opp, self.size)
 
     # 追加: 盤面が全て埋まっているか判定
     def is_full(self) -> bool:
-        return all(not cell.is_empty() for cell in self.iter_cells())
+        return self._empty_count == 0
 
     # 追加: 黒と白の石の数をカウントして返す (黒, 白)
     def count_discs(self) -> Tuple[int, int]:
-        black = 0
-        white = 0
-        for cell in self.iter_cells():
-            if cell.occupant == Player.BLACK:
-                black += 1
-            elif cell.occupant == Player.WHITE:
-                white += 1
-        return black, white
+        return self._black_count, self._white_count
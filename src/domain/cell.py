@@ -1,13 +1,44 @@
-from dataclasses import dataclass
 from typing import Optional
 from .position import Position
 from .player import Player
 
 
-@dataclass
 class Cell:
-    position: Position
-    occupant: Optional[Player] = None
+    """
+    盤上の1マス。
+    Board に紐付いた Cell は石の情報を自身では持たず、occupant の読み書きを
+    Board のビットボードへ委譲する。単体で生成した場合は値をそのまま保持する。
+    """
+    __slots__ = ('position', '_board', '_index', '_occupant')
+
+    def __init__(self, position: Position, occupant: Optional[Player] = None, board=None):
+        self.position = position
+        self._board = board
+        self._index = position.row * board.size + position.col if board is not None else -1
+        self._occupant = occupant
+        if board is not None and occupant is not None:
+            board._set_square(self._index, occupant)
+
+    @property
+    def occupant(self) -> Optional[Player]:
+        if self._board is None:
+            return self._occupant
+        return self._board._get_square(self._index)
+
+    @occupant.setter
+    def occupant(self, value: Optional[Player]) -> None:
+        if self._board is None:
+            self._occupant = value
+        else:
+            self._board._set_square(self._index, value)
 
     def is_empty(self) -> bool:
         return self.occupant is None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Cell):
+            return NotImplemented
+        return self.position == other.position and self.occupant == other.occupant
+
+    def __repr__(self) -> str:
+        return f'Cell(position={self.position!r}, occupant={self.occupant!r})'
@@ -1,20 +1,88 @@
 from dataclasses import dataclass, field
-from typing import Optional
-from .board import Board
+from typing import List, NamedTuple, Optional, Tuple
+from . import bitboard
+from .board import Board, MoveRecord
+from .geometry import geometry
 from .player import Player
 from .position import Position
 
 
+class StepResult(NamedTuple):
+    """OthelloGame.step の結果"""
+    flipped: List[Position]       # 反転したマス
+    current_turn: Player          # 次に打つプレイヤー (自動パス後)
+    legal_moves: List[Position]   # current_turn の合法手。終局なら空
+    passed: bool                  # 相手に合法手がなく、自動でパスしたか
+    game_over: bool
+
+
 @dataclass
 class OthelloGame:
     board: Board = field(default_factory=Board)
     current_turn: Player = Player.BLACK
+    # unmake_move 用の履歴: (着手記録 (パスなら None), 直前の手番)
+    _history: List[Tuple[Optional[MoveRecord], Player]] = field(
+        init=False, default_factory=list, repr=False, compare=False)
 
     def make_move(self, pos: Position) -> bool:
-        if self.board.apply_move(pos, self.current_turn):
-            self.current_turn = self.current_turn.opponent()
-            return True
-        return False
+        record = self.board.apply_move_undoable(pos, self.current_turn)
+        if record is None:
+            return False
+        self._history.append((record, self.current_turn))
+        self.current_turn = self.current_turn.opponent()
+        return True
+
+    def step(self, pos: Position) -> Optional[StepResult]:
+        """
+        pos に着手し、相手に合法手がなければ自動でパスする (パスも履歴に残る)。
+        次の手番・その合法手・終局かどうかを合法手の生成 1 回 (パスのときは 2 回) で求めて返す。
+        不正な手の場合は何も変更せず None を返す。
+        """
+        mover = self.current_turn
+        record = self.board.apply_move_undoable(pos, mover)
+        if record is None:
+            return None
+        self._history.append((record, mover))
+        self.current_turn = mover.opponent()
+        passed = False
+        moves = self.board.legal_moves_mask(self.current_turn)
+        if not moves:
+            moves = self.board.legal_moves_mask(mover)
+            if moves:
+                self.pass_turn()
+                passed = True
+        positions = geometry(self.board.size).positions
+        return StepResult(
+            flipped=[positions[index] for index in bitboard.iter_bits(record.flipped)],
+            current_turn=self.current_turn,
+            legal_moves=[positions[index] for index in bitboard.iter_bits(moves)],
+            passed=passed,
+            game_over=not moves,
+        )
+
+    def pass_turn(self) -> None:
+        """石を置かずに手番を相手に渡す。unmake_move で取り消せる"""
+        self._history.append((None, self.current_turn))
+        self.current_turn = self.current_turn.opponent()
+
+    def unmake_move(self) -> bool:
+        """
+        直前の make_move / pass_turn を取り消し、盤面と手番を元に戻す。
+        取り消す手がなければ False を返す。
+        """
+        if not self._history:
+            return False
+        record, previous_turn = self._history.pop()
+        if record is not None:
+            self.board.undo_move(record)
+        self.current_turn = previous_turn
+        return True
+
+    def move_history(self) -> List[Optional[Position]]:
+        """これまでの着手を古い順に返す。パスは None"""
+        size = self.board.size
+        return [None if record is None else Position(record.index // size, record.index % size)
+                for record, _ in self._history]
 
     def is_game_over(self) -> bool:
         """
@@ -65,16 +133,24 @@ class OthelloGame:
 
     @classmethod
     def from_state(cls, board_state: list, current_turn: str) -> 'OthelloGame':
-        board = Board(size=len(board_state))
-        # 各セルに対して、文字列での状態（"B", "W", None）を適用
-        for i in range(len(board_state)):
-            for j in range(len(board_state[i])):
+        """盤面が size x size の正方形 (size は 2 以上) でなければ ValueError を送出する"""
+        if not isinstance(board_state, (list, tuple)) or len(board_state) < 2:
+            raise ValueError('盤面は 2 行以上のリストである必要があります')
+        size = len(board_state)
+        for row in board_state:
+            if not isinstance(row, (list, tuple)) or len(row) != size:
+                raise ValueError(f'盤面は {size}x{size} の正方形である必要があります')
+        board = Board(size=size)
+        # 各セルの文字列での状態（"B", "W", None）をビットボードに変換する
+        black = 0
+        white = 0
+        for i in range(size):
+            for j in range(size):
                 cell_value = board_state[i][j]
                 if cell_value == 'B':
-                    board.cells[i][j].occupant = Player.BLACK
+                    black |= 1 << (i * size + j)
                 elif cell_value == 'W':
-                    board.cells[i][j].occupant = Player.WHITE
-                else:
-                    board.cells[i][j].occupant = None
+                    white |= 1 << (i * size + j)
+        board.set_bitboards(black, white)
         turn = Player.BLACK if current_turn == 'B' else Player.WHITE
         return cls(board=board, current_turn=turn)
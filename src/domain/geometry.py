@@ -0,0 +1,147 @@
+"""
+盤面サイズごとの幾何情報のキャッシュ。
+
+方向ごとのシフト量とマスク、各マスから 8 方向へ伸びる直線 (ray)、
+隣接マスのマスク、軸ごとの直線、角・X・C・辺のマス分類を盤面サイズごとに一度だけ計算し、
+同じサイズのすべての Board で共有する。マスは row * size + col 番目のビットで表す。
+"""
+from functools import lru_cache
+from typing import Tuple
+
+from .position import Position
+
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1),
+              (-1, -1), (-1, 1), (1, -1), (1, 1))
+
+CORNER = 'corner'
+X_SQUARE = 'x'
+C_SQUARE = 'c'
+EDGE = 'edge'
+INNER = 'inner'
+
+# 直線の軸ごとの DIRECTIONS の添字の組 (縦, 横, 右下がりの斜め, 右上がりの斜め)
+AXES = ((0, 1), (2, 3), (4, 7), (5, 6))
+
+
+class Geometry:
+    def __init__(self, size: int):
+        self.size = size
+        self.squares = size * size
+        self.full = (1 << self.squares) - 1
+
+        not_first_col = self.full
+        not_last_col = self.full
+        for row in range(size):
+            not_first_col &= ~(1 << (row * size))
+            not_last_col &= ~(1 << (row * size + size - 1))
+        # 方向ごとの (シフト量, シフト後に掛けるマスク)。正は左シフト
+        masks = {-1: not_last_col, 0: self.full, 1: not_first_col}
+        self.shifts: Tuple[Tuple[int, int], ...] = tuple(
+            (dr * size + dc, masks[dc]) for dr, dc in DIRECTIONS)
+
+        # rays[i]: マス i から各方向へ伸びる直線上のビット (近い順)。
+        # 挟んで返すには 2 マス以上必要なので、それより短い方向は含めない
+        rays = []
+        neighbours = []
+        for index in range(self.squares):
+            row, col = divmod(index, size)
+            square_rays = []
+            around = 0
+            for dr, dc in DIRECTIONS:
+                ray = []
+                r, c = row + dr, col + dc
+                while 0 <= r < size and 0 <= c < size:
+                    ray.append(1 << (r * size + c))
+                    r += dr
+                    c += dc
+                if ray:
+                    around |= ray[0]
+                if len(ray) >= 2:
+                    square_rays.append(tuple(ray))
+            rays.append(tuple(square_rays))
+            neighbours.append(around)
+        self.rays: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(rays)
+        self.neighbours: Tuple[int, ...] = tuple(neighbours)
+
+        self.positions: Tuple[Position, ...] = tuple(
+            Position(index // size, index % size) for index in range(self.squares))
+        self._classify()
+        self._lines()
+
+    def _classify(self) -> None:
+        size = self.size
+        last = size - 1
+        classes = [INNER] * self.squares
+        self.edges = 0
+        for index in range(self.squares):
+            row, col = divmod(index, size)
+            if row in (0, last) or col in (0, last):
+                classes[index] = EDGE
+                self.edges |= 1 << index
+
+        self.corners = 0
+        self.x_squares = 0
+        self.c_squares = 0
+        groups = []
+        for row, col in ((0, 0), (0, last), (last, 0), (last, last)):
+            dr = 1 if row == 0 else -1
+            dc = 1 if col == 0 else -1
+            corner = row * size + col
+            x_square = (row + dr) * size + (col + dc)
+            c_pair = (row * size + col + dc, (row + dr) * size + col)
+            classes[corner] = CORNER
+            classes[x_square] = X_SQUARE
+            for index in c_pair:
+                classes[index] = C_SQUARE
+            self.corners |= 1 << corner
+            self.x_squares |= 1 << x_square
+            c_mask = (1 << c_pair[0]) | (1 << c_pair[1])
+            self.c_squares |= c_mask
+            groups.append((1 << corner, 1 << x_square, c_mask))
+        self.square_classes: Tuple[str, ...] = tuple(classes)
+        # 角ごとの (角のビット, X マスのビット, C マスのマスク)
+        self.corner_groups: Tuple[Tuple[int, int, int], ...] = tuple(groups)
+
+    def _lines(self) -> None:
+        size = self.size
+        lines = []
+        axis_edges = []
+        for first, _ in AXES:
+            dr, dc = DIRECTIONS[first]
+            # 軸上の各直線を、手前側の端のマスから辿って作る
+            axis_lines = []
+            edge = 0
+            for index in range(self.squares):
+                row, col = divmod(index, size)
+                ahead = 0 <= row + dr < size and 0 <= col + dc < size
+                behind = 0 <= row - dr < size and 0 <= col - dc < size
+                if not (ahead and behind):
+                    edge |= 1 << index
+                if behind:
+                    continue
+                line = 0
+                r, c = row, col
+                while 0 <= r < size and 0 <= c < size:
+                    line |= 1 << (r * size + c)
+                    r += dr
+                    c += dc
+                axis_lines.append(line)
+            lines.append(tuple(axis_lines))
+            axis_edges.append(edge)
+        # lines[axis]: 軸 AXES[axis] 方向の直線のマスクすべて
+        self.lines: Tuple[Tuple[int, ...], ...] = tuple(lines)
+        # axis_edges[axis]: その軸の方向に盤端と接しているマス
+        self.axis_edges: Tuple[int, ...] = tuple(axis_edges)
+
+    def index(self, pos: Position) -> int:
+        return pos.row * self.size + pos.col
+
+
+# 同時に使う盤面サイズは数種類なので、それ以上は古いものから捨てる
+GEOMETRY_CACHE_SIZE = 8
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def geometry(size: int) -> Geometry:
+    """size の Geometry を返す。最近使った GEOMETRY_CACHE_SIZE 種類のサイズはキャッシュから返す"""
+    return Geometry(size)
@@ -1,7 +1,51 @@
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError
+
+# この範囲の座標の Position はあらかじめ作っておき、Position(row, col) は共有のインスタンスを返す
+INTERN_LIMIT = 32
 
 
-@dataclass(frozen=True)
 class Position:
-    row: int
-    col: int
+    """
+    盤上の座標 (変更不可)。
+    0 <= row, col < INTERN_LIMIT の整数座標では同じ座標に対して常に同じインスタンスを返すので、
+    合法手の列挙などで座標オブジェクトを新たに確保しない。
+    """
+    __slots__ = ('row', 'col')
+
+    def __new__(cls, row: int, col: int) -> 'Position':
+        if row.__class__ is int and col.__class__ is int \
+                and 0 <= row < INTERN_LIMIT and 0 <= col < INTERN_LIMIT:
+            return _INTERNED[row * INTERN_LIMIT + col]
+        return cls._create(row, col)
+
+    @classmethod
+    def _create(cls, row: int, col: int) -> 'Position':
+        pos = object.__new__(cls)
+        object.__setattr__(pos, 'row', row)
+        object.__setattr__(pos, 'col', col)
+        return pos
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.row == other.row and self.col == other.col
+
+    def __hash__(self) -> int:
+        return hash((self.row, self.col))
+
+    def __repr__(self) -> str:
+        return f'Position(row={self.row!r}, col={self.col!r})'
+
+    def __reduce__(self):
+        # 復元時も Position(row, col) を通して共有のインスタンスにする
+        return Position, (self.row, self.col)
+
+
+_INTERNED = tuple(Position._create(index // INTERN_LIMIT, index % INTERN_LIMIT)
+                  for index in range(INTERN_LIMIT * INTERN_LIMIT))
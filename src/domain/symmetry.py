@@ -0,0 +1,118 @@
+"""
+盤面の対称変換 (二面体群 D4 の 8 通り) と対称性を考慮した局面キー。
+
+変換 sym は 0..7 の番号で、(転置するか, 行を反転するか, 列を反転するか) の 3 ビットで表す。
+転置を先に行い、その後で行・列を反転する。sym = 0 は恒等変換。
+ビットボードの変換は、8 マスずつの並びを引数にした表引きで盤面サイズごとに一度だけ表を作る
+(表の大きさはマス数に比例するので、大きな盤面でも行の長さに対して指数的には増えない)。
+"""
+from functools import lru_cache
+from typing import List, Tuple
+
+from .geometry import geometry
+from .player import Player
+
+SYMMETRIES = tuple(range(8))
+
+_TRANSPOSE = 4
+_FLIP_ROWS = 2
+_FLIP_COLS = 1
+# 転置してから片方だけ反転する変換 (90 度回転) は、逆変換がもう一方の反転になる
+_INVERSE = (0, 1, 2, 3, 4, 6, 5, 7)
+
+_CHUNK_BITS = 8
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+def _map_square(row: int, col: int, size: int, sym: int) -> Tuple[int, int]:
+    if sym & _TRANSPOSE:
+        row, col = col, row
+    if sym & _FLIP_ROWS:
+        row = size - 1 - row
+    if sym & _FLIP_COLS:
+        col = size - 1 - col
+    return row, col
+
+
+class _SymmetryTables:
+    def __init__(self, size: int):
+        squares = size * size
+        # permutations[sym][i]: マス i の変換先
+        self.permutations: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(r * size + c for r, c in
+                  (_map_square(i // size, i % size, size, sym) for i in range(squares)))
+            for sym in SYMMETRIES)
+        # chunks[sym][k][v]: k 番目の 8 マス (ビット 8k..8k+7) の並びが v のときの変換後のビット
+        chunks = []
+        for perm in self.permutations:
+            per_chunk = []
+            for base in range(0, squares, _CHUNK_BITS):
+                width = min(_CHUNK_BITS, squares - base)
+                table: List[int] = [0] * (1 << width)
+                for v in range(1, 1 << width):
+                    low = v & -v
+                    table[v] = table[v ^ low] | (1 << perm[base + low.bit_length() - 1])
+                per_chunk.append(tuple(table))
+            chunks.append(tuple(per_chunk))
+        self.chunks = tuple(chunks)
+        self.size = size
+
+
+@lru_cache(maxsize=8)
+def _tables(size: int) -> _SymmetryTables:
+    return _SymmetryTables(size)
+
+
+def transform(bb: int, size: int, sym: int) -> int:
+    """ビットボード bb に変換 sym を施す"""
+    if sym == 0:
+        return bb
+    out = 0
+    for table in _tables(size).chunks[sym]:
+        out |= table[bb & _CHUNK_MASK]
+        bb >>= _CHUNK_BITS
+    return out
+
+
+def transform_index(index: int, size: int, sym: int) -> int:
+    """マス index (row * size + col) に変換 sym を施す"""
+    return _tables(size).permutations[sym][index]
+
+
+def inverse(sym: int) -> int:
+    """sym の逆変換の番号"""
+    return _INVERSE[sym]
+
+
+def canonical(black: int, white: int, size: int) -> Tuple[int, int, int]:
+    """
+    8 通りの変換のうち (black, white) が最小になるものを代表形とし、
+    (代表形の black, 代表形の white, その変換の番号) を返す。
+    """
+    best = (black, white, 0)
+    t = _tables(size)
+    for sym in SYMMETRIES[1:]:
+        b, w = black, white
+        tb = tw = 0
+        for table in t.chunks[sym]:
+            tb |= table[b & _CHUNK_MASK]
+            tw |= table[w & _CHUNK_MASK]
+            b >>= _CHUNK_BITS
+            w >>= _CHUNK_BITS
+        if tb < best[0] or (tb == best[0] and tw < best[1]):
+            best = (tb, tw, sym)
+    return best
+
+
+def position_key(black: int, white: int, white_to_move: bool, size: int) -> int:
+    """局面 (盤面と手番) を 1 つの整数に詰めたキー。衝突しない"""
+    return ((black << geometry(size).squares | white) << 1) | int(white_to_move)
+
+
+def canonical_key(board, current_turn: Player) -> Tuple[int, int]:
+    """
+    盤面と手番の対称性を同一視したキーと、board を代表形へ移す変換の番号を返す。
+    回転・鏡映で重なる局面は同じキーになる。
+    """
+    black, white, sym = canonical(board.black, board.white, board.size)
+    return position_key(black, white, current_turn == Player.WHITE, board.size), sym
@@ -0,0 +1,130 @@
+"""
+終盤の完全読み。
+残りの空きマスをすべて読み切り、最善応手と最終石差 (手番側から見た値) を求める。
+学習用局面のラベル付けなど、厳密な値が必要な場面で使う。
+"""
+import time
+from typing import NamedTuple, Optional
+
+from src.domain import bitboard
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+from .search import SearchTimeout
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable, zobrist_keys
+
+
+class EndgameResult(NamedTuple):
+    move: Optional[Position]   # None はパスまたは終局
+    score: int                 # 手番側から見た最終石差
+    nodes: int
+    elapsed_ms: float
+
+
+class EndgameSolver:
+    def __init__(self, size: int = 8, table_bits: int = 20):
+        self.size = size
+        self.keys = zobrist_keys(size)
+        self.table = TranspositionTable(table_bits)
+        self.nodes = 0
+        self._deadline = float('inf')
+
+    def solve(self, game: OthelloGame, time_ms: Optional[float] = None) -> EndgameResult:
+        """
+        手番側の最善手と最終石差を返す。time_ms を超えると SearchTimeout を送出する。
+        """
+        start = time.perf_counter()
+        self._deadline = float('inf') if time_ms is None else start + time_ms / 1000.0
+        self.nodes = 0
+        self.table.new_search()
+        board = game.board
+        white_to_move = game.current_turn == Player.WHITE
+        player, opponent = (board.white, board.black) if white_to_move else (board.black, board.white)
+        h = self.keys.hash(board.black, board.white, white_to_move)
+
+        size = self.size
+        moves = bitboard.legal_moves(player, opponent, size)
+        best_move, best_score = -1, -size * size - 1
+        if not moves:
+            best_score = self._negamax(player, opponent, h, white_to_move, -size * size, size * size)
+        else:
+            alpha, beta = -size * size, size * size
+            for index in self._order(moves, player, opponent):
+                flipped = bitboard.flips(index, player, opponent, size)
+                child_h = self.keys.after_move(h, index, flipped, white_to_move)
+                score = -self._negamax(opponent & ~flipped, player | flipped | (1 << index),
+                                       child_h, not white_to_move, -beta, -alpha)
+                if score > best_score:
+                    best_move, best_score = index, score
+                    alpha = max(alpha, score)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        move = None if best_move < 0 else Position(best_move // size, best_move % size)
+        return EndgameResult(move, best_score, self.nodes, elapsed)
+
+    def _negamax(self, player: int, opponent: int, h: int, white_to_move: bool,
+                 alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 4095 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        size = self.size
+        moves = bitboard.legal_moves(player, opponent, size)
+        if not moves:
+            if not bitboard.has_legal_move(opponent, player, size):
+                return bitboard.popcount(player) - bitboard.popcount(opponent)
+            return -self._negamax(opponent, player, h ^ self.keys.side, not white_to_move,
+                                  -beta, -alpha)
+
+        alpha_original = alpha
+        entry = self.table.probe(h)
+        if entry is not None:
+            value, flag = entry[2], entry[3]
+            if flag == EXACT:
+                return value
+            if flag == LOWER and value > alpha:
+                alpha = value
+            elif flag == UPPER and value < beta:
+                beta = value
+            if alpha >= beta:
+                return value
+
+        best_score, best_move = -size * size - 1, -1
+        for index in self._order(moves, player, opponent):
+            flipped = bitboard.flips(index, player, opponent, size)
+            child_h = self.keys.after_move(h, index, flipped, white_to_move)
+            score = -self._negamax(opponent & ~flipped, player | flipped | (1 << index),
+                                   child_h, not white_to_move, -beta, -alpha)
+            if score > best_score:
+                best_score, best_move = score, index
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= alpha_original:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        # 深さは残り空きマス数で一意に決まるので 0 として格納する
+        self.table.store(h, 0, best_score, flag, best_move)
+        return best_score
+
+    def _order(self, moves: int, player: int, opponent: int):
+        """相手の着手可能数が少ない手から読む (fastest-first)"""
+        size = self.size
+        if bitboard.popcount(moves) <= 1:
+            return list(bitboard.iter_bits(moves))
+        scored = []
+        for index in bitboard.iter_bits(moves):
+            flipped = bitboard.flips(index, player, opponent, size)
+            reply = bitboard.legal_moves(opponent & ~flipped, player | flipped | (1 << index), size)
+            scored.append((bitboard.popcount(reply), index))
+        scored.sort()
+        return [index for _, index in scored]
+
+
+def solve_endgame(game: OthelloGame, time_ms: Optional[float] = None) -> EndgameResult:
+    """game を終局まで読み切る。空きマスが 14〜20 程度までを想定している"""
+    return EndgameSolver(size=game.board.size).solve(game, time_ms=time_ms)
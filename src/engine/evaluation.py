@@ -0,0 +1,83 @@
+"""
+静的評価関数。
+手番側 (player) から見た評価値を整数で返す。角・X 打ち・着手可能数 (mobility)・
+偶数理論 (parity) を組み合わせた軽量な評価で、探索の葉と手の並べ替えに使う。
+"""
+from functools import lru_cache
+from typing import Tuple
+
+from src.domain import bitboard
+from src.domain.geometry import geometry
+
+CORNER_WEIGHT = 25
+X_SQUARE_WEIGHT = 12
+C_SQUARE_WEIGHT = 4
+MOBILITY_WEIGHT = 5
+PARITY_WEIGHT = 3
+
+# 終局時の評価値。どんな静的評価よりも大きくなるように石差に上乗せする
+WIN_SCORE = 10000
+
+
+def special_squares(size: int) -> Tuple[int, Tuple[Tuple[int, int, int], ...]]:
+    """
+    (角のマスク, 角ごとの (角のビット, X マスク, C マスク)) を返す。
+    X は角の斜め隣、C は角の縦横隣のマス。
+    """
+    g = geometry(size)
+    return g.corners, g.corner_groups
+
+
+@lru_cache(maxsize=None)
+def square_weights(size: int) -> Tuple[int, ...]:
+    """手の並べ替えに使うマスごとの重み (角が高く、空き角の隣が低い)"""
+    weights = [0] * (size * size)
+    _, groups = special_squares(size)
+    for corner, x_square, c_squares in groups:
+        weights[corner.bit_length() - 1] = CORNER_WEIGHT * 2
+        weights[x_square.bit_length() - 1] = -X_SQUARE_WEIGHT * 2
+        for index in bitboard.iter_bits(c_squares):
+            weights[index] = -C_SQUARE_WEIGHT * 2
+    return tuple(weights)
+
+
+def final_score(player: int, opponent: int) -> int:
+    """終局局面の評価値 (石差に勝敗のボーナスを加えたもの)"""
+    diff = bitboard.popcount(player) - bitboard.popcount(opponent)
+    if diff > 0:
+        return WIN_SCORE + diff
+    if diff < 0:
+        return -WIN_SCORE + diff
+    return 0
+
+
+def evaluate(player: int, opponent: int, size: int, player_moves: int = -1) -> int:
+    """
+    手番側から見た静的評価値。
+    player_moves に手番側の合法手マスクを渡すと再計算を省く。
+    """
+    if player_moves < 0:
+        player_moves = bitboard.legal_moves(player, opponent, size)
+    opponent_moves = bitboard.legal_moves(opponent, player, size)
+    score = MOBILITY_WEIGHT * (bitboard.popcount(player_moves) - bitboard.popcount(opponent_moves))
+
+    corners, groups = special_squares(size)
+    score += CORNER_WEIGHT * (bitboard.popcount(player & corners) - bitboard.popcount(opponent & corners))
+    empty = ~(player | opponent)
+    for corner, x_square, c_squares in groups:
+        if corner & empty:
+            # 空き角の隣に打っている側が不利
+            if x_square & player:
+                score -= X_SQUARE_WEIGHT
+            elif x_square & opponent:
+                score += X_SQUARE_WEIGHT
+            score -= C_SQUARE_WEIGHT * (bitboard.popcount(c_squares & player)
+                                        - bitboard.popcount(c_squares & opponent))
+
+    # 空きマスが奇数なら最後の 1 手を打てる見込みがある
+    empties = size * size - bitboard.popcount(player | opponent)
+    if empties & 1:
+        score += PARITY_WEIGHT
+    else:
+        score -= PARITY_WEIGHT
+    return score
@@ -0,0 +1,187 @@
+"""
+定石 (opening book)。
+
+棋譜の序盤 max_plies 手について、(局面, 着手) ごとの対局数・勝ち数・引き分け数を集計する。
+局面は回転・鏡映を同一視した代表形 (symmetry.canonical) の Zobrist ハッシュで、
+着手も代表形の向きのマス番号で持つ (対称な局面で同等になる着手は 1 つにまとめる)。
+ファイルは (ハッシュ, 着手) 順に並べた固定長エントリの列で、mmap して二分探索で引く。
+
+    python -m src.engine.opening_book games.bin book.bin --max-plies 20 --min-games 2
+"""
+import argparse
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.domain import symmetry
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+from src.engine.transposition import zobrist_keys
+
+MAGIC = b'OTBK'
+VERSION = 1
+HEADER = struct.Struct('<4sBBI')
+# ハッシュ, 着手 (代表形でのマス番号), 対局数, 勝ち数, 引き分け数
+ENTRY = struct.Struct('<QBIII')
+_HASH = struct.Struct('<Q')
+
+
+class BookMove(NamedTuple):
+    position: Position
+    games: int
+    wins: int
+    draws: int
+
+    @property
+    def win_rate(self) -> float:
+        """着手した側から見た勝率 (引き分けは 0.5 勝)"""
+        return (self.wins + 0.5 * self.draws) / self.games
+
+
+def _book_key(board: Board, current_turn: Player) -> Tuple[int, List[int]]:
+    """
+    局面のハッシュと、board を代表形へ移す変換をすべて返す。
+    対称な局面 (初期局面など) では複数の変換が同じ代表形になり、それらで移り合う着手は同じ手とみなす。
+    """
+    size = board.size
+    black, white, _ = symmetry.canonical(board.black, board.white, size)
+    syms = [sym for sym in symmetry.SYMMETRIES
+            if symmetry.transform(board.black, size, sym) == black
+            and symmetry.transform(board.white, size, sym) == white]
+    h = zobrist_keys(size).hash(black, white, current_turn == Player.WHITE)
+    return h, syms
+
+
+class OpeningBookBuilder:
+    def __init__(self, size: int = 8, max_plies: int = 20):
+        self.size = size
+        self.max_plies = max_plies
+        self.games = 0
+        # (ハッシュ, 着手) -> [対局数, 勝ち数, 引き分け数]
+        self._stats: Dict[Tuple[int, int], List[int]] = {}
+
+    def add_game(self, moves: Iterable[Optional[Position]]) -> None:
+        """初期局面からの着手列 (パスは None) を 1 局分取り込む"""
+        game = OthelloGame(board=Board(size=self.size))
+        plies = []
+        for ply, pos in enumerate(moves):
+            if pos is None:
+                game.pass_turn()
+                continue
+            if ply < self.max_plies:
+                h, syms = _book_key(game.board, game.current_turn)
+                index = pos.row * self.size + pos.col
+                move = min(symmetry.transform_index(index, self.size, sym) for sym in syms)
+                plies.append((h, move, game.current_turn))
+            if not game.make_move(pos):
+                raise ValueError(f'{ply + 1} 手目が不正です')
+        winner = game.get_winner()
+        for h, move, mover in plies:
+            stats = self._stats.setdefault((h, move), [0, 0, 0])
+            stats[0] += 1
+            if winner is None:
+                stats[2] += 1
+            elif winner == mover:
+                stats[1] += 1
+        self.games += 1
+
+    def write(self, path: str, min_games: int = 1) -> int:
+        """対局数が min_games 以上のエントリを書き出し、その件数を返す"""
+        entries = sorted((key, stats) for key, stats in self._stats.items()
+                         if stats[0] >= min_games)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.size, len(entries)))
+            for (h, move), (games, wins, draws) in entries:
+                f.write(ENTRY.pack(h, move, games, wins, draws))
+        os.replace(tmp_path, path)
+        return len(entries)
+
+
+class OpeningBook:
+    """定石ファイルの読み出し。複数スレッドから同時に引いてよい"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self._count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f'定石ファイルではありません: {path}')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _hash_at(self, i: int) -> int:
+        return _HASH.unpack_from(self._data, HEADER.size + i * ENTRY.size)[0]
+
+    def lookup(self, board: Board, current_turn: Player, min_games: int = 1) -> List[BookMove]:
+        """定石にある合法手を勝率の高い順 (同率なら対局数の多い順) に返す"""
+        if board.size != self.size:
+            return []
+        h, syms = _book_key(board, current_turn)
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._hash_at(mid) < h:
+                low = mid + 1
+            else:
+                high = mid
+        size = self.size
+        moves = []
+        for i in range(low, self._count):
+            entry_hash, move, games, wins, draws = ENTRY.unpack_from(
+                self._data, HEADER.size + i * ENTRY.size)
+            if entry_hash != h:
+                break
+            if games < min_games:
+                continue
+            squares = {symmetry.transform_index(move, size, symmetry.inverse(sym))
+                        for sym in syms}
+            for index in sorted(squares):
+                pos = Position(index // size, index % size)
+                # ハッシュの衝突に備えて合法手か確かめる
+                if board.is_valid_move(pos, current_turn):
+                    moves.append(BookMove(pos, games, wins, draws))
+        moves.sort(key=lambda m: (-m.win_rate, -m.games))
+        return moves
+
+    def best_move(self, board: Board, current_turn: Player,
+                  min_games: int = 1) -> Optional[BookMove]:
+        moves = self.lookup(board, current_turn, min_games)
+        return moves[0] if moves else None
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> 'OpeningBook':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main() -> None:
+    from src.infrastructure.game_records import GameRecordStore
+
+    parser = argparse.ArgumentParser(description='棋譜ファイルから定石ファイルを作る')
+    parser.add_argument('records', help='GameRecordWriter で書いた棋譜ファイル')
+    parser.add_argument('output')
+    parser.add_argument('--max-plies', type=int, default=20)
+    parser.add_argument('--min-games', type=int, default=2)
+    args = parser.parse_args()
+
+    with GameRecordStore(args.records) as store:
+        builder = OpeningBookBuilder(size=store.size, max_plies=args.max_plies)
+        for i in range(len(store)):
+            builder.add_game(store.get_game(i))
+    entries = builder.write(args.output, min_games=args.min_games)
+    print(f'{builder.games} games -> {entries} book entries: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""
+perft (指定深さまでの葉の数え上げ) と終盤の全数え上げ。
+
+局面 (OthelloGame.from_state の盤面形式と手番) から、depth 手先までの葉の数・木の中のパスの数・
+途中で終局した葉の勝敗 (root の手番側から見た勝ち / 引き分け / 負け) を数える。
+depth=None なら終局までのすべての手順を数え、葉はすべて終局局面になる (終盤の全数え上げ)。
+
+パスも 1 手として数え、depth に達する前に終局した局面はその時点で 1 葉とする
+(benchmarks/bench_perft.py と同じ数え方)。
+木は root から数手を幅優先に展開して回転・鏡映で重なる局面をまとめ、
+その局面ごとにプロセスプールで数える。ワーカーの中では (手番側の石, 相手の石, 残り深さ) を
+キーにした表で合流した局面 (transposition) を 1 度だけ数える。
+
+    python -m src.engine.perft --depth 9 --workers 4
+    python -m src.engine.perft --board '[["B", "W", null, ...], ...]' --turn W --endgame
+    python -m src.engine.perft --board position.json --endgame --json
+
+--board には盤面のリストの JSON か、{"board": ..., "current_turn": ...} を書いた JSON ファイルを渡す。
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.domain import bitboard, symmetry
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+
+# 置換表に入れる局面数の上限 (ワーカーごと)。超えた分は表に入れずに数える
+TABLE_ENTRIES = 1 << 18
+# ワーカーあたりのタスク数の目安。多いほど負荷が均等になるが、ワーカー間で合流を共有できなくなる
+TASKS_PER_WORKER = 8
+# 展開後の残り深さがこれ以下になるまでは root 側で展開しない
+MIN_TASK_DEPTH = 2
+
+# (葉, パス, 勝ち, 引き分け, 負け)。勝敗はその局面の手番側から見たもの
+Counts = Tuple[int, int, int, int, int]
+
+_LEAF: Counts = (1, 0, 0, 0, 0)
+_WIN: Counts = (1, 0, 1, 0, 0)
+_DRAW: Counts = (1, 0, 0, 1, 0)
+_LOSS: Counts = (1, 0, 0, 0, 1)
+_UNLIMITED = -1
+
+
+class PerftResult(NamedTuple):
+    depth: Optional[int]   # None は終局まで
+    nodes: int             # 葉の数
+    passes: int            # 木の中のパスの数
+    wins: int              # 終局した葉のうち root の手番側の勝ち
+    draws: int
+    losses: int
+    transpositions: int    # 置換表で数え直しを省いた局面の数
+    tasks: int             # ワーカーに渡した局面の数
+    elapsed: float         # 秒
+
+    @property
+    def terminals(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+
+def _swap(counts: Counts) -> Counts:
+    """手番が入れ替わった側から見た値にする (勝ちと負けを入れ替える)"""
+    leaves, passes, wins, draws, losses = counts
+    return leaves, passes, losses, draws, wins
+
+
+def _terminal(player: int, opponent: int) -> Counts:
+    diff = bitboard.popcount(player) - bitboard.popcount(opponent)
+    return _WIN if diff > 0 else _LOSS if diff < 0 else _DRAW
+
+
+class _Counter:
+    def __init__(self, size: int, max_entries: int = TABLE_ENTRIES):
+        self.size = size
+        self.max_entries = max_entries
+        self.table: Dict[Tuple[int, int, int], Counts] = {}
+        self.hits = 0
+
+    def count(self, player: int, opponent: int, depth: int) -> Counts:
+        """手番側 player の局面から depth 手先までを数える。depth が負なら終局まで"""
+        if depth == 0:
+            return _LEAF
+        size = self.size
+        moves = bitboard.legal_moves(player, opponent, size)
+        if not moves:
+            if not bitboard.has_legal_move(opponent, player, size):
+                return _terminal(player, opponent)
+            leaves, passes, wins, draws, losses = self.count(
+                opponent, player, depth - 1 if depth > 0 else depth)
+            return leaves, passes + 1, losses, draws, wins
+        if depth == 1:
+            return bitboard.popcount(moves), 0, 0, 0, 0
+
+        key = (player, opponent, depth)
+        cached = self.table.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        child_depth = depth - 1 if depth > 0 else depth
+        leaves = passes = wins = draws = losses = 0
+        for index in bitboard.iter_bits(moves):
+            flipped = bitboard.flips(index, player, opponent, size)
+            l, p, w, d, lo = self.count(opponent & ~flipped, player | flipped | (1 << index),
+                                        child_depth)
+            leaves += l
+            passes += p
+            wins += lo
+            draws += d
+            losses += w
+        result = (leaves, passes, wins, draws, losses)
+        if len(self.table) < self.max_entries:
+            self.table[key] = result
+        return result
+
+
+# ワーカープロセスごとの _Counter。同じワーカーに来たタスクどうしでも合流を共有する
+_worker_counters: Dict[Tuple[int, int], _Counter] = {}
+
+
+def _count_task(task: Tuple[int, int, int, int, int]) -> Tuple[Counts, int]:
+    player, opponent, depth, size, max_entries = task
+    counter = _worker_counters.get((size, max_entries))
+    if counter is None:
+        counter = _worker_counters[(size, max_entries)] = _Counter(size, max_entries)
+    hits = counter.hits
+    counts = counter.count(player, opponent, depth)
+    return counts, counter.hits - hits
+
+
+def _split(player: int, opponent: int, depth: int, size: int, target: int):
+    """
+    root から 1 手ずつ幅優先に展開し、回転・鏡映で重なる局面をまとめる。
+    展開中に終局した分とパスの数を root の手番側から見た Counts で、
+    残りの局面を {(手番側の石, 相手の石, 手番が root と逆か): 個数} で、残り深さとともに返す。
+    """
+    done = [0, 0, 0, 0, 0]
+    frontier: Dict[Tuple[int, int, bool], int] = {(player, opponent, False): 1}
+    while frontier and len(frontier) < target and (depth < 0 or depth > MIN_TASK_DEPTH):
+        expanded: Dict[Tuple[int, int, bool], int] = {}
+        for (own, opp, swapped), multiplicity in frontier.items():
+            moves = bitboard.legal_moves(own, opp, size)
+            if not moves:
+                if not bitboard.has_legal_move(opp, own, size):
+                    counts = _terminal(own, opp)
+                    for i, value in enumerate(_swap(counts) if swapped else counts):
+                        done[i] += value * multiplicity
+                    continue
+                done[1] += multiplicity
+                children = [(opp, own)]
+            else:
+                children = []
+                for index in bitboard.iter_bits(moves):
+                    flipped = bitboard.flips(index, own, opp, size)
+                    children.append((opp & ~flipped, own | flipped | (1 << index)))
+            for child_own, child_opp in children:
+                child_own, child_opp, _ = symmetry.canonical(child_own, child_opp, size)
+                key = (child_own, child_opp, not swapped)
+                expanded[key] = expanded.get(key, 0) + multiplicity
+        frontier = expanded
+        if depth > 0:
+            depth -= 1
+    return tuple(done), frontier, depth
+
+
+def perft(game: OthelloGame, depth: Optional[int], workers: Optional[int] = None,
+          max_entries: int = TABLE_ENTRIES) -> PerftResult:
+    """
+    game の局面から depth 手先まで (None なら終局まで) を数える。game は変更しない。
+    workers=1 ならプロセスを使わずに数える。
+    """
+    if depth is not None and depth < 0:
+        raise ValueError(f'深さは 0 以上である必要があります: {depth}')
+    start = time.perf_counter()
+    board = game.board
+    size = board.size
+    player, opponent = (board.black, board.white) if game.current_turn == Player.BLACK \
+        else (board.white, board.black)
+    workers = workers or os.cpu_count() or 1
+    done, frontier, remaining = _split(player, opponent, _UNLIMITED if depth is None else depth,
+                                       size, workers * TASKS_PER_WORKER)
+    totals = list(done)
+    items = list(frontier.items())
+    tasks = [(own, opp, remaining, size, max_entries) for (own, opp, _), _ in items]
+    if workers == 1:
+        counter = _Counter(size, max_entries)
+        results = [(counter.count(own, opp, remaining), 0) for own, opp, remaining, _, _ in tasks]
+        hits = counter.hits
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_count_task, tasks))
+        hits = sum(task_hits for _, task_hits in results)
+    for ((_, _, swapped), multiplicity), (counts, _) in zip(items, results):
+        for i, value in enumerate(_swap(counts) if swapped else counts):
+            totals[i] += value * multiplicity
+    nodes, passes, wins, draws, losses = totals
+    return PerftResult(depth, nodes, passes, wins, draws, losses, hits, len(tasks),
+                       time.perf_counter() - start)
+
+
+def enumerate_endgame(game: OthelloGame, workers: Optional[int] = None,
+                      max_entries: int = TABLE_ENTRIES) -> PerftResult:
+    """game の局面から終局までのすべての手順を数え、終局時の勝敗を集計する"""
+    return perft(game, None, workers=workers, max_entries=max_entries)
+
+
+def format_result(result: PerftResult) -> str:
+    depth = 'endgame' if result.depth is None else f'depth {result.depth}'
+    return (f'{depth}: {result.nodes} nodes, {result.passes} passes, '
+            f'W/D/L {result.wins}/{result.draws}/{result.losses}, '
+            f'{result.elapsed:.3f}s, {result.nodes_per_second:.0f} nodes/s '
+            f'({result.tasks} tasks, {result.transpositions} transpositions)')
+
+
+def _load_game(board: Optional[str], turn: str) -> OthelloGame:
+    if board is None:
+        return OthelloGame()
+    if board.lstrip().startswith('['):
+        return OthelloGame.from_state(json.loads(board), turn)
+    with open(board) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return OthelloGame.from_state(data, turn)
+    return OthelloGame.from_state(data['board'], data.get('current_turn', turn))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='perft と終盤の全数え上げ')
+    parser.add_argument('--board', help='盤面のリストの JSON、または局面の JSON ファイル (省略時は初期局面)')
+    parser.add_argument('--turn', choices=('B', 'W'), default='B', help='手番')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--depth', type=int, default=6)
+    group.add_argument('--endgame', action='store_true', help='終局まですべて数える')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--table-entries', type=int, default=TABLE_ENTRIES,
+                        help='ワーカーごとの置換表の局面数の上限')
+    parser.add_argument('--json', action='store_true', help='結果を JSON で出力する')
+    args = parser.parse_args()
+
+    game = _load_game(args.board, args.turn)
+    result = perft(game, None if args.endgame else args.depth, workers=args.workers,
+                   max_entries=args.table_entries)
+    if args.json:
+        data = result._asdict()
+        data['terminals'] = result.terminals
+        data['nodes_per_second'] = result.nodes_per_second
+        print(json.dumps(data))
+    else:
+        print(format_result(result))
+
+
+if __name__ == '__main__':
+    main()
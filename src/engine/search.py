@@ -0,0 +1,199 @@
+"""
+反復深化 negamax (alpha-beta) による探索エンジン。
+
+盤面は手番側/相手側のビットボード (player, opponent) の組で扱い、Board を経由せずに
+合法手生成と反転を行う。置換表は Zobrist ハッシュで引き、手の順序は
+置換表の最善手 → 静的評価 (角・相手の着手可能数) の順に並べる。
+"""
+import time
+from typing import List, NamedTuple, Optional
+
+from src.domain import bitboard
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+from .evaluation import WIN_SCORE, evaluate, final_score, square_weights
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable, zobrist_keys
+
+INFINITY = 1 << 30
+
+# 残り空きマスがこれ以下になったら、速さ優先 (相手の着手可能数が少ない順) で並べる
+FASTEST_FIRST_EMPTIES = 10
+
+
+class SearchResult(NamedTuple):
+    move: Optional[Position]   # None はパス (合法手なし)
+    score: int                 # 手番側から見た評価値。exact なら最終石差
+    depth: int                 # 読み切った深さ
+    nodes: int
+    exact: bool                # 終局まで読み切った結果か
+    elapsed_ms: float
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Searcher:
+    """
+    探索器。置換表は探索をまたいで再利用する。
+    スレッド間では共有せず、1 スレッド (プロセス) に 1 つ作ること。
+    """
+
+    def __init__(self, size: int = 8, table_bits: int = 20):
+        self.size = size
+        self.keys = zobrist_keys(size)
+        self.table = TranspositionTable(table_bits)
+        self.weights = square_weights(size)
+        self.nodes = 0
+        self._deadline = float('inf')
+
+    def search(self, game: OthelloGame, time_ms: float = 1000.0,
+               max_depth: Optional[int] = None) -> SearchResult:
+        """
+        game の手番側の最善手を time_ms ミリ秒以内で探す。
+        少なくとも深さ 1 の探索は時間に関係なく完了させる。
+        """
+        start = time.perf_counter()
+        board = game.board
+        white_to_move = game.current_turn == Player.WHITE
+        player, opponent = (board.white, board.black) if white_to_move else (board.black, board.white)
+        empties = self.size * self.size - bitboard.popcount(player | opponent)
+        limit = empties if max_depth is None else min(max_depth, empties)
+
+        self.nodes = 0
+        self.table.new_search()
+        moves = bitboard.legal_moves(player, opponent, self.size)
+        if not moves:
+            return SearchResult(None, 0, 0, 0, False, 0.0)
+
+        h = self.keys.hash(board.black, board.white, white_to_move)
+        best_move, best_score, depth_done = -1, 0, 0
+        self._deadline = float('inf')
+        for depth in range(1, max(limit, 1) + 1):
+            try:
+                move, score = self._root(player, opponent, h, white_to_move, moves, depth, best_move)
+            except SearchTimeout:
+                break
+            best_move, best_score, depth_done = move, score, depth
+            # 深さ 1 は必ず完了させ、それ以降は時間で打ち切る
+            self._deadline = start + time_ms / 1000.0
+            if time.perf_counter() >= self._deadline:
+                break
+
+        exact = depth_done >= empties
+        if exact:
+            best_score = _disc_difference(best_score)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        pos = Position(best_move // self.size, best_move % self.size)
+        return SearchResult(pos, best_score, depth_done, self.nodes, exact, elapsed)
+
+    def _root(self, player: int, opponent: int, h: int, white_to_move: bool,
+              moves: int, depth: int, previous_best: int):
+        ordered = self._order(moves, player, opponent, previous_best, depth)
+        alpha, beta = -INFINITY, INFINITY
+        best_move, best_score = ordered[0], -INFINITY
+        for index in ordered:
+            flipped = bitboard.flips(index, player, opponent, self.size)
+            child_h = self.keys.after_move(h, index, flipped, white_to_move)
+            score = -self._negamax(opponent & ~flipped, player | flipped | (1 << index),
+                                   child_h, not white_to_move, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_move, best_score = index, score
+            if score > alpha:
+                alpha = score
+        self.table.store(h, depth, best_score, EXACT, best_move)
+        return best_move, best_score
+
+    def _negamax(self, player: int, opponent: int, h: int, white_to_move: bool,
+                 depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 2047 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        size = self.size
+        moves = bitboard.legal_moves(player, opponent, size)
+        if not moves:
+            if not bitboard.has_legal_move(opponent, player, size):
+                return final_score(player, opponent)
+            # パスは深さを消費しない
+            return -self._negamax(opponent, player, h ^ self.keys.side, not white_to_move,
+                                  depth, -beta, -alpha)
+        if depth <= 0:
+            return evaluate(player, opponent, size, moves)
+
+        alpha_original = alpha
+        tt_move = -1
+        entry = self.table.probe(h)
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                value, flag = entry[2], entry[3]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value > alpha:
+                    alpha = value
+                elif flag == UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        best_score, best_move = -INFINITY, -1
+        for index in self._order(moves, player, opponent, tt_move, depth):
+            flipped = bitboard.flips(index, player, opponent, size)
+            child_h = self.keys.after_move(h, index, flipped, white_to_move)
+            score = -self._negamax(opponent & ~flipped, player | flipped | (1 << index),
+                                   child_h, not white_to_move, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score, best_move = score, index
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= alpha_original:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(h, depth, best_score, flag, best_move)
+        return best_score
+
+    def _order(self, moves: int, player: int, opponent: int, tt_move: int, depth: int) -> List[int]:
+        """置換表の手を先頭に、残りを静的な重みと相手の着手可能数で並べる"""
+        size = self.size
+        weights = self.weights
+        empties = size * size - bitboard.popcount(player | opponent)
+        scored = []
+        for index in bitboard.iter_bits(moves):
+            if index == tt_move:
+                continue
+            if depth >= 3 or empties <= FASTEST_FIRST_EMPTIES:
+                flipped = bitboard.flips(index, player, opponent, size)
+                reply = bitboard.legal_moves(opponent & ~flipped, player | flipped | (1 << index), size)
+                key = weights[index] - 8 * bitboard.popcount(reply)
+            else:
+                key = weights[index]
+            scored.append((key, index))
+        scored.sort(reverse=True)
+        ordered = [index for _, index in scored]
+        if tt_move >= 0 and moves >> tt_move & 1:
+            ordered.insert(0, tt_move)
+        return ordered
+
+
+def _disc_difference(score: int) -> int:
+    if score > WIN_SCORE // 2:
+        return score - WIN_SCORE
+    if score < -WIN_SCORE // 2:
+        return score + WIN_SCORE
+    return score
+
+
+def search(game: OthelloGame, time_ms: float = 1000.0, max_depth: Optional[int] = None,
+           searcher: Optional[Searcher] = None) -> SearchResult:
+    """時間制限付きで最善手を探す。searcher を渡すと置換表を使い回せる"""
+    if searcher is None or searcher.size != game.board.size:
+        searcher = Searcher(size=game.board.size)
+    return searcher.search(game, time_ms=time_ms, max_depth=max_depth)
@@ -0,0 +1,94 @@
+"""
+Zobrist ハッシュと置換表 (transposition table)。
+"""
+import random
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from src.domain import bitboard
+
+# 置換表に格納する値の種類
+EXACT = 0
+LOWER = 1  # fail-high: 真の値はこれ以上
+UPPER = 2  # fail-low: 真の値はこれ以下
+
+
+class ZobristKeys:
+    """
+    盤面サイズごとの Zobrist キー。
+    black[i] / white[i] はマス i に黒 / 白の石があるとき、side は白番のときに XOR する。
+    flip[i] は black[i] ^ white[i] で、石の反転を 1 回の XOR で反映するために使う。
+    """
+
+    def __init__(self, size: int, seed: int = 0x0E110):
+        rng = random.Random(seed)
+        squares = size * size
+        self.size = size
+        self.black = tuple(rng.getrandbits(64) for _ in range(squares))
+        self.white = tuple(rng.getrandbits(64) for _ in range(squares))
+        self.flip = tuple(b ^ w for b, w in zip(self.black, self.white))
+        self.side = rng.getrandbits(64)
+
+    def hash(self, black: int, white: int, white_to_move: bool) -> int:
+        h = self.side if white_to_move else 0
+        for index in bitboard.iter_bits(black):
+            h ^= self.black[index]
+        for index in bitboard.iter_bits(white):
+            h ^= self.white[index]
+        return h
+
+    def after_move(self, h: int, index: int, flipped: int, white_moved: bool) -> int:
+        """着手後のハッシュを差分で求める (手番の交代も含む)"""
+        h ^= (self.white if white_moved else self.black)[index] ^ self.side
+        flip = self.flip
+        while flipped:
+            low = flipped & -flipped
+            h ^= flip[low.bit_length() - 1]
+            flipped ^= low
+        return h
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> ZobristKeys:
+    return ZobristKeys(size)
+
+
+# エントリ: (ハッシュ, 深さ, 値, 種類, 最善手, 世代)
+Entry = Tuple[int, int, int, int, int, int]
+
+
+class TranspositionTable:
+    """
+    サイズ固定の置換表。ハッシュの下位ビットでスロットを決める。
+    置換方針: 空き・同一局面・より深い探索結果・前回以前の探索 (世代が古い) のエントリは上書きし、
+    それ以外 (今回の探索でより深く調べた結果) は残す。
+    """
+
+    def __init__(self, size_bits: int = 20):
+        self.mask = (1 << size_bits) - 1
+        self.slots: List[Optional[Entry]] = [None] * (1 << size_bits)
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def clear(self) -> None:
+        self.slots = [None] * len(self.slots)
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, h: int) -> Optional[Entry]:
+        entry = self.slots[h & self.mask]
+        if entry is not None and entry[0] == h:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, h: int, depth: int, value: int, flag: int, move: int) -> None:
+        index = h & self.mask
+        old = self.slots[index]
+        if old is None or old[0] == h or depth >= old[1] or old[5] != self.generation:
+            self.slots[index] = (h, depth, value, flag, move, self.generation)
+            self.stores += 1
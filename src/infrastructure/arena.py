@@ -0,0 +1,428 @@
+"""
+方策どうしの対戦 (トーナメント)。
+
+参加者は方策の指定 (policies.make_policy が受け付けるもの、または HTTP で着手を返すサーバー) で与え、
+総当たり (round-robin) または先頭の参加者と残り全員の対戦 (gauntlet) をプロセスプールで行う。
+各組み合わせは同じ序盤 (ランダムな数手) から先後を入れ替えた 2 局ずつ打つ。
+対戦はタスク (1 組み合わせ × games_per_task 個の序盤) ごとにチェックポイントへ記録するので、
+止まっても同じ設定で再実行すれば残りのタスクだけを打つ。
+タスクの乱数は (seed, タスク番号) から決まり、ワーカー数や実行順によらない。
+
+    python -m src.infrastructure.arena --player greedy --player random \\
+        --player '{"type": "engine", "max_depth": 3, "name": "d3"}' \\
+        --mode round-robin --openings 50 --workers 4 --checkpoint arena.json
+
+参加者の指定:
+    'random' / 'greedy' / 'engine' または {'type': ..., 'name': ...} の辞書
+    {'type': 'http', 'url': 'http://host:8080', 'time_ms': 100} は /bestmove に局面を送って着手を得る
+    {'name': ..., 'policy': 呼び出し可能オブジェクト} (workers > 1 ではピックル可能であること)
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from src.application import codec
+from src.application.policies import Policy, make_policy
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+
+ROUND_ROBIN = 'round-robin'
+GAUNTLET = 'gauntlet'
+MODES = (ROUND_ROBIN, GAUNTLET)
+
+# 信頼区間の z 値 (95%)
+Z_95 = 1.96
+
+PlayerSpec = Union[str, dict]
+
+
+class HttpPolicy:
+    """
+    サーバーの /bestmove に局面を送り、返ってきた着手を打つ方策。
+    url はサーバーの基底 URL、path で別のエンドポイントを指定できる。
+    """
+
+    def __init__(self, url: str, path: str = '/bestmove', time_ms: float = 100.0,
+                 timeout: float = 30.0):
+        self.url = url.rstrip('/') + path
+        self.time_ms = time_ms
+        self.timeout = timeout
+
+    def __call__(self, game: OthelloGame, rng: random.Random) -> Position:
+        body = json.dumps({
+            'board': codec.board_to_list(game.board),
+            'current_turn': game.current_turn.value,
+            'time_ms': self.time_ms,
+        }).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.loads(response.read().decode('utf-8'))
+        if data.get('status') != 'ok' or data.get('row') is None:
+            raise ValueError(f'{self.url} から着手を得られませんでした: {data}')
+        return Position(data['row'], data['col'])
+
+
+def player_name(spec: PlayerSpec) -> str:
+    if isinstance(spec, str):
+        return spec
+    if 'name' in spec:
+        return spec['name']
+    if 'policy' in spec:
+        return getattr(spec['policy'], '__name__', type(spec['policy']).__name__)
+    return spec.get('type', '?')
+
+
+def make_player(spec: PlayerSpec) -> Policy:
+    """参加者の指定から方策を作る"""
+    if isinstance(spec, dict):
+        if 'policy' in spec:
+            return make_policy(spec['policy'])
+        if spec.get('type') == 'http':
+            return HttpPolicy(spec['url'], path=spec.get('path', '/bestmove'),
+                              time_ms=spec.get('time_ms', 100.0),
+                              timeout=spec.get('timeout', 30.0))
+        spec = {key: value for key, value in spec.items() if key != 'name'}
+    return make_policy(spec)
+
+
+def random_openings(count: int, plies: int, seed: int = 0, size: int = 8) -> List[List[int]]:
+    """
+    初期局面からランダムに plies 手打った序盤を、互いに異なるものを count 個返す。
+    各序盤はマス番号 (row * size + col) の列で、途中のパスは step に任せる。
+    """
+    rng = random.Random(seed)
+    openings = []
+    seen = set()
+    attempts = 0
+    while len(openings) < count and attempts < count * 100:
+        attempts += 1
+        game = OthelloGame(board=Board(size=size))
+        moves = []
+        for _ in range(plies):
+            pos = rng.choice(game.board.get_valid_moves(game.current_turn))
+            moves.append(pos.row * size + pos.col)
+            if game.step(pos).game_over:
+                break
+        if game.is_game_over():
+            continue
+        key = (game.board.black, game.board.white, game.current_turn)
+        if key in seen:
+            continue
+        seen.add(key)
+        openings.append(moves)
+    return openings
+
+
+def play_match_game(black: Policy, white: Policy, opening: Sequence[int],
+                    rng: random.Random, size: int = 8) -> int:
+    """序盤を打ったあと終局まで対局し、黒から見た石差を返す"""
+    game = OthelloGame(board=Board(size=size))
+    over = False
+    for index in opening:
+        over = game.step(Position(index // size, index % size)).game_over
+    while not over:
+        turn = game.current_turn
+        pos = (black if turn == Player.BLACK else white)(game, rng)
+        result = game.step(pos)
+        if result is None:
+            raise ValueError(f'{turn.value} の不正な着手です: {pos}')
+        over = result.game_over
+    black_discs, white_discs = game.board.count_discs()
+    return black_discs - white_discs
+
+
+class MatchTask(NamedTuple):
+    task_id: int
+    first: int              # 参加者の番号
+    second: int
+    first_spec: PlayerSpec
+    second_spec: PlayerSpec
+    openings: List[List[int]]
+    seed: int
+    size: int
+
+
+class MatchResult(NamedTuple):
+    task_id: int
+    first: int
+    second: int
+    wins: int               # first から見た勝ち・引き分け・負け
+    draws: int
+    losses: int
+    elapsed: float
+    worker: int             # ワーカーのプロセス ID
+
+
+def play_task(task: MatchTask) -> MatchResult:
+    """序盤ごとに first の先手 (黒) と後手 (白) で 1 局ずつ打つ"""
+    start = time.perf_counter()
+    rng = random.Random(f'{task.seed}:{task.task_id}')
+    first = make_player(task.first_spec)
+    second = make_player(task.second_spec)
+    wins = draws = losses = 0
+    for opening in task.openings:
+        for diff in (play_match_game(first, second, opening, rng, task.size),
+                     -play_match_game(second, first, opening, rng, task.size)):
+            if diff > 0:
+                wins += 1
+            elif diff == 0:
+                draws += 1
+            else:
+                losses += 1
+    return MatchResult(task.task_id, task.first, task.second, wins, draws, losses,
+                       time.perf_counter() - start, os.getpid())
+
+
+def expected_score(elo_diff: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo_diff / 400.0))
+
+
+def elo_from_score(score: float) -> float:
+    """期待得点率から Elo 差を求める。0 と 1 は有限の値に丸める"""
+    score = min(max(score, 1e-3), 1.0 - 1e-3)
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def elo_interval(wins: int, draws: int, losses: int,
+                 z: float = Z_95) -> Tuple[float, float, float]:
+    """勝ち・引き分け・負けから (Elo 差, 下限, 上限) を求める (得点率の正規近似)"""
+    games = wins + draws + losses
+    if not games:
+        return 0.0, -math.inf, math.inf
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1.0 - score) ** 2 + draws * (0.5 - score) ** 2
+                + losses * score ** 2) / games
+    margin = z * math.sqrt(variance / games)
+    return (elo_from_score(score), elo_from_score(score - margin),
+            elo_from_score(score + margin))
+
+
+class Standings:
+    """対戦結果の集計。組み合わせ (first, second) ごとに first から見た [勝ち, 引き分け, 負け] を持つ"""
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.pairs: Dict[Tuple[int, int], List[int]] = {}
+
+    def add(self, result: MatchResult) -> None:
+        stats = self.pairs.setdefault((result.first, result.second), [0, 0, 0])
+        stats[0] += result.wins
+        stats[1] += result.draws
+        stats[2] += result.losses
+
+    @property
+    def games(self) -> int:
+        return sum(sum(stats) for stats in self.pairs.values())
+
+    def ratings(self, iterations: int = 500) -> List[float]:
+        """
+        全対戦から各参加者の Elo を Bradley-Terry モデルの MM 法で推定する (平均 0)。
+        引き分けは 0.5 勝とし、全勝・全敗でも発散しないよう各組み合わせに 1 局分の引き分けを加える。
+        """
+        n = len(self.names)
+        # (i, j, 局数)
+        matches = [(i, j, sum(stats) + 1) for (i, j), stats in self.pairs.items()]
+        scores = [0.0] * n
+        for (i, j), (wins, draws, losses) in self.pairs.items():
+            scores[i] += wins + 0.5 * draws + 0.5
+            scores[j] += losses + 0.5 * draws + 0.5
+        strengths = [1.0] * n
+        for _ in range(iterations):
+            denominators = [0.0] * n
+            for i, j, games in matches:
+                share = games / (strengths[i] + strengths[j])
+                denominators[i] += share
+                denominators[j] += share
+            updated = [score / d if d else s
+                       for score, d, s in zip(scores, denominators, strengths)]
+            converged = max(abs(a / b - 1.0) for a, b in zip(updated, strengths)) < 1e-9
+            strengths = updated
+            if converged:
+                break
+        ratings = [400.0 * math.log10(s) for s in strengths]
+        mean = sum(ratings) / n if n else 0.0
+        return [r - mean for r in ratings]
+
+    def report(self) -> dict:
+        totals = [[0, 0, 0] for _ in self.names]
+        pairs = []
+        for (i, j), (wins, draws, losses) in sorted(self.pairs.items()):
+            totals[i] = [totals[i][0] + wins, totals[i][1] + draws, totals[i][2] + losses]
+            totals[j] = [totals[j][0] + losses, totals[j][1] + draws, totals[j][2] + wins]
+            elo, low, high = elo_interval(wins, draws, losses)
+            games = wins + draws + losses
+            pairs.append({
+                'first': self.names[i], 'second': self.names[j], 'games': games,
+                'wins': wins, 'draws': draws, 'losses': losses,
+                'score': (wins + 0.5 * draws) / games if games else 0.0,
+                'elo': elo, 'elo_low': low, 'elo_high': high,
+            })
+        players = []
+        for name, (wins, draws, losses), rating in zip(self.names, totals, self.ratings()):
+            games = wins + draws + losses
+            players.append({
+                'name': name, 'games': games, 'wins': wins, 'draws': draws, 'losses': losses,
+                'score': (wins + 0.5 * draws) / games if games else 0.0, 'elo': rating,
+            })
+        players.sort(key=lambda p: -p['elo'])
+        return {'games': self.games, 'players': players, 'pairs': pairs}
+
+
+def schedule(count: int, mode: str = ROUND_ROBIN) -> List[Tuple[int, int]]:
+    """対戦する参加者の組み合わせ"""
+    if mode == ROUND_ROBIN:
+        return [(i, j) for i in range(count) for j in range(i + 1, count)]
+    if mode == GAUNTLET:
+        return [(0, j) for j in range(1, count)]
+    raise ValueError(f'未知の対戦方式です: {mode}')
+
+
+def _spec_config(spec: PlayerSpec):
+    # 呼び出し可能オブジェクトは JSON にできないので名前で記録する
+    if isinstance(spec, dict) and 'policy' in spec:
+        return {'name': player_name(spec), 'policy': player_name({'policy': spec['policy']})}
+    return spec
+
+
+def _load_checkpoint(path: Optional[str], config: dict) -> dict:
+    if path is None or not os.path.exists(path):
+        return {'config': config, 'tasks': {}}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint['config'] != config:
+        raise ValueError('既存のチェックポイントと設定が異なります。別のファイルを指定してください')
+    return checkpoint
+
+
+def _save_checkpoint(path: Optional[str], checkpoint: dict) -> None:
+    if path is None:
+        return
+    with open(path + '.tmp', 'w') as f:
+        json.dump(checkpoint, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def run_tournament(players: Sequence[PlayerSpec], mode: str = ROUND_ROBIN,
+                   openings: int = 50, opening_plies: int = 4, games_per_task: int = 5,
+                   workers: Optional[int] = None, seed: int = 0, size: int = 8,
+                   checkpoint: Optional[str] = None,
+                   progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    トーナメントを行い、最終的な report (Standings.report に進捗を加えたもの) を返す。
+    組み合わせごとに 2 * openings 局打つ。progress を渡すと、タスクが終わるたびに
+    その時点の report を渡して呼ぶ。report['workers'] はワーカーごとの局/秒。
+    workers=1 ならプロセスを使わずに打つ。
+    """
+    names = [player_name(spec) for spec in players]
+    if len(set(names)) != len(names):
+        raise ValueError(f'参加者の名前が重複しています: {names}')
+    pairs = schedule(len(players), mode)
+    config = {
+        'players': [_spec_config(spec) for spec in players], 'mode': mode,
+        'openings': openings, 'opening_plies': opening_plies,
+        'games_per_task': games_per_task, 'seed': seed, 'size': size,
+    }
+    state = _load_checkpoint(checkpoint, config)
+    done = state['tasks']
+
+    standings = Standings(names)
+    for entry in done.values():
+        standings.add(MatchResult(**entry))
+    opening_moves = random_openings(openings, opening_plies, seed, size)
+    tasks = []
+    for first, second in pairs:
+        for start in range(0, len(opening_moves), games_per_task):
+            task_id = len(tasks)
+            tasks.append(MatchTask(task_id, first, second, players[first], players[second],
+                                   opening_moves[start:start + games_per_task], seed, size))
+    pending = [task for task in tasks if str(task.task_id) not in done]
+    total_games = 2 * len(opening_moves) * len(pairs)
+
+    # ワーカーごとの (局数, 対局に使った秒数)
+    worker_stats: Dict[int, List[float]] = {}
+    started = time.perf_counter()
+
+    def report() -> dict:
+        data = standings.report()
+        data['total_games'] = total_games
+        data['elapsed'] = time.perf_counter() - started
+        data['workers'] = {pid: games / seconds if seconds else 0.0
+                           for pid, (games, seconds) in sorted(worker_stats.items())}
+        return data
+
+    def finish(result: MatchResult) -> None:
+        standings.add(result)
+        done[str(result.task_id)] = result._asdict()
+        _save_checkpoint(checkpoint, state)
+        stats = worker_stats.setdefault(result.worker, [0, 0.0])
+        stats[0] += result.wins + result.draws + result.losses
+        stats[1] += result.elapsed
+        if progress is not None:
+            progress(report())
+
+    if workers == 1:
+        for task in pending:
+            finish(play_task(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(play_task, task) for task in pending]):
+                finish(future.result())
+    return report()
+
+
+def format_report(report: dict) -> str:
+    lines = [f'{report["games"]}/{report["total_games"]} games, {report["elapsed"]:.1f}s',
+             f'{"player":<20}{"games":>7}{"W":>6}{"D":>6}{"L":>6}{"score":>8}{"elo":>8}']
+    for p in report['players']:
+        lines.append(f'{p["name"]:<20}{p["games"]:>7}{p["wins"]:>6}{p["draws"]:>6}'
+                     f'{p["losses"]:>6}{p["score"]:>8.3f}{p["elo"]:>8.1f}')
+    for pair in report['pairs']:
+        lines.append(f'  {pair["first"]} vs {pair["second"]}: {pair["score"]:.3f} '
+                     f'({pair["elo"]:+.0f} Elo, 95% CI {pair["elo_low"]:+.0f} .. '
+                     f'{pair["elo_high"]:+.0f}, {pair["games"]} games)')
+    if report['workers']:
+        lines.append('games/s per worker: ' + ', '.join(
+            f'{pid}: {rate:.2f}' for pid, rate in report['workers'].items()))
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='方策どうしを対戦させ、Elo と勝率を求める')
+    parser.add_argument('--player', action='append', required=True,
+                        help="'random' / 'greedy' / 'engine' または JSON (例: "
+                             "'{\"type\": \"http\", \"url\": \"http://localhost:8080\", \"name\": \"srv\"}')")
+    parser.add_argument('--mode', choices=MODES, default=ROUND_ROBIN)
+    parser.add_argument('--openings', type=int, default=50,
+                        help='組み合わせごとの序盤の数 (各序盤で先後を入れ替えて 2 局)')
+    parser.add_argument('--opening-plies', type=int, default=4)
+    parser.add_argument('--games-per-task', type=int, default=5,
+                        help='1 タスク (チェックポイントの単位) あたりの序盤の数')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--checkpoint', help='進捗を記録する JSON ファイル (再実行で続きから打つ)')
+    args = parser.parse_args()
+
+    def policy_spec(value: str):
+        return json.loads(value) if value.startswith('{') else value
+
+    def show(report: dict) -> None:
+        print(format_report(report) + '\n', flush=True)
+
+    run_tournament([policy_spec(value) for value in args.player], mode=args.mode,
+                   openings=args.openings, opening_plies=args.opening_plies,
+                   games_per_task=args.games_per_task, workers=args.workers, seed=args.seed,
+                   size=args.size, checkpoint=args.checkpoint, progress=show)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+終局した対局の棋譜ストア。
+
+データファイルは追記専用で、ヘッダーのあとに各局の着手を 1 手 1 バイト
+(row * size + col、パスは PASS_MOVE) で並べる。インデックスファイル (<path>.idx) は
+1 局につき固定長 (開始位置, 手数) のエントリを持つので、i 局目の位置は O(1) で求まる。
+読み出しは両ファイルを mmap するので、ファイル全体をメモリに読み込まずに任意の局や範囲を扱える。
+
+    with GameRecordWriter('games.bin') as writer:
+        writer.append_game(game)
+    with GameRecordStore('games.bin') as store:
+        for state in store.replay(0):
+            ...
+"""
+import mmap
+import os
+import struct
+from typing import Iterator, List, Optional, Sequence, Union
+
+from src.application import codec
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.position import Position
+
+MAGIC = b'OTGR'
+VERSION = 1
+HEADER = struct.Struct('<4sBB')
+INDEX_ENTRY = struct.Struct('<QI')
+INDEX_SUFFIX = '.idx'
+PASS_MOVE = 255
+
+
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def encode_moves(moves: Sequence[Optional[Position]], size: int = 8) -> bytes:
+    """着手列 (パスは None) を 1 手 1 バイトに変換する"""
+    return bytes(PASS_MOVE if pos is None else pos.row * size + pos.col for pos in moves)
+
+
+def decode_moves(data: bytes, size: int = 8) -> List[Optional[Position]]:
+    return [None if move == PASS_MOVE else Position(move // size, move % size) for move in data]
+
+
+class GameRecordWriter:
+    """
+    棋譜ファイルへの追記。既存のファイルを開いた場合は末尾に追加する。
+    前回の書き込みが途中で止まっていた場合は、インデックスに載っている局までに切り詰める。
+    """
+
+    def __init__(self, path: str, size: int = 8):
+        if size * size >= PASS_MOVE:
+            raise ValueError('棋譜ファイルは 15x15 以下の盤面のみ対応しています')
+        self.path = path
+        self.size = size
+        if os.path.exists(path):
+            self._data = open(path, 'r+b')
+            magic, version, stored_size = HEADER.unpack(self._data.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or stored_size != size:
+                self._data.close()
+                raise ValueError(f'盤面サイズ {size} の棋譜ファイルではありません: {path}')
+            try:
+                self._index = open(index_path(path), 'r+b')
+            except FileNotFoundError:
+                # データには局の区切りがないので、インデックスを作り直すことはできない
+                self._data.close()
+                raise ValueError(f'棋譜ファイルのインデックスがありません: {index_path(path)}') from None
+            self._recover()
+        else:
+            self._data = open(path, 'w+b')
+            self._data.write(HEADER.pack(MAGIC, VERSION, size))
+            self._index = open(index_path(path), 'w+b')
+        self._count = self._index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+        self._end = self._data.seek(0, os.SEEK_END)
+
+    def _recover(self) -> None:
+        # データより先にインデックスが書き出されていた場合は、データの末尾を越える局を捨てる
+        data_end = self._data.seek(0, os.SEEK_END)
+        entries = self._index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+        end = HEADER.size
+        while entries:
+            self._index.seek((entries - 1) * INDEX_ENTRY.size)
+            offset, length = INDEX_ENTRY.unpack(self._index.read(INDEX_ENTRY.size))
+            if offset + length <= data_end:
+                end = offset + length
+                break
+            entries -= 1
+        self._index.truncate(entries * INDEX_ENTRY.size)
+        self._data.truncate(end)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, moves: Sequence[Optional[Position]]) -> int:
+        """1 局分の着手列を追記し、その局の番号を返す"""
+        data = encode_moves(moves, self.size)
+        self._data.seek(self._end)
+        self._data.write(data)
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(INDEX_ENTRY.pack(self._end, len(data)))
+        self._end += len(data)
+        self._count += 1
+        return self._count - 1
+
+    def append_game(self, game: OthelloGame) -> int:
+        """初期局面から打たれた OthelloGame の着手履歴を追記する"""
+        return self.append(game.move_history())
+
+    def flush(self) -> None:
+        # インデックスが先に書かれて中身のない局を指さないよう、データから書き出す
+        self._data.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> 'GameRecordWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameRecordStore:
+    """
+    棋譜ファイルの読み出し。開いた時点までに追記された局が見える。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f'棋譜ファイルではありません: {path}')
+        with open(index_path(path), 'rb') as f:
+            length = os.fstat(f.fileno()).st_size
+            # 空のファイルは mmap できない
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if length else b''
+        self._count = len(self._index) // INDEX_ENTRY.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(f'棋譜 {i} は存在しません')
+        return INDEX_ENTRY.unpack_from(self._index, i * INDEX_ENTRY.size)
+
+    def moves(self, i: int) -> bytes:
+        """i 局目の着手列を 1 手 1 バイトのまま返す"""
+        offset, length = self._entry(i)
+        return self._data[offset:offset + length]
+
+    def get_game(self, i: int) -> List[Optional[Position]]:
+        """i 局目の着手列 (パスは None)"""
+        return decode_moves(self.moves(i), self.size)
+
+    def iter_moves(self, start: int = 0, stop: Optional[int] = None) -> Iterator[bytes]:
+        """[start, stop) の局の着手列を順に返す。読んだ分だけがメモリに載る"""
+        start, stop, _ = slice(start, stop).indices(self._count)
+        for i in range(start, stop):
+            offset, length = INDEX_ENTRY.unpack_from(self._index, i * INDEX_ENTRY.size)
+            yield self._data[offset:offset + length]
+
+    def replay(self, i: int, packed: bool = False) -> Iterator[Union[OthelloGame, bytes]]:
+        """
+        i 局目を初期局面から make_move で再生し、初期局面と各手の後の局面を順に返す。
+        packed=False なら同じ OthelloGame を更新しながら返すので、保持する場合は複製すること。
+        packed=True なら codec.pack_board の形式の盤面を返す。
+        """
+        game = OthelloGame(board=Board(size=self.size))
+        yield codec.pack_board(game.board) if packed else game
+        for ply, move in enumerate(self.moves(i)):
+            if move == PASS_MOVE:
+                game.pass_turn()
+            elif not game.make_move(Position(move // self.size, move % self.size)):
+                raise ValueError(f'棋譜 {i} の {ply + 1} 手目が不正です')
+            yield codec.pack_board(game.board) if packed else game
+
+    def close(self) -> None:
+        self._data.close()
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+
+    def __enter__(self) -> 'GameRecordStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
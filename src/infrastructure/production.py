@@ -0,0 +1,230 @@
+"""
+本番用のサーバー起動。
+
+server.py の Bottle アプリを waitress (マルチスレッドの WSGI サーバー) で動かし、
+待ち受けソケットを作ってから fork したワーカープロセスで共有する (pre-fork)。
+HTTP/1.1 の keep-alive、リクエストサイズの上限、SIGTERM / SIGINT での
+グレースフルシャットダウン (処理中のリクエストを終えてから終了) に対応する。
+
+    python -m src.infrastructure.production --host 0.0.0.0 --port 8080 --workers 4 --threads 8
+
+fork が使えない環境では --workers の指定にかかわらず 1 プロセスで動く。
+
+状態はワーカープロセスごとに持つ。/metrics と /legal-moves/stats はリクエストを受けた
+ワーカーの分だけを返し、/games のセッションは作ったワーカーでしか見つからない。
+そのため --workers 2 以上では --no-sessions (/games を無効にする) が必要で、
+指定がなければ警告を出して 1 ワーカーで起動する。
+
+SIGTERM / SIGINT を受けると /readyz を 503 にし、--drain-seconds の間はそのまま処理を続けて
+ロードバランサーが振り分けを止めるのを待つ。その後、処理中のリクエストを終えてから終了する。
+--debug-log を付けると /move/debug の盤面を標準出力に書き出す。書き出しはキューを介して
+別スレッド (QueueListener) が行うので、リクエストを処理するスレッドは出力を待たない。
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import signal
+import socket
+import sys
+import time
+from typing import Dict, NamedTuple, Optional
+
+import waitress
+
+from src.application import game_service, metrics
+from src.infrastructure import server
+
+logger = logging.getLogger(__name__)
+
+
+class ServerConfig(NamedTuple):
+    host: str = '127.0.0.1'
+    port: int = 8080
+    workers: int = 1
+    threads: int = 8
+    backlog: int = 1024
+    max_request_body_size: int = server.MAX_REQUEST_BODY_BYTES
+    keepalive_timeout: int = 30      # アイドルな keep-alive 接続を閉じるまでの秒数
+    shutdown_timeout: float = 10.0   # 終了時に処理中のリクエストを待つ秒数
+    book_path: Optional[str] = None  # 定石ファイル (/book と /bestmove で使う)
+    metrics: bool = False            # /metrics 用の計測を有効にする
+    profile: bool = False            # /move/debug に cProfile の結果を付ける
+    debug_log: bool = False          # /move/debug の盤面を標準出力に書き出す
+    sessions: bool = True            # /games (メモリ上のセッション) を使う。1 ワーカーのときだけ
+    drain_seconds: float = 5.0       # 終了シグナルのあと、/readyz を 503 にして処理を続ける秒数
+
+
+def start_debug_log(handler: Optional[logging.Handler] = None) -> logging.handlers.QueueListener:
+    """
+    game_service.debug_log の出力をキューに積み、別スレッドから handler (既定は標準出力) に書き出す。
+    戻り値の listener は stop_debug_log で止める。
+    """
+    if handler is None:
+        handler = logging.StreamHandler(sys.stdout)
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    debug_log = game_service.debug_log
+    debug_log.handlers = [logging.handlers.QueueHandler(records)]
+    debug_log.setLevel(logging.DEBUG)
+    debug_log.propagate = False
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.start()
+    return listener
+
+
+def stop_debug_log(listener: logging.handlers.QueueListener) -> None:
+    """キューに残っている分を書き出してから止め、debug_log を既定 (出力しない) に戻す"""
+    debug_log = game_service.debug_log
+    debug_log.handlers = []
+    debug_log.setLevel(logging.NOTSET)
+    debug_log.propagate = True
+    listener.stop()
+
+
+def create_listen_socket(config: ServerConfig) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((config.host, config.port))
+    sock.listen(config.backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def serve_worker(sock: socket.socket, config: ServerConfig) -> None:
+    """
+    1 プロセス分のサーバーを動かす。SIGTERM / SIGINT を受けると drain_seconds のあいだ
+    /readyz を 503 にして処理を続け、その後処理中のリクエストを終えて戻る
+    """
+    server.configure(max_request_body_size=config.max_request_body_size)
+    channels: dict = {}
+    wsgi_server = waitress.create_server(
+        server.app,
+        map=channels,
+        sockets=[sock],
+        threads=config.threads,
+        backlog=config.backlog,
+        channel_timeout=config.keepalive_timeout,
+        max_request_body_size=config.max_request_body_size,
+        ident='othello-env',
+    )
+
+    draining = {'deadline': None}
+
+    def stop(signum, frame):
+        # readiness を落とし、drain_seconds のあいだは処理を続けてから待ち受けループを抜ける
+        if draining['deadline'] is None:
+            server.set_ready(False)
+            draining['deadline'] = time.monotonic() + config.drain_seconds
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    # 書き出し用のスレッドは fork のあとでワーカーごとに作る
+    listener = start_debug_log() if config.debug_log else None
+    timeout = wsgi_server.adj.asyncore_loop_timeout
+    try:
+        while draining['deadline'] is None or time.monotonic() < draining['deadline']:
+            wsgi_server.asyncore.loop(timeout=timeout, map=channels, count=1)
+    finally:
+        wsgi_server.task_dispatcher.shutdown(cancel_pending=False,
+                                             timeout=config.shutdown_timeout)
+        wsgi_server.close()
+        if listener is not None:
+            stop_debug_log(listener)
+
+
+def run(config: ServerConfig) -> None:
+    """待ち受けソケットを作り、workers 個のプロセスで処理する。終了シグナルまで戻らない"""
+    # 定石は fork 前に mmap しておき、ワーカー間でページを共有する
+    game_service.load_opening_book(config.book_path)
+    metrics.enable(config.metrics, profile=config.profile)
+    if config.sessions and config.workers > 1:
+        logger.warning('/games sessions are kept per process; starting 1 worker '
+                       '(use --no-sessions to run %d workers)', config.workers)
+        config = config._replace(workers=1)
+    server.set_sessions_enabled(config.sessions)
+    sock = create_listen_socket(config)
+    logger.info('listening on http://%s:%d (%d workers x %d threads)',
+                config.host, sock.getsockname()[1], config.workers, config.threads)
+    if config.workers <= 1 or not hasattr(os, 'fork'):
+        serve_worker(sock, config)
+        return
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                serve_worker(sock, config)
+            except BaseException:
+                logger.exception('worker %d crashed', slot)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for slot in range(config.workers):
+        spawn(slot)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # 異常終了したワーカーは、停止中でなければ作り直す
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            logger.warning('worker %d exited (status %d), restarting', slot, status)
+            time.sleep(0.1)
+            spawn(slot)
+    sock.close()
+
+
+def main() -> None:
+    defaults = ServerConfig()
+    parser = argparse.ArgumentParser(description='本番用の API サーバーを起動する')
+    parser.add_argument('--host', default=defaults.host)
+    parser.add_argument('--port', type=int, default=defaults.port)
+    parser.add_argument('--workers', type=int, default=defaults.workers, help='ワーカープロセス数')
+    parser.add_argument('--threads', type=int, default=defaults.threads, help='プロセスごとのスレッド数')
+    parser.add_argument('--backlog', type=int, default=defaults.backlog)
+    parser.add_argument('--max-request-body-size', type=int, default=defaults.max_request_body_size)
+    parser.add_argument('--keepalive-timeout', type=int, default=defaults.keepalive_timeout)
+    parser.add_argument('--shutdown-timeout', type=float, default=defaults.shutdown_timeout)
+    parser.add_argument('--book', default=defaults.book_path, help='定石ファイル')
+    parser.add_argument('--metrics', action='store_true', help='/metrics 用の計測を有効にする')
+    parser.add_argument('--profile', action='store_true',
+                        help='/move/debug のレスポンスに cProfile の結果を付ける')
+    parser.add_argument('--debug-log', action='store_true',
+                        help='/move/debug の盤面を標準出力に書き出す')
+    parser.add_argument('--no-sessions', dest='sessions', action='store_false',
+                        help='/games を無効にする (--workers 2 以上で必要)')
+    parser.add_argument('--drain-seconds', type=float, default=defaults.drain_seconds,
+                        help='終了シグナルのあと /readyz を 503 にして処理を続ける秒数')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s [%(process)d] %(levelname)s %(message)s')
+    run(ServerConfig(args.host, args.port, args.workers, args.threads, args.backlog,
+                     args.max_request_body_size, args.keepalive_timeout, args.shutdown_timeout,
+                     args.book, args.metrics, args.profile, args.debug_log, args.sessions,
+                     args.drain_seconds))
+
+
+if __name__ == '__main__':
+    main()
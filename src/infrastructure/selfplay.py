@@ -0,0 +1,209 @@
+"""
+マルチプロセスの自己対局データ生成。
+
+対局をシャード (games_per_shard 局ずつ) に分けてプロセスプールで並列に生成し、
+各シャードをバイナリファイルとして出力ディレクトリに書き出す。
+完了したシャードは index.json に記録するので、途中で止まっても同じ設定で再実行すれば
+未完了のシャードだけを生成し直す。シャードごとの乱数シードは (seed, シャード番号) から
+決まるため、ワーカー数や実行順に関係なく同じ出力になる。
+
+    python -m src.infrastructure.selfplay --out data/ --games 100000 --workers 8
+
+シャードファイルの形式 (リトルエンディアン):
+    ヘッダ: b'OTSP', version (uint8), 盤面サイズ (uint8)
+    レコード (局面ごと): 黒 (uint64), 白 (uint64), 手番 (uint8: 0=黒, 1=白),
+        着手 (uint8: row * size + col, パスは 255), 結果 (int8: 手番側の calculate_reward)
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from src.application.policies import make_policy
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+
+MAGIC = b'OTSP'
+VERSION = 1
+HEADER = struct.Struct('<4sBB')
+RECORD = struct.Struct('<QQBBb')
+PASS_MOVE = 255
+INDEX_FILE = 'index.json'
+
+
+class PositionRecord(NamedTuple):
+    black: int
+    white: int
+    turn: Player
+    move: int       # row * size + col。パスは PASS_MOVE
+    outcome: int    # 手番側から見た最終結果 (+1 / 0 / -1)
+
+
+class ShardTask(NamedTuple):
+    output_dir: str
+    shard_id: int
+    games: int
+    seed: int
+    size: int
+    black_policy: Union[str, dict]
+    white_policy: Union[str, dict]
+
+
+def shard_path(output_dir: str, shard_id: int) -> str:
+    return os.path.join(output_dir, f'shard-{shard_id:06d}.bin')
+
+
+def play_game(game: OthelloGame, black, white, rng: random.Random) -> List[PositionRecord]:
+    """1 局を終局まで打ち、局面ごとのレコードを返す"""
+    size = game.board.size
+    plies: List[Tuple[int, int, Player, int]] = []
+    while not game.is_game_over():
+        board = game.board
+        turn = game.current_turn
+        if not board.has_valid_move(turn):
+            plies.append((board.black, board.white, turn, PASS_MOVE))
+            game.pass_turn()
+            continue
+        policy = black if turn == Player.BLACK else white
+        pos = policy(game, rng)
+        plies.append((board.black, board.white, turn, pos.row * size + pos.col))
+        game.make_move(pos)
+    rewards = {player: int(game.calculate_reward(player)) for player in Player}
+    return [PositionRecord(b, w, turn, move, rewards[turn]) for b, w, turn, move in plies]
+
+
+def write_shard(path: str, size: int, records: Iterator[PositionRecord]) -> int:
+    """レコードを一時ファイルに書いてから置き換え、途中までのファイルを残さない"""
+    tmp_path = path + '.tmp'
+    count = 0
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size))
+        for record in records:
+            turn = 0 if record.turn == Player.BLACK else 1
+            f.write(RECORD.pack(record.black, record.white, turn, record.move, record.outcome))
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_shard(path: str) -> Iterator[PositionRecord]:
+    with open(path, 'rb') as f:
+        magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'自己対局シャードではありません: {path}')
+        while True:
+            chunk = f.read(RECORD.size * 4096)
+            if not chunk:
+                return
+            for black, white, turn, move, outcome in RECORD.iter_unpack(chunk):
+                yield PositionRecord(black, white, Player.BLACK if turn == 0 else Player.WHITE,
+                                     move, outcome)
+
+
+def generate_shard(task: ShardTask) -> Tuple[int, int, int]:
+    """ワーカーで 1 シャード分の対局を行い (シャード番号, 局数, 局面数) を返す"""
+    rng = random.Random(f'{task.seed}:{task.shard_id}')
+    black = make_policy(task.black_policy)
+    white = make_policy(task.white_policy)
+
+    def records():
+        for _ in range(task.games):
+            yield from play_game(OthelloGame(board=Board(size=task.size)), black, white, rng)
+
+    positions = write_shard(shard_path(task.output_dir, task.shard_id), task.size, records())
+    return task.shard_id, task.games, positions
+
+
+def _load_index(output_dir: str, config: dict) -> dict:
+    path = os.path.join(output_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {'config': config, 'shards': {}}
+    with open(path) as f:
+        index = json.load(f)
+    if index['config'] != config:
+        raise ValueError('既存の index.json と設定が異なります。別の出力先を指定してください')
+    return index
+
+
+def _save_index(output_dir: str, index: dict) -> None:
+    path = os.path.join(output_dir, INDEX_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def run_selfplay(output_dir: str, num_games: int, games_per_shard: int = 1000,
+                 workers: Optional[int] = None, seed: int = 0, size: int = 8,
+                 black_policy: Union[str, dict] = 'random',
+                 white_policy: Union[str, dict] = 'random',
+                 progress=None) -> dict:
+    """
+    num_games 局を生成し、index (設定と完了シャードの一覧) を返す。
+    progress を渡すと、シャードが完了するたびに (完了局数, 全局数, 今回の実行での局/秒) で呼ぶ。
+    方策に時間制限付きのエンジンを使うと結果は実行ごとに変わる (再現性が必要なら max_depth を使う)。
+    """
+    if size * size > 64:
+        raise ValueError('シャード形式は 64 マス以下の盤面のみ対応しています')
+    os.makedirs(output_dir, exist_ok=True)
+    config = {
+        'num_games': num_games, 'games_per_shard': games_per_shard, 'seed': seed,
+        'size': size, 'black_policy': black_policy, 'white_policy': white_policy,
+    }
+    index = _load_index(output_dir, config)
+    done = index['shards']
+
+    tasks = []
+    for shard_id, start in enumerate(range(0, num_games, games_per_shard)):
+        if str(shard_id) in done and os.path.exists(shard_path(output_dir, shard_id)):
+            continue
+        games = min(games_per_shard, num_games - start)
+        tasks.append(ShardTask(output_dir, shard_id, games, seed, size, black_policy, white_policy))
+
+    started = time.perf_counter()
+    completed = sum(shard['games'] for shard in done.values())
+    generated = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(generate_shard, task) for task in tasks]):
+            shard_id, games, positions = future.result()
+            done[str(shard_id)] = {'games': games, 'positions': positions,
+                                   'file': os.path.basename(shard_path(output_dir, shard_id))}
+            _save_index(output_dir, index)
+            completed += games
+            generated += games
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                progress(completed, num_games, generated / max(elapsed, 1e-9))
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='自己対局データを生成する')
+    parser.add_argument('--out', required=True, help='出力ディレクトリ')
+    parser.add_argument('--games', type=int, required=True)
+    parser.add_argument('--shard-size', type=int, default=1000, help='1 シャードあたりの局数')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--black', default='random',
+                        help="'random' / 'greedy' / 'engine' または JSON (例: '{\"type\": \"engine\", \"max_depth\": 3}')")
+    parser.add_argument('--white', default='random')
+    args = parser.parse_args()
+
+    def policy_spec(value: str):
+        return json.loads(value) if value.startswith('{') else value
+
+    def report(completed: int, total: int, rate: float) -> None:
+        print(f'{completed}/{total} games ({rate:.1f} games/s)', flush=True)
+
+    run_selfplay(args.out, args.games, games_per_shard=args.shard_size, workers=args.workers,
+                 seed=args.seed, size=args.size, black_policy=policy_spec(args.black),
+                 white_policy=policy_spec(args.white), progress=report)
+
+
+if __name__ == '__main__':
+    main()
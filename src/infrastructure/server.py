@@ -1,28 +1,279 @@
+import functools
+import json
+import time
 import bottle
-from src.application import game_service
+from src.application import codec, game_service, metrics
+
+try:
+    import msgpack
+except ImportError:  # msgpack は任意の依存
+    msgpack = None
+
+JSON_TYPE = 'application/json'
+BINARY_TYPE = 'application/octet-stream'
+MSGPACK_TYPE = 'application/x-msgpack'
+
+# リクエストボディの上限。/moves/batch で大量のジョブを受け付けられるよう Bottle の既定より大きくする
+MAX_REQUEST_BODY_BYTES = 16 * 1024 * 1024
+METRICS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
 app = bottle.Bottle()
+_state = {'ready': True, 'sessions': True}
+
+
+def configure(max_request_body_size: int = MAX_REQUEST_BODY_BYTES) -> None:
+    bottle.BaseRequest.MEMFILE_MAX = max_request_body_size
+
+
+def set_ready(ready: bool) -> None:
+    """readiness を切り替える。終了処理中は False にして新しいトラフィックを止めてもらう"""
+    _state['ready'] = ready
+
+
+def set_sessions_enabled(enabled: bool) -> None:
+    """
+    /games (メモリ上のセッション) を使えるかを切り替える。セッションはプロセスごとに持つので、
+    複数のワーカープロセスで動かすときは無効にする (別のワーカーに届いた要求ではゲームが見つからない)。
+    """
+    _state['sessions'] = enabled
+
+
+configure()
+
+
+def _timing_plugin(callback):
+    """metrics が有効なときだけ、ルートごとの処理時間をヒストグラムに記録する"""
+    def wrapper(*args, **kwargs):
+        if not metrics.enabled():
+            return callback(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            metrics.observe(metrics.REQUEST_SECONDS, time.perf_counter() - start,
+                            route=bottle.request.route.rule, method=bottle.request.method)
+    return wrapper
+
+
+app.install(_timing_plugin)
+
+
+def _read_body():
+    """Content-Type に応じてリクエストボディを辞書にする。ボディがなければ None"""
+    content_type = bottle.request.content_type.split(';')[0].strip()
+    if content_type == BINARY_TYPE:
+        return codec.decode_binary_move(bottle.request.body.read())
+    if content_type == MSGPACK_TYPE:
+        if msgpack is None:
+            raise codec.CodecError('msgpack は利用できません')
+        return msgpack.unpackb(bottle.request.body.read(), raw=False)
+    stages = metrics.stages()
+    data = bottle.request.json
+    stages.lap('parse')
+    return data
+
+
+def _response_type() -> str:
+    """
+    Accept ヘッダで明示された形式を優先し、なければリクエストと同じ形式で返す。
+    msgpack がインストールされていなければ JSON にする。
+    """
+    accept = bottle.request.get_header('Accept') or ''
+    request_type = bottle.request.content_type.split(';')[0].strip()
+    for media_type in (BINARY_TYPE, MSGPACK_TYPE, JSON_TYPE):
+        if media_type in accept:
+            break
+    else:
+        media_type = request_type if request_type in (BINARY_TYPE, MSGPACK_TYPE) else JSON_TYPE
+    if media_type == MSGPACK_TYPE and msgpack is None:
+        return JSON_TYPE
+    return media_type
+
+
+def _respond(result: dict, response_type: str):
+    if response_type == BINARY_TYPE and result.get('status') != 'error':
+        bottle.response.content_type = BINARY_TYPE
+        return codec.encode_binary_response(result)
+    if response_type == MSGPACK_TYPE:
+        bottle.response.content_type = MSGPACK_TYPE
+        return msgpack.packb(result, use_bin_type=True)
+    return result
+
+
+def _bad_request(message: str) -> dict:
+    """ボディの形が不正なリクエストは 400 で返す (盤面・着手の内容の誤りは従来どおり 200 の error)"""
+    bottle.response.status = 400
+    return {'status': 'error', 'message': message}
+
+
+def _handle_board_request(process, binary_response: bool = True):
+    """
+    盤面を受け取るエンドポイント共通の処理 (ボディの復号と応答形式の選択)。
+    リクエストの盤面形式 (format) はボディのとおりに復号し、応答の盤面形式 (response_format) は
+    Accept から決める。binary_response が False なら、バイナリ形式を求められても JSON で返す。
+    """
+    try:
+        data = _read_body()
+    except (codec.CodecError, ValueError) as e:
+        return {'status': 'error', 'message': str(e)}
+    if data is None:
+        return {'status': 'error', 'message': 'JSON ボディが必要です'}
+    if not isinstance(data, dict):
+        return _bad_request('ボディはオブジェクトである必要があります')
+    response_type = _response_type()
+    if response_type == BINARY_TYPE and not binary_response:
+        response_type = JSON_TYPE
+    if response_type == BINARY_TYPE:
+        data['response_format'] = 'bytes'
+    elif response_type == JSON_TYPE and data.get('format') == 'bytes':
+        # JSON では生のバイト列を返せないので base64 (packed) にする
+        data['response_format'] = 'packed'
+    return _respond(process(data), response_type)
+
+
+@app.route('/healthz', method='GET')
+def health():
+    return {'status': 'ok'}
+
+
+@app.route('/readyz', method='GET')
+def readiness():
+    if not _state['ready']:
+        bottle.response.status = 503
+        return {'status': 'draining'}
+    return {'status': 'ready'}
+
+
+@app.route('/metrics', method='GET')
+def metrics_endpoint():
+    bottle.response.content_type = METRICS_TYPE
+    return metrics.render()
 
 
 @app.route('/init', method='GET')
 def get_initial_state():
-    return game_service.get_initial_state()
+    response_type = _response_type()
+    fmt = 'bytes' if response_type == BINARY_TYPE else bottle.request.query.get('format', 'list')
+    if fmt == 'bytes' and response_type != BINARY_TYPE:
+        fmt = 'packed'
+    if fmt not in codec.FORMATS:
+        return {'status': 'error', 'message': f'未対応の盤面形式です: {fmt}'}
+    return _respond(game_service.get_initial_state(fmt), response_type)
 
 
 @app.route('/move', method='POST')
 def make_move():
+    return _handle_board_request(game_service.process_move)
+
+
+@app.route('/move/debug', method='POST')
+def make_move_debug():
+    return _handle_board_request(game_service.process_move_debug)
+
+
+@app.route('/legal-moves', method='POST')
+def legal_moves():
+    # 応答は着手の一覧なので、バイナリ形式 (盤面 1 枚分) では返さない
+    return _handle_board_request(game_service.get_legal_moves, binary_response=False)
+
+
+@app.route('/legal-moves/stats', method='GET')
+def legal_moves_stats():
+    return game_service.legal_moves_cache_stats()
+
+
+@app.route('/bestmove', method='POST')
+def best_move():
     data = bottle.request.json
     if data is None:
         return {'status': 'error', 'message': 'JSON ボディが必要です'}
-    return game_service.process_move(data)
+    if not isinstance(data, dict):
+        return _bad_request('ボディはオブジェクトである必要があります')
+    return game_service.find_best_move(data)
 
 
-@app.route('/move/debug', method='POST')
-def make_move_debug():
+@app.route('/book', method='POST')
+def book():
+    data = bottle.request.json
+    if data is None:
+        return {'status': 'error', 'message': 'JSON ボディが必要です'}
+    if not isinstance(data, dict):
+        return _bad_request('ボディはオブジェクトである必要があります')
+    return game_service.lookup_book(data)
+
+
+@app.route('/analyze', method='POST')
+def analyze():
+    # JSON か msgpack で受け取り、同じ形式 (Accept で指定があればそれ) で返す
+    try:
+        data = _read_body()
+    except (codec.CodecError, ValueError) as e:
+        return {'status': 'error', 'message': str(e)}
+    if data is None:
+        return {'status': 'error', 'message': 'JSON ボディが必要です'}
+    if not isinstance(data, dict):
+        return _bad_request('ボディはオブジェクトである必要があります')
+    if data.get('boards') is not None and not isinstance(data['boards'], list):
+        return _bad_request('boards はリストである必要があります')
+    try:
+        codec.check_size(data.get('size', 8))
+    except codec.CodecError as e:
+        return _bad_request(str(e))
+    response_type = _response_type()
+    if response_type == BINARY_TYPE:
+        response_type = JSON_TYPE
+    return _respond(game_service.analyze_positions(data), response_type)
+
+
+@app.route('/moves/batch', method='POST')
+def make_moves_batch():
+    data = bottle.request.json
+    if data is None:
+        return {'status': 'error', 'message': 'JSON ボディが必要です'}
+    if not isinstance(data, dict):
+        return _bad_request('ボディはオブジェクトである必要があります')
+    if data.get('jobs') is not None and not isinstance(data['jobs'], list):
+        return _bad_request('jobs はリストである必要があります')
+    if data.get('stream') or bottle.request.query.get('stream'):
+        # 1 行 1 結果の NDJSON で逐次返し、全結果をメモリに溜めない
+        bottle.response.content_type = 'application/x-ndjson'
+        return (json.dumps(item) + '\n'
+                for item in game_service.iter_process_moves(data))
+    return game_service.process_moves(data)
+
+
+def _require_sessions(callback):
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        if not _state['sessions']:
+            bottle.response.status = 404
+            return {'status': 'error',
+                    'message': 'このサーバーではゲームセッションを利用できません (--workers 1 で起動してください)'}
+        return callback(*args, **kwargs)
+    return wrapper
+
+
+@app.route('/games', method='POST')
+@_require_sessions
+def create_game():
+    # ボディは省略可能 (省略時は初期局面から開始)
+    data = bottle.request.json or {}
+    return game_service.create_game(data)
+
+
+@app.route('/games/<game_id>', method='GET')
+@_require_sessions
+def get_game(game_id):
+    return game_service.get_game_state(game_id)
+
+
+@app.route('/games/<game_id>/move', method='POST')
+@_require_sessions
+def make_session_move(game_id):
     data = bottle.request.json
     if data is None:
         return {'status': 'error', 'message': 'JSON ボディが必要です'}
-    return game_service.process_move_debug(data)
+    return game_service.process_session_move(game_id, data)
 
 
 if __name__ == '__main__':
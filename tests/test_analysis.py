@@ -0,0 +1,121 @@
+import random
+import unittest
+from src.application import codec
+from src.application.analysis import FEATURES, analyze, analyze_batch
+from src.application.position_cache import PositionCache
+from src.domain import symmetry
+from src.domain import bitboard
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+
+
+def random_game(plies, seed):
+    rng = random.Random(seed)
+    game = OthelloGame()
+    for _ in range(plies):
+        if game.is_game_over():
+            break
+        moves = game.board.get_valid_moves(game.current_turn)
+        if moves:
+            game.make_move(rng.choice(moves))
+        else:
+            game.pass_turn()
+    return game
+
+
+class TestStableDiscs(unittest.TestCase):
+    def test_simple_cases(self):
+        board = Board()
+        self.assertEqual(bitboard.stable_discs(board.black, board.white, 8), 0)
+        full = (1 << 64) - 1
+        self.assertEqual(bitboard.stable_discs(full & ~1, 1, 8), full & ~1)
+        # 角と、角から辺に沿って並ぶ石は確定する。相手に挟まれうる石は確定しない
+        black = codec.board_from_string('BBB.....' + 'B.......' + '.' * 48).black
+        white = 1 << 9
+        self.assertEqual(bitboard.stable_discs(black, white, 8), black)
+        self.assertEqual(bitboard.stable_discs(white, black, 8), 0)
+
+    def test_stable_discs_never_flip(self):
+        rng = random.Random(7)
+        for seed in range(30):
+            game = random_game(rng.randrange(30, 58), seed)
+            board = game.board
+            stable_black = bitboard.stable_discs(board.black, board.white, 8)
+            stable_white = bitboard.stable_discs(board.white, board.black, 8)
+            for _ in range(5):
+                child = OthelloGame(board=codec.board_from_string(
+                    codec.board_to_string(board)), current_turn=game.current_turn)
+                while not child.is_game_over():
+                    moves = child.board.get_valid_moves(child.current_turn)
+                    if moves:
+                        child.make_move(rng.choice(moves))
+                    else:
+                        child.pass_turn()
+                    self.assertEqual(child.board.black & stable_black, stable_black)
+                    self.assertEqual(child.board.white & stable_white, stable_white)
+
+
+class TestAnalyze(unittest.TestCase):
+    def test_initial_position(self):
+        result = analyze(Board(), Player.BLACK)
+        self.assertEqual(result.mobility, 4)
+        self.assertEqual(result.opponent_mobility, 4)
+        self.assertEqual(result.frontier, 2)
+        self.assertEqual(result.opponent_frontier, 2)
+        self.assertEqual((result.stable, result.opponent_stable), (0, 0))
+        self.assertEqual((result.corners, result.x_squares), (0, 0))
+        self.assertEqual((result.discs, result.opponent_discs), (2, 2))
+        self.assertEqual((result.empties, result.parity), (60, 0))
+
+    def test_perspective_and_squares(self):
+        board = codec.board_from_string('W.......' + '.B......' + '.' * 48)
+        black = analyze(board, Player.BLACK)
+        white = analyze(board, Player.WHITE)
+        self.assertEqual((black.x_squares, black.opponent_corners), (1, 1))
+        self.assertEqual((white.corners, white.opponent_x_squares), (1, 1))
+        self.assertEqual((white.stable, white.opponent_stable), (1, 0))
+        self.assertEqual(black.mobility, white.opponent_mobility)
+        self.assertEqual(black.parity, 0)
+
+    def test_matches_board_queries(self):
+        for seed in range(10):
+            game = random_game(20 + seed, seed)
+            board, turn = game.board, game.current_turn
+            result = analyze(board, turn)
+            self.assertEqual(result.mobility, len(board.get_valid_moves(turn)))
+            self.assertEqual(result.opponent_mobility,
+                             len(board.get_valid_moves(turn.opponent())))
+            frontier = 0
+            for cell in board.iter_cells():
+                row, col = cell.position.row, cell.position.col
+                if cell.occupant == turn and any(
+                        0 <= row + dr < 8 and 0 <= col + dc < 8
+                        and board.get_occupant(Position(row + dr, col + dc)) is None
+                        for dr in (-1, 0, 1) for dc in (-1, 0, 1)):
+                    frontier += 1
+            self.assertEqual(result.frontier, frontier)
+
+    def test_batch_columns(self):
+        positions = [(random_game(n, n).board, Player.BLACK) for n in range(5)]
+        columns = analyze_batch(positions)
+        self.assertEqual(tuple(columns), FEATURES)
+        for i, (board, turn) in enumerate(positions):
+            self.assertEqual(tuple(columns[name][i] for name in FEATURES), analyze(board, turn))
+
+    def test_batch_with_cache_shares_symmetric_positions(self):
+        board = random_game(12, 7).board
+        positions = []
+        for sym in symmetry.SYMMETRIES:
+            variant = Board()
+            variant.set_bitboards(symmetry.transform(board.black, 8, sym),
+                                  symmetry.transform(board.white, 8, sym))
+            positions.append((variant, Player.WHITE))
+        cache = PositionCache()
+        self.assertEqual(analyze_batch(positions, cache=cache), analyze_batch(positions))
+        self.assertEqual((cache.misses, cache.hits), (1, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
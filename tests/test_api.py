@@ -1,7 +1,26 @@
+import json
+import logging
+import os
+import random
+import tempfile
 import unittest
 from webtest import TestApp
+from src.application import codec, game_service, metrics
+from src.application.policies import random_policy
+from src.domain.game import OthelloGame
+from src.engine.opening_book import OpeningBookBuilder
+from src.infrastructure import server
+from src.infrastructure.selfplay import play_game
 from src.infrastructure.server import app as bottle_app
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# 白が (2, 0) に打つと黒に合法手がなくなる局面
+PASS_POSITION = '.........B........B.....BWBBB...W..BB.......B...................'
+
 
 class TestAPIServer(unittest.TestCase):
     def setUp(self):
@@ -47,6 +66,355 @@ class TestAPIServer(unittest.TestCase):
         data = resp.json
         self.assertEqual(data['status'], 'invalid move')
 
+    def test_session_create_and_move(self):
+        resp = self.app.post_json('/games', {})
+        data = resp.json
+        self.assertEqual(data['status'], 'created')
+        self.assertEqual(data['current_turn'], 'B')
+        self.assertIn([2, 3], data['legal_moves'])
+
+        resp = self.app.post_json(
+            '/games/%s/move' % data['game_id'], {'row': 2, 'col': 3})
+        diff = resp.json
+        self.assertEqual(diff['status'], 'move accepted')
+        self.assertEqual(diff['placed'], [2, 3])
+        self.assertEqual(diff['flipped'], [[3, 3]])
+        self.assertEqual(diff['current_turn'], 'W')
+        self.assertFalse(diff['passed'])
+        self.assertNotIn('board', diff)
+        self.assertFalse(diff['game_over'])
+
+        # 盤面全体を取り直すと差分が反映されている
+        state = self.app.get('/games/%s' % data['game_id']).json
+        self.assertEqual(state['board'][3][3], 'B')
+        self.assertEqual(state['legal_moves'], diff['legal_moves'])
+
+    def test_move_reports_auto_pass(self):
+        board = codec.board_from_string(PASS_POSITION)
+        data = self.app.post_json('/move', {
+            'board': codec.board_to_list(board), 'current_turn': 'W', 'row': 2, 'col': 0}).json
+        self.assertEqual(data['status'], 'move accepted')
+        self.assertTrue(data['passed'])
+        self.assertEqual(data['current_turn'], 'W')
+        self.assertEqual(data['flipped'], [[3, 0]])
+        self.assertTrue(data['legal_moves'])
+        self.assertFalse(data['game_over'])
+
+    def test_session_invalid_move_and_unknown_game(self):
+        game_id = self.app.post_json('/games', {}).json['game_id']
+        resp = self.app.post_json('/games/%s/move' % game_id, {'row': 0, 'col': 0})
+        self.assertEqual(resp.json['status'], 'invalid move')
+        self.assertEqual(resp.json['current_turn'], 'B')
+
+        resp = self.app.post_json('/games/unknown/move', {'row': 2, 'col': 3})
+        self.assertEqual(resp.json['status'], 'error')
+
+    def test_moves_batch_sequence(self):
+        init_data = self.app.get('/init').json
+        body = dict(init_data, moves=[[2, 3], [2, 2], [0, 0]], include_states=True)
+        data = self.app.post_json('/moves/batch', body).json
+        self.assertEqual(data['status'], 'ok')
+        statuses = [r['status'] for r in data['results']]
+        self.assertEqual(statuses, ['move accepted', 'move accepted', 'invalid move'])
+        self.assertEqual(data['results'][1]['board'], data['board'])
+        self.assertEqual(data['current_turn'], 'B')
+        self.assertEqual(data['board'][2][2], 'W')
+        self.assertFalse(data['game_over'])
+
+    def test_moves_batch_jobs(self):
+        init_data = self.app.get('/init').json
+        jobs = [dict(init_data, row=2, col=3), dict(init_data, row=3, col=3)]
+        data = self.app.post_json('/moves/batch', {'jobs': jobs}).json
+        self.assertEqual([r['status'] for r in data['results']],
+                         ['move accepted', 'invalid move'])
+        self.assertEqual([r['index'] for r in data['results']], [0, 1])
+
+    def test_moves_batch_stream(self):
+        init_data = self.app.get('/init').json
+        body = dict(init_data, moves=[[2, 3], [2, 2]])
+        resp = self.app.post_json('/moves/batch?stream=1', body)
+        self.assertEqual(resp.content_type, 'application/x-ndjson')
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[-1]['final'])
+        self.assertNotIn('board', lines[0])
+
+    def test_moves_batch_invalid_ply_and_pass(self):
+        init_data = self.app.get('/init').json
+        body = dict(init_data, moves=[[2, 3], [5], 'x', None, [5, 5]])
+        data = self.app.post_json('/moves/batch', body).json
+        self.assertEqual(data['status'], 'ok')
+        self.assertEqual([r['status'] for r in data['results']],
+                         ['move accepted', 'error', 'error', 'pass', 'move accepted'])
+        self.assertEqual([r['ply'] for r in data['results']], [0, 1, 2, 3, 4])
+        # 白がパスしたので [5, 5] は黒の着手になる
+        self.assertEqual(data['board'][5][5], 'B')
+
+        resp = self.app.post_json('/moves/batch?stream=1', dict(init_data, moves=[[5], [2, 3]]))
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertEqual([line.get('status') for line in lines[:2]], ['error', 'move accepted'])
+        self.assertTrue(lines[-1]['final'])
+
+        data = self.app.post_json('/moves/batch', {'board': 'BW', 'format': 'string',
+                                                   'current_turn': 'B', 'moves': []}).json
+        self.assertEqual(data['status'], 'error')
+
+    def test_moves_batch_auto_pass_matches_move(self):
+        board = codec.board_from_string(PASS_POSITION)
+        body = {'board': codec.board_to_list(board), 'current_turn': 'W'}
+        single = self.app.post_json('/move', dict(body, row=2, col=0)).json
+        batch = self.app.post_json('/moves/batch', dict(body, moves=[[2, 0]])).json
+        self.assertTrue(batch['results'][0]['passed'])
+        self.assertEqual(batch['current_turn'], single['current_turn'])
+        self.assertEqual(batch['board'], single['board'])
+
+    def test_board_size_is_validated(self):
+        board = codec.board_to_string(OthelloGame().board)
+        for size in ('8', 0, 1, 7, 64, True):
+            data = self.app.post_json('/move', {'board': board, 'format': 'string', 'size': size,
+                                                'current_turn': 'B', 'row': 2, 'col': 3}).json
+            self.assertEqual(data['status'], 'error', size)
+        huge = [[None] * 64 for _ in range(64)]
+        data = self.app.post_json('/legal-moves', {'board': huge, 'current_turn': 'B'}).json
+        self.assertEqual(data['status'], 'error')
+        self.app.post_json('/move', [1], status=400)
+
+    def test_non_square_board_is_rejected(self):
+        board = self.app.get('/init').json['board']
+        board[7] = board[7] + ['B']
+        for path, body in (('/move', {'row': 2, 'col': 3}), ('/legal-moves', {}),
+                           ('/bestmove', {}), ('/games', {})):
+            data = self.app.post_json(path, dict(body, board=board, current_turn='B')).json
+            self.assertEqual(data['status'], 'error', path)
+
+    def test_moves_batch_rejects_malformed_body(self):
+        self.app.post_json('/moves/batch', [1], status=400)
+        self.app.post_json('/moves/batch', {'jobs': 5}, status=400)
+        init_data = self.app.get('/init').json
+        data = self.app.post_json('/moves/batch', {'jobs': [1, dict(init_data, row=2, col=3)]}).json
+        self.assertEqual([r['status'] for r in data['results']], ['error', 'move accepted'])
+
+    def test_moves_batch_missing_params(self):
+        data = self.app.post_json('/moves/batch', {'moves': []}).json
+        self.assertEqual(data['status'], 'error')
+
+    def test_bestmove_endpoint(self):
+        init_data = self.app.get('/init').json
+        body = dict(init_data, time_ms=100, max_depth=3)
+        data = self.app.post_json('/bestmove', body).json
+        self.assertEqual(data['status'], 'ok')
+        self.assertIn([data['row'], data['col']], [[2, 3], [3, 2], [4, 5], [5, 4]])
+        self.assertLessEqual(data['depth'], 3)
+        self.assertFalse(data['exact'])
+
+    def test_bestmove_rejects_bad_limits(self):
+        init_data = self.app.get('/init').json
+        for limits in ({'time_ms': 'abc'}, {'time_ms': None}, {'max_depth': 0},
+                       {'max_depth': 'deep'}, {'max_depth': 2.5}):
+            data = self.app.post_json('/bestmove', dict(init_data, **limits)).json
+            self.assertEqual(data['status'], 'error', limits)
+        self.app.post_json('/bestmove', [1], status=400)
+        # 0 以下の time_ms は最小値に切り上げて探索する
+        data = self.app.post_json('/bestmove', dict(init_data, time_ms=-5, max_depth=2)).json
+        self.assertEqual(data['status'], 'ok')
+
+    def test_book_and_bestmove_from_book(self):
+        init_data = self.app.get('/init').json
+        data = self.app.post_json('/book', init_data).json
+        self.assertEqual(data, {'status': 'ok', 'moves': []})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'book.bin')
+            builder = OpeningBookBuilder(max_plies=2)
+            for seed in range(3):
+                game = OthelloGame()
+                play_game(game, random_policy, random_policy, random.Random(seed))
+                builder.add_game(game.move_history())
+            builder.write(path)
+            game_service.load_opening_book(path)
+            try:
+                data = self.app.post_json('/book', init_data).json
+                self.assertEqual(len(data['moves']), 4)
+                self.assertEqual(data['moves'][0]['games'], 3)
+                self.assertIn('win_rate', data['moves'][0])
+
+                best = self.app.post_json('/bestmove', init_data).json
+                self.assertEqual(best['source'], 'book')
+                self.assertEqual([best['row'], best['col']],
+                                 [data['moves'][0]['row'], data['moves'][0]['col']])
+                body = dict(init_data, use_book=False, max_depth=1)
+                self.assertEqual(self.app.post_json('/bestmove', body).json['source'], 'search')
+
+                self.app.post_json('/book', [1], status=400)
+                for path_ in ('/book', '/bestmove'):
+                    data = self.app.post_json(path_, dict(init_data, min_games='x')).json
+                    self.assertEqual(data['status'], 'error')
+
+                # 読み出し中に定石を外しても、読み出しが終わるまでは閉じない
+                with game_service._using_book() as book:
+                    game_service.load_opening_book(None)
+                    self.assertFalse(book._data.closed)
+                    self.assertEqual(len(book.lookup(OthelloGame().board,
+                                                     OthelloGame().current_turn)), 4)
+                self.assertTrue(book._data.closed)
+            finally:
+                game_service.load_opening_book(None)
+
+    def test_metrics_endpoint_and_debug_profile(self):
+        metrics.enable(True, profile=True)
+        try:
+            init_data = self.app.get('/init').json
+            data = self.app.post_json('/move/debug', dict(init_data, row=2, col=3)).json
+            self.assertEqual(data['status'], 'move accepted')
+            self.assertIn('function calls', data['profile'])
+            resp = self.app.get('/metrics')
+            self.assertTrue(resp.content_type.startswith('text/plain'))
+            self.assertIn('othello_request_duration_seconds_count'
+                          '{method="POST",route="/move/debug"} 1', resp.text)
+            self.assertIn('othello_stage_duration_seconds_count{stage="parse"} 1', resp.text)
+            self.assertIn('# TYPE othello_legal_moves_cache_entries gauge', resp.text)
+        finally:
+            metrics.enable(False)
+            metrics.reset()
+        data = self.app.post_json('/move/debug', dict(init_data, row=2, col=3)).json
+        self.assertNotIn('profile', data)
+
+    def test_analyze_batch(self):
+        game = OthelloGame()
+        game.make_move(game.board.get_valid_moves(game.current_turn)[0])
+        boards = [codec.board_to_string(OthelloGame().board), codec.board_to_string(game.board)]
+        data = self.app.post_json('/analyze', {
+            'format': 'string', 'boards': boards, 'turns': 'BW'}).json
+        self.assertEqual(data['status'], 'ok')
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['features']['mobility'][0], 4)
+        self.assertEqual(data['features']['empties'][0], 60)
+        self.assertEqual(len(data['features']['stable']), 2)
+
+        single = self.app.post_json('/analyze', dict(game_service.get_initial_state())).json
+        self.assertEqual(single['features']['frontier'], [2])
+        bad = self.app.post_json('/analyze', {'boards': boards, 'turns': 'B'}).json
+        self.assertEqual(bad['status'], 'error')
+
+    def test_legal_moves_endpoint(self):
+        game_service.legal_moves_cache.clear()
+        init_data = self.app.get('/init').json
+        data = self.app.post_json('/legal-moves', init_data).json
+        self.assertEqual(data['status'], 'ok')
+        self.assertFalse(data['game_over'])
+        moves = {(m['row'], m['col']): m['flipped'] for m in data['moves']}
+        self.assertEqual(moves, {(2, 3): [[3, 3]], (3, 2): [[3, 3]],
+                                 (4, 5): [[4, 4]], (5, 4): [[4, 4]]})
+        # 盤面は変更されず、同じ局面の 2 回目はキャッシュから返る
+        self.assertEqual(self.app.post_json('/legal-moves', init_data).json, data)
+        stats = self.app.get('/legal-moves/stats').json
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+        resp = self.app.post_json('/legal-moves', {'board': init_data['board']})
+        self.assertEqual(resp.json['status'], 'error')
+
+    def test_debug_log_is_written_by_listener(self):
+        from src.infrastructure import production
+
+        class Capture(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.messages = []
+
+            def emit(self, record):
+                self.messages.append(record.getMessage())
+
+        capture = Capture()
+        listener = production.start_debug_log(capture)
+        try:
+            move_data = dict(self.app.get('/init').json, row=2, col=3)
+            self.app.post_json('/move/debug', move_data)
+        finally:
+            production.stop_debug_log(listener)
+        self.assertEqual(len(capture.messages), 1)
+        self.assertIn('move (2, 3) -> accepted', capture.messages[0])
+        self.assertFalse(game_service.debug_log.isEnabledFor(logging.DEBUG))
+
+    def test_analyze_rejects_malformed_body(self):
+        self.app.post_json('/analyze', [1], status=400)
+        self.app.post_json('/analyze', {'boards': 5, 'turns': 'B'}, status=400)
+        self.app.post_json('/analyze', {'boards': [], 'turns': [], 'size': 'x'}, status=400)
+        data = self.app.post_json('/analyze', {'boards': [], 'turns': 5}).json
+        self.assertEqual(data['status'], 'error')
+
+    def test_init_string_format(self):
+        data = self.app.get('/init?format=string').json
+        self.assertEqual(len(data['board']), 64)
+        self.assertEqual(data['board'][27:29], 'WB')
+
+    def test_move_string_and_packed_formats(self):
+        for fmt in ('string', 'packed'):
+            init_data = self.app.get('/init?format=%s' % fmt).json
+            move_data = dict(init_data, format=fmt, row=2, col=3)
+            data = self.app.post_json('/move', move_data).json
+            self.assertEqual(data['status'], 'move accepted')
+            decoded = codec.decode_board(data['board'], fmt)
+            self.assertEqual(decoded.count_discs(), (4, 1))
+
+    def test_move_binary(self):
+        init = self.app.get('/init', headers={'Accept': 'application/octet-stream'})
+        self.assertEqual(init.content_type, 'application/octet-stream')
+        self.assertEqual(init.body[16:], b'B')
+        body = init.body[:16] + b'B' + bytes([2, 3])
+        resp = self.app.post('/move', body, content_type='application/octet-stream')
+        self.assertEqual(resp.content_type, 'application/octet-stream')
+        self.assertEqual(len(resp.body), 20)
+        self.assertEqual(resp.body[16:], b'W\x01\x00-')
+        self.assertEqual(codec.unpack_board(resp.body[:16]).count_discs(), (4, 1))
+
+        # JSON を要求すれば packed 形式で返る
+        resp = self.app.post('/move', body, content_type='application/octet-stream',
+                             headers={'Accept': 'application/json'})
+        self.assertEqual(codec.decode_board(resp.json['board'], 'packed').count_discs(), (4, 1))
+
+    def test_move_json_request_binary_response(self):
+        init_data = self.app.get('/init').json
+        resp = self.app.post_json('/move', dict(init_data, row=2, col=3),
+                                  headers={'Accept': 'application/octet-stream'})
+        self.assertEqual(resp.content_type, 'application/octet-stream')
+        self.assertEqual(resp.body[16:17], b'W')
+        self.assertEqual(codec.unpack_board(resp.body[:16]).count_discs(), (4, 1))
+
+        data = self.app.post_json('/legal-moves', init_data,
+                                  headers={'Accept': 'application/octet-stream'}).json
+        self.assertEqual(len(data['moves']), 4)
+
+    def test_json_request_with_bytes_format_is_rejected(self):
+        init_data = self.app.get('/init').json
+        for path in ('/move', '/legal-moves'):
+            resp = self.app.post_json(path, dict(init_data, format='bytes', row=2, col=3))
+            self.assertEqual(resp.status_int, 200)
+            self.assertEqual(resp.json['status'], 'error')
+        # 形式と盤面の型が合わない場合もエラーとして返す
+        resp = self.app.post_json('/move', dict(init_data, format='packed', row=2, col=3))
+        self.assertEqual(resp.json['status'], 'error')
+
+    @unittest.skipIf(msgpack is None, 'msgpack がインストールされていない')
+    def test_move_msgpack(self):
+        init_data = self.app.get('/init').json
+        body = msgpack.packb(dict(init_data, row=2, col=3))
+        resp = self.app.post('/move', body, content_type='application/x-msgpack')
+        self.assertEqual(resp.content_type, 'application/x-msgpack')
+        data = msgpack.unpackb(resp.body, raw=False)
+        self.assertEqual(data['status'], 'move accepted')
+
+    def test_health_and_readiness(self):
+        self.assertEqual(self.app.get('/healthz').json['status'], 'ok')
+        self.assertEqual(self.app.get('/readyz').json['status'], 'ready')
+        server.set_ready(False)
+        try:
+            resp = self.app.get('/readyz', status=503)
+            self.assertEqual(resp.json['status'], 'draining')
+        finally:
+            server.set_ready(True)
+
 
 if __name__ == '__main__':
     unittest.main()
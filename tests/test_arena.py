@@ -0,0 +1,105 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import unittest
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from src.domain.game import OthelloGame
+from src.infrastructure.arena import (
+    GAUNTLET, HttpPolicy, MatchResult, Standings, elo_interval, random_openings,
+    run_tournament, schedule)
+from src.infrastructure.server import app
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class TestArena(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self._tmp.name, 'arena.json')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self, workers=1, checkpoint=None, progress=None):
+        return run_tournament(['greedy', 'random', {'type': 'engine', 'max_depth': 1, 'name': 'd1'}],
+                              openings=4, opening_plies=2, games_per_task=2, workers=workers,
+                              seed=3, checkpoint=checkpoint, progress=progress)
+
+    def test_round_robin_pairs_colors_and_reports(self):
+        reports = []
+        report = self._run(progress=reports.append)
+        # 3 組 x 4 序盤 x 先後 2 局
+        self.assertEqual(report['games'], 24)
+        self.assertEqual(report['total_games'], 24)
+        self.assertEqual([r['games'] for r in reports], [4, 8, 12, 16, 20, 24])
+        self.assertEqual(len(report['pairs']), 3)
+        for player in report['players']:
+            self.assertEqual(player['games'], 16)
+        self.assertAlmostEqual(sum(p['elo'] for p in report['players']), 0.0, places=6)
+        self.assertEqual(len(report['workers']), 1)
+
+    def test_workers_do_not_change_results_and_resume(self):
+        expected = self._run()
+        parallel = self._run(workers=2, checkpoint=self.checkpoint)
+        self.assertEqual(parallel['pairs'], expected['pairs'])
+
+        # 途中で止まった状態を作り、続きから打つ
+        with open(self.checkpoint) as f:
+            state = json.load(f)
+        for task_id in ('1', '4'):
+            del state['tasks'][task_id]
+        with open(self.checkpoint, 'w') as f:
+            json.dump(state, f)
+        reports = []
+        resumed = self._run(checkpoint=self.checkpoint, progress=reports.append)
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(resumed['pairs'], expected['pairs'])
+
+        with self.assertRaises(ValueError):
+            run_tournament(['greedy', 'random'], openings=4, checkpoint=self.checkpoint)
+
+    def test_schedule_and_openings(self):
+        self.assertEqual(schedule(3), [(0, 1), (0, 2), (1, 2)])
+        self.assertEqual(schedule(3, GAUNTLET), [(0, 1), (0, 2)])
+        openings = random_openings(10, 3, seed=1)
+        self.assertEqual(len(openings), 10)
+        self.assertEqual(len({tuple(o) for o in openings}), 10)
+        with self.assertRaises(ValueError):
+            run_tournament(['greedy', 'greedy'])
+
+    def test_elo(self):
+        elo, low, high = elo_interval(30, 20, 10)
+        self.assertAlmostEqual(elo, 120.4, places=1)
+        self.assertLess(low, elo)
+        self.assertLess(elo, high)
+        self.assertEqual(elo_interval(5, 0, 5)[0], 0.0)
+
+        standings = Standings(['a', 'b', 'c'])
+        standings.add(MatchResult(0, 0, 1, 8, 0, 2, 0.0, 0))
+        standings.add(MatchResult(1, 1, 2, 8, 0, 2, 0.0, 0))
+        a, b, c = standings.ratings()
+        self.assertGreater(a, b)
+        self.assertGreater(b, c)
+
+    def test_http_player(self):
+        server = make_server('127.0.0.1', 0, app, handler_class=_QuietHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            policy = HttpPolicy(f'http://127.0.0.1:{server.server_port}', time_ms=10)
+            game = OthelloGame()
+            pos = policy(game, random.Random(0))
+            self.assertTrue(game.board.is_valid_move(pos, game.current_turn))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
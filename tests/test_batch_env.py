@@ -0,0 +1,120 @@
+import unittest
+import numpy as np
+from src.application import codec
+from src.application.batch_env import WHITE, BatchOthelloEnv
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+
+# 白が (2,0) に打つと黒に合法手がなくなる局面 (手番は白)
+PASS_POSITION = '.........B........B.....BWBBB...W..BB.......B...................'
+
+
+def scalar_step(game: OthelloGame, pos: Position):
+    """スカラー版の 1 手: make_move の後、相手に合法手がなければクライアント同様にパスする"""
+    mover = game.current_turn
+    accepted = game.make_move(pos)
+    if accepted and not game.is_game_over() and not game.board.has_valid_move(game.current_turn):
+        game.current_turn = game.current_turn.opponent()
+    return mover, accepted
+
+
+class TestBatchOthelloEnvParity(unittest.TestCase):
+    def _assert_same(self, env, games):
+        mask = env.legal_moves_mask()
+        for i, game in enumerate(games):
+            self.assertEqual(env.to_game(i).board.black, game.board.black)
+            self.assertEqual(env.to_game(i).board.white, game.board.white)
+            self.assertEqual(bool(env.dones[i]), game.is_game_over())
+            if game.is_game_over():
+                self.assertFalse(mask[i].any())
+                continue
+            self.assertEqual(env.to_game(i).current_turn, game.current_turn)
+            expected = [m.row * game.board.size + m.col
+                        for m in game.board.get_valid_moves(game.current_turn)]
+            self.assertEqual(list(np.flatnonzero(mask[i])), expected)
+
+    def _run_parity(self, num_envs, size, seed):
+        rng = np.random.default_rng(seed)
+        env = BatchOthelloEnv(num_envs, size=size)
+        games = [OthelloGame(board=Board(size=size)) for _ in range(num_envs)]
+        self._assert_same(env, games)
+        while not env.dones.all():
+            mask = env.legal_moves_mask()
+            actions = np.array([rng.choice(np.flatnonzero(row)) if row.any() else -1 for row in mask])
+            result = env.step(actions)
+            for i, game in enumerate(games):
+                if actions[i] < 0:
+                    self.assertFalse(result.valid[i])
+                    continue
+                pos = Position(int(actions[i]) // size, int(actions[i]) % size)
+                mover, accepted = scalar_step(game, pos)
+                self.assertEqual(bool(result.valid[i]), accepted)
+                expected_reward = game.calculate_reward(mover) if game.is_game_over() else 0.0
+                self.assertEqual(float(result.rewards[i]), expected_reward)
+            self._assert_same(env, games)
+        for i, game in enumerate(games):
+            winner = game.get_winner()
+            expected = 0 if winner is None else (1 if winner == Player.BLACK else -1)
+            self.assertEqual(int(env.winners()[i]), expected)
+
+    def test_random_games_match_scalar_classes(self):
+        self._run_parity(num_envs=32, size=8, seed=0)
+
+    def test_small_board_with_passes(self):
+        # 6x6 ではパスや早期終局が頻繁に起こる
+        self._run_parity(num_envs=32, size=6, seed=1)
+
+    def test_invalid_action_leaves_state_unchanged(self):
+        env = BatchOthelloEnv(2)
+        black, white = env.black.copy(), env.white.copy()
+        result = env.step(np.array([0, 27]))  # 角は打てず、(3,3) は埋まっている
+        self.assertFalse(result.valid.any())
+        np.testing.assert_array_equal(env.black, black)
+        np.testing.assert_array_equal(env.white, white)
+        np.testing.assert_array_equal(env.turn, [0, 0])
+
+    def test_step_auto_passes(self):
+        game = OthelloGame(board=codec.board_from_string(PASS_POSITION),
+                           current_turn=Player.WHITE)
+        env = BatchOthelloEnv.from_games([game])
+        result = env.step(np.array([16]))
+        game.step(Position(2, 0))
+        self.assertTrue(result.valid[0])
+        self.assertTrue(result.passed[0])
+        self.assertFalse(result.dones[0])
+        self._assert_same(env, [game])
+
+    def test_from_games_passes_for_stuck_side(self):
+        # make_move はパスしないので、合法手のない黒の手番のまま渡される
+        game = OthelloGame(board=codec.board_from_string(PASS_POSITION),
+                           current_turn=Player.WHITE)
+        game.make_move(Position(2, 0))
+        self.assertEqual(game.current_turn, Player.BLACK)
+        env = BatchOthelloEnv.from_games([game])
+        self.assertEqual(env.turn[0], WHITE)
+        self.assertFalse(env.dones[0])
+        self.assertTrue(env.legal_moves_mask()[0].any())
+        game.pass_turn()
+        self._assert_same(env, [game])
+
+    def test_reset_subset(self):
+        env = BatchOthelloEnv(3)
+        env.step(np.array([19, 19, 19]))
+        env.reset(np.array([1]))
+        np.testing.assert_array_equal(env.turn, [1, 0, 1])
+        self.assertEqual(env.disc_counts()[1].tolist(), [2, 2])
+
+    def test_play_random_finishes_every_game(self):
+        for size in (4, 6, 8):
+            env = BatchOthelloEnv(50, size=size)
+            env.step(np.full(50, (size // 2 - 2) * size + size // 2 - 1))
+            env.play_random(np.random.default_rng(size))
+            self.assertTrue(env.dones.all())
+            for game in env.to_games():
+                self.assertTrue(game.is_game_over())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from benchmarks import corpus, suite
+
+
+def _results(**values):
+    better = {'speed': suite.HIGHER, 'time': suite.LOWER, 'nodes': suite.EQUAL}
+    return {'results': {name: {'value': value, 'unit': '', 'better': better[name]}
+                        for name, value in values.items()}}
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_corpus_phases(self):
+        phases = corpus.load()
+        self.assertEqual(set(phases), set(corpus.PHASES))
+        for name, positions in phases.items():
+            low, high = corpus.PHASES[name]
+            for board, turn in positions:
+                self.assertTrue(low <= sum(board.count_discs()) <= high)
+                self.assertTrue(board.has_valid_move(turn))
+
+    def test_compare_reports_missing_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            err = io.StringIO()
+            with contextlib.redirect_stderr(err):
+                code = suite.main(['compare', os.path.join(tmp, 'baseline.json'),
+                                   os.path.join(tmp, 'current.json')])
+        self.assertEqual(code, 2)
+        self.assertIn('benchmarks.suite run --output', err.getvalue())
+
+    def test_compare_flags_regressions(self):
+        baseline = _results(speed=100.0, time=10.0, nodes=244)
+        statuses = lambda current: {row['name']: row['status']
+                                    for row in suite.compare(baseline, current, 0.10)}
+        self.assertEqual(set(statuses(_results(speed=95.0, time=10.5, nodes=244)).values()),
+                         {'ok'})
+        self.assertEqual(statuses(_results(speed=80.0, time=12.0, nodes=245)),
+                         {'speed': 'regression', 'time': 'regression', 'nodes': 'mismatch'})
+        # 改善は悪化として扱わない
+        self.assertEqual(set(statuses(_results(speed=150.0, time=5.0, nodes=244)).values()),
+                         {'ok'})
+
+    def test_quick_run_subset(self):
+        data = suite.run_suite(only=['perft'], quick=True)
+        self.assertEqual(data['results']['perft.depth4.nodes']['value'], 244)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import random
+import unittest
+from src.domain.board import Board
+from src.domain.cell import Cell
+from src.domain import geometry as geo
+from src.domain.position import Position
+from src.domain.player import Player
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1),
+              (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def naive_flips(grid, size, row, col, turn):
+    """比較用: 2 次元リスト上で 8 方向を素朴に走査して反転対象を求める"""
+    if grid[row][col] is not None:
+        return []
+    result = []
+    for dr, dc in DIRECTIONS:
+        r, c = row + dr, col + dc
+        line = []
+        while 0 <= r < size and 0 <= c < size and grid[r][c] == turn.opponent():
+            line.append((r, c))
+            r += dr
+            c += dc
+        if line and 0 <= r < size and 0 <= c < size and grid[r][c] == turn:
+            result.extend(line)
+    return result
+
+
+class TestBitboardBoard(unittest.TestCase):
+    def _check_random_games(self, size, games, seed):
+        rng = random.Random(seed)
+        for _ in range(games):
+            board = Board(size=size)
+            turn = Player.BLACK
+            while True:
+                grid = [[cell.occupant for cell in row] for row in board.cells]
+                expected = [Position(r, c) for r in range(size) for c in range(size)
+                            if naive_flips(grid, size, r, c, turn)]
+                self.assertEqual(board.get_valid_moves(turn), expected)
+                if not expected:
+                    if not board.has_valid_move(turn.opponent()):
+                        break
+                    turn = turn.opponent()
+                    continue
+                move = rng.choice(expected)
+                flipped = naive_flips(grid, size, move.row, move.col, turn)
+                self.assertTrue(board.apply_move(move, turn))
+                for r, c in flipped + [(move.row, move.col)]:
+                    self.assertEqual(board.cells[r][c].occupant, turn)
+                turn = turn.opponent()
+            black, white = board.count_discs()
+            grid = [[cell.occupant for cell in row] for row in board.cells]
+            self.assertEqual(black, sum(row.count(Player.BLACK) for row in grid))
+            self.assertEqual(white, sum(row.count(Player.WHITE) for row in grid))
+
+    def test_matches_naive_rules_8x8(self):
+        self._check_random_games(8, games=20, seed=1)
+
+    def test_matches_naive_rules_other_sizes(self):
+        self._check_random_games(6, games=10, seed=2)
+        self._check_random_games(10, games=5, seed=3)
+
+    def test_incremental_state_matches_recomputation(self):
+        rng = random.Random(4)
+        for _ in range(10):
+            board = Board()
+            turn = Player.BLACK
+            while board.has_valid_move(turn) or board.has_valid_move(turn.opponent()):
+                if not board.has_valid_move(turn):
+                    turn = turn.opponent()
+                board.apply_move(rng.choice(board.get_valid_moves(turn)), turn)
+                turn = turn.opponent()
+                fresh = Board()
+                fresh.set_bitboards(board.black, board.white)
+                self.assertEqual(board.count_discs(), fresh.count_discs())
+                self.assertEqual(board._empty_count, fresh._empty_count)
+                self.assertEqual(board._frontier, fresh._frontier)
+                self.assertEqual(board.is_full(), fresh.is_full())
+                for player in Player:
+                    self.assertEqual(board.has_valid_move(player),
+                                     bool(fresh.get_valid_moves(player)))
+
+    def test_undo_move_restores_derived_state(self):
+        rng = random.Random(5)
+        board = Board()
+        turn = Player.BLACK
+        snapshots = []
+        records = []
+        while board.has_valid_move(turn):
+            snapshots.append((board.black, board.white, board.count_discs(),
+                              board._empty_count, board._frontier))
+            record = board.apply_move_undoable(rng.choice(board.get_valid_moves(turn)), turn)
+            self.assertEqual(board.bitboard(turn) & record.flipped, record.flipped)
+            records.append(record)
+            turn = turn.opponent()
+        for record, snapshot in zip(reversed(records), reversed(snapshots)):
+            board.undo_move(record)
+            self.assertEqual((board.black, board.white, board.count_discs(),
+                              board._empty_count, board._frontier), snapshot)
+
+    def test_cell_view_writes_through_to_bitboard(self):
+        board = Board()
+        board.cells[0][0].occupant = Player.BLACK
+        self.assertEqual(board.black & 1, 1)
+        self.assertEqual(board.get_occupant(Position(0, 0)), Player.BLACK)
+        board.cells[0][0].occupant = None
+        self.assertTrue(board.cells[0][0].is_empty())
+        self.assertEqual(board.count_discs(), (2, 2))
+
+    def test_invalid_move_leaves_board_unchanged(self):
+        board = Board()
+        black, white = board.black, board.white
+        self.assertFalse(board.apply_move(Position(0, 0), Player.BLACK))
+        self.assertEqual((board.black, board.white), (black, white))
+
+    def test_standalone_cell(self):
+        cell = Cell(Position(1, 2))
+        self.assertTrue(cell.is_empty())
+        cell.occupant = Player.WHITE
+        self.assertEqual(cell, Cell(Position(1, 2), Player.WHITE))
+
+
+class TestGeometry(unittest.TestCase):
+    def test_shared_per_size(self):
+        self.assertIs(geo.geometry(8), geo.geometry(8))
+        self.assertIsNot(geo.geometry(8), geo.geometry(6))
+
+    def test_rays_follow_directions(self):
+        for size in (6, 8, 10):
+            g = geo.geometry(size)
+            for index in range(g.squares):
+                row, col = divmod(index, size)
+                expected = []
+                for dr, dc in DIRECTIONS:
+                    ray = []
+                    r, c = row + dr, col + dc
+                    while 0 <= r < size and 0 <= c < size:
+                        ray.append(1 << (r * size + c))
+                        r += dr
+                        c += dc
+                    if len(ray) >= 2:
+                        expected.append(tuple(ray))
+                self.assertEqual(g.rays[index], tuple(expected))
+                self.assertEqual(g.positions[index], Position(row, col))
+
+    def test_square_classes_8x8(self):
+        g = geo.geometry(8)
+        self.assertEqual(g.square_classes[0], geo.CORNER)
+        self.assertEqual(g.square_classes[9], geo.X_SQUARE)
+        self.assertEqual(g.square_classes[1], geo.C_SQUARE)
+        self.assertEqual(g.square_classes[8], geo.C_SQUARE)
+        self.assertEqual(g.square_classes[3], geo.EDGE)
+        self.assertEqual(g.square_classes[27], geo.INNER)
+        self.assertEqual(g.corners, (1 << 0) | (1 << 7) | (1 << 56) | (1 << 63))
+        self.assertEqual(bin(g.edges).count('1'), 28)
+        self.assertEqual(g.neighbours[0], (1 << 1) | (1 << 8) | (1 << 9))
+
+    def test_geometry_cache_is_bounded(self):
+        self.assertEqual(geo.geometry.cache_info().maxsize, geo.GEOMETRY_CACHE_SIZE)
+
+    def test_lines_cover_board_per_axis(self):
+        g = geo.geometry(8)
+        self.assertEqual([len(lines) for lines in g.lines], [8, 8, 15, 15])
+        for lines in g.lines:
+            union = 0
+            for line in lines:
+                self.assertEqual(union & line, 0)
+                union |= line
+            self.assertEqual(union, g.full)
+        self.assertEqual(g.axis_edges[0], 0xFF | (0xFF << 56))
+        self.assertEqual(bin(g.axis_edges[2]).count('1'), 28)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import copy
+import dataclasses
+import pickle
 import unittest
 from src.domain.board import Board
 from src.domain.position import Position
@@ -84,5 +87,48 @@ class TestBoardLogic(unittest.TestCase):
         self.assertFalse(self.board.is_valid_move(pos2, Player.BLACK))
 
 
+class TestMemoryLayout(unittest.TestCase):
+    def test_positions_are_interned(self):
+        self.assertIs(Position(2, 3), Position(2, 3))
+        self.assertIs(Board().get_valid_moves(Player.BLACK)[0],
+                      Position(2, 3))
+        self.assertIs(pickle.loads(pickle.dumps(Position(2, 3))), Position(2, 3))
+        self.assertIs(copy.deepcopy(Position(2, 3)), Position(2, 3))
+        # 範囲外の座標も値としては同じように扱える
+        self.assertEqual(Position(-1, 40), Position(-1, 40))
+        self.assertEqual(hash(Position(-1, 40)), hash(Position(-1, 40)))
+        self.assertEqual(repr(Position(-1, 40)), 'Position(row=-1, col=40)')
+
+    def test_position_is_immutable(self):
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            Position(2, 3).row = 4
+        self.assertEqual(Position(2, 3).row, 2)
+
+    def test_no_instance_dict(self):
+        board = Board()
+        for obj in (Position(0, 0), board, board.cells[0][0]):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_board_equality_and_copy(self):
+        board = Board()
+        board.cells
+        board.apply_move(Position(2, 3), Player.BLACK)
+        other = Board()
+        self.assertNotEqual(board, other)
+        other.apply_move(Position(2, 3), Player.BLACK)
+        self.assertEqual(board, other)
+        self.assertEqual(repr(board),
+                         f'Board(size=8, black={board.black}, white={board.white})')
+
+        clone = copy.deepcopy(board)
+        self.assertEqual(clone, board)
+        clone.cells[0][0].occupant = Player.WHITE
+        self.assertIsNone(board.get_occupant(Position(0, 0)))
+        self.assertEqual(clone.count_discs(), (4, 2))
+        restored = pickle.loads(pickle.dumps(board))
+        self.assertEqual(restored.get_valid_moves(Player.WHITE),
+                         board.get_valid_moves(Player.WHITE))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,61 @@
+import random
+import unittest
+from src.application import codec
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+
+
+def random_board(seed: int, size: int = 8) -> Board:
+    rng = random.Random(seed)
+    game = OthelloGame(board=Board(size=size))
+    for _ in range(20):
+        moves = game.board.get_valid_moves(game.current_turn)
+        if not moves:
+            break
+        game.make_move(rng.choice(moves))
+    return game.board
+
+
+class TestCodec(unittest.TestCase):
+    def test_round_trip_all_formats(self):
+        for size in (6, 8, 10):
+            board = random_board(size, size)
+            for fmt in codec.FORMATS:
+                decoded = codec.decode_board(codec.encode_board(board, fmt), fmt, size)
+                self.assertEqual((decoded.black, decoded.white), (board.black, board.white))
+                self.assertEqual(decoded.count_discs(), board.count_discs())
+
+    def test_list_format_matches_cells(self):
+        board = random_board(1)
+        expected = [[cell.occupant.value if cell.occupant else None for cell in row]
+                    for row in board.cells]
+        self.assertEqual(codec.board_to_list(board), expected)
+
+    def test_compact_sizes(self):
+        board = Board()
+        self.assertEqual(len(codec.pack_board(board)), 16)
+        self.assertEqual(codec.board_to_string(board)[27:29], 'WB')
+
+    def test_invalid_payloads(self):
+        with self.assertRaises(codec.CodecError):
+            codec.decode_board('X' * 64, 'string')
+        with self.assertRaises(codec.CodecError):
+            codec.decode_board('.' * 63, 'string')
+        with self.assertRaises(codec.CodecError):
+            codec.decode_board(b'\x01' * 16, 'bytes')  # 同じマスに黒と白
+        with self.assertRaises(codec.CodecError):
+            codec.decode_board('not base64!', 'packed')
+        with self.assertRaises(codec.CodecError):
+            codec.encode_board(Board(), 'xml')
+
+    def test_binary_move_round_trip(self):
+        body = codec.pack_board(Board()) + b'B' + bytes([2, 3])
+        data = codec.decode_binary_move(body)
+        self.assertEqual((data['current_turn'], data['row'], data['col']), ('B', 2, 3))
+        response = {'board': codec.pack_board(Board()), 'current_turn': 'W',
+                    'status': 'move accepted', 'game_over': False}
+        self.assertEqual(codec.encode_binary_response(response)[16:], b'W\x01\x00-')
+
+
+if __name__ == '__main__':
+    unittest.main()
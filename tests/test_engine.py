@@ -0,0 +1,112 @@
+import random
+import time
+import unittest
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+from src.engine.endgame import solve_endgame
+from src.engine.search import Searcher, search
+from src.engine.transposition import EXACT, TranspositionTable, zobrist_keys
+
+
+def random_position(seed: int, empties: int) -> OthelloGame:
+    """空きマスが empties 個になるまでランダムに打ち進めた局面"""
+    rng = random.Random(seed)
+    while True:
+        game = OthelloGame()
+        while 64 - sum(game.board.count_discs()) > empties and not game.is_game_over():
+            moves = game.board.get_valid_moves(game.current_turn)
+            if moves:
+                game.make_move(rng.choice(moves))
+            else:
+                game.pass_turn()
+        if not game.is_game_over() and game.board.has_valid_move(game.current_turn):
+            return game
+
+
+def minimax(game: OthelloGame) -> int:
+    """比較用: make/unmake による素朴な全探索 (手番側から見た最終石差)"""
+    moves = game.board.get_valid_moves(game.current_turn)
+    if not moves:
+        if not game.board.has_valid_move(game.current_turn.opponent()):
+            black, white = game.board.count_discs()
+            return black - white if game.current_turn == Player.BLACK else white - black
+        game.pass_turn()
+        value = -minimax(game)
+        game.unmake_move()
+        return value
+    best = -64
+    for move in moves:
+        game.make_move(move)
+        best = max(best, -minimax(game))
+        game.unmake_move()
+    return best
+
+
+class TestEngine(unittest.TestCase):
+    def test_endgame_solver_matches_minimax(self):
+        for seed in range(4):
+            game = random_position(seed, empties=7)
+            result = solve_endgame(game)
+            self.assertEqual(result.score, minimax(game))
+            # 返した手を打つと、その値が実現できる
+            game.make_move(result.move)
+            self.assertEqual(-minimax(game), result.score)
+
+    def test_search_reaching_all_empties_is_exact(self):
+        game = random_position(10, empties=8)
+        result = search(game, time_ms=60000)
+        self.assertTrue(result.exact)
+        self.assertEqual(result.score, solve_endgame(game).score)
+
+    def test_search_takes_available_corner(self):
+        game = OthelloGame.from_state([
+            [None, 'W', 'W', 'W', 'W', 'W', 'B', None],
+            [None, None, None, 'W', 'W', None, None, None],
+            [None, None, None, 'W', 'B', None, None, None],
+            [None, None, None, 'W', 'B', None, None, None],
+            [None, None, None, 'B', 'W', None, None, None],
+            [None, None, None, None, None, None, None, None],
+            [None, None, None, None, None, None, None, None],
+            [None, None, None, None, None, None, None, None],
+        ], 'B')
+        result = search(game, time_ms=500, max_depth=3)
+        self.assertEqual(result.move, Position(0, 0))
+
+    def test_time_limit(self):
+        game = OthelloGame()
+        start = time.perf_counter()
+        result = search(game, time_ms=200)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 1.5)
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertIn(result.move, game.board.get_valid_moves(Player.BLACK))
+
+    def test_no_legal_move_returns_pass(self):
+        game = OthelloGame.from_state([['B'] * 8 for _ in range(8)], 'W')
+        self.assertIsNone(Searcher().search(game, time_ms=10).move)
+
+    def test_zobrist_incremental_update(self):
+        keys = zobrist_keys(8)
+        game = OthelloGame()
+        h = keys.hash(game.board.black, game.board.white, False)
+        record = game.board.apply_move_undoable(Position(2, 3), Player.BLACK)
+        updated = keys.after_move(h, record.index, record.flipped, False)
+        self.assertEqual(updated, keys.hash(game.board.black, game.board.white, True))
+
+    def test_transposition_table_replacement(self):
+        table = TranspositionTable(size_bits=2)
+        table.store(1, depth=5, value=10, flag=EXACT, move=3)
+        # 同じスロットに浅い結果が来ても、同じ探索中は深い方を残す
+        table.store(5, depth=2, value=-1, flag=EXACT, move=4)
+        self.assertIsNotNone(table.probe(1))
+        self.assertIsNone(table.probe(5))
+        # 新しい探索になれば古いエントリは置き換わる
+        table.new_search()
+        table.store(5, depth=2, value=-1, flag=EXACT, move=4)
+        self.assertIsNone(table.probe(1))
+        self.assertEqual(table.probe(5)[2], -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
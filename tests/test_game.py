@@ -3,6 +3,10 @@ from src.domain.position import Position
 from src.domain.player import Player
 from src.domain.board import Board
 from src.domain.game import OthelloGame
+from src.application import codec
+
+# 白が (2, 0) に打つと黒に合法手がなくなり、白が続けて打つ局面
+PASS_POSITION = '.........B........B.....BWBBB...W..BB.......B...................'
 
 
 class TestBoard(unittest.TestCase):
@@ -75,6 +79,62 @@ class TestOthelloGame(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(self.game.current_turn, current.opponent())
 
+    def test_unmake_move_restores_board_and_turn(self):
+        initial = (self.game.board.black, self.game.board.white)
+        self.assertTrue(self.game.make_move(Position(2, 3)))
+        self.assertTrue(self.game.make_move(Position(2, 2)))
+        self.game.pass_turn()
+        self.assertEqual(self.game.current_turn, Player.WHITE)
+
+        self.assertTrue(self.game.unmake_move())
+        self.assertEqual(self.game.current_turn, Player.BLACK)
+        self.assertTrue(self.game.unmake_move())
+        self.assertTrue(self.game.unmake_move())
+        self.assertEqual((self.game.board.black, self.game.board.white), initial)
+        self.assertEqual(self.game.current_turn, Player.BLACK)
+        self.assertEqual(self.game.board.count_discs(), (2, 2))
+        self.assertFalse(self.game.unmake_move())
+
+    def test_invalid_move_is_not_recorded(self):
+        self.assertFalse(self.game.make_move(Position(0, 0)))
+        self.assertFalse(self.game.unmake_move())
+
+    def test_step_returns_next_turn_and_legal_moves(self):
+        result = self.game.step(Position(2, 3))
+        self.assertEqual(result.flipped, [Position(3, 3)])
+        self.assertEqual(result.current_turn, Player.WHITE)
+        self.assertEqual(self.game.current_turn, Player.WHITE)
+        self.assertEqual(result.legal_moves, self.game.board.get_valid_moves(Player.WHITE))
+        self.assertFalse(result.passed)
+        self.assertFalse(result.game_over)
+        self.assertIsNone(self.game.step(Position(0, 0)))
+
+    def test_step_auto_passes(self):
+        game = OthelloGame(board=codec.board_from_string(PASS_POSITION),
+                           current_turn=Player.WHITE)
+        result = game.step(Position(2, 0))
+        self.assertTrue(result.passed)
+        self.assertFalse(result.game_over)
+        self.assertEqual(result.current_turn, Player.WHITE)
+        self.assertEqual(result.legal_moves, game.board.get_valid_moves(Player.WHITE))
+        self.assertFalse(game.board.has_valid_move(Player.BLACK))
+        self.assertEqual(game.move_history(), [Position(2, 0), None])
+        # パスと着手を順に取り消せる
+        self.assertTrue(game.unmake_move())
+        self.assertEqual(game.current_turn, Player.BLACK)
+        self.assertTrue(game.unmake_move())
+        self.assertEqual(codec.board_to_string(game.board), PASS_POSITION)
+
+    def test_step_detects_game_over(self):
+        board = Board()
+        board.set_bitboards(1 << 0, 1 << 1)
+        game = OthelloGame(board=board)
+        result = game.step(Position(0, 2))
+        self.assertTrue(result.game_over)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.legal_moves, [])
+        self.assertTrue(game.is_game_over())
+
     def test_from_state(self):
         # シリアライズされた盤面状態からゲームを再構築するテスト
         board_state = [
@@ -92,6 +152,15 @@ class TestOthelloGame(unittest.TestCase):
         self.assertEqual(game.board.cells[3][3].occupant, Player.WHITE)
         self.assertEqual(game.board.cells[3][4].occupant, Player.BLACK)
 
+    def test_from_state_rejects_non_square_board(self):
+        long_row = [[None] * 8 for _ in range(8)]
+        long_row[7].append('B')
+        short_row = [[None] * 8 for _ in range(8)]
+        short_row[2] = [None] * 7
+        for board_state in (long_row, short_row, [['B']], 'B' * 64, [None] * 8):
+            with self.assertRaises(ValueError):
+                OthelloGame.from_state(board_state, 'B')
+
     def test_game_over_and_reward(self):
         # ゲーム終了状態を作るために盤面を満杯にする（黒が大多数の場合）
         for row in self.game.board.cells:
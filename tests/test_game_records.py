@@ -0,0 +1,122 @@
+import gc
+import os
+import random
+import tempfile
+import unittest
+import warnings
+from src.application import codec
+from src.application.policies import random_policy
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.position import Position
+from src.infrastructure.game_records import GameRecordStore, GameRecordWriter, index_path
+from src.infrastructure.selfplay import play_game
+
+
+def random_game(seed, size=8):
+    game = OthelloGame(board=Board(size=size))
+    play_game(game, random_policy, random_policy, random.Random(seed))
+    return game
+
+
+class TestGameRecords(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'games.bin')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_and_replay(self):
+        games = [random_game(seed) for seed in range(5)]
+        with GameRecordWriter(self.path) as writer:
+            for game in games:
+                writer.append_game(game)
+        with GameRecordStore(self.path) as store:
+            self.assertEqual(len(store), 5)
+            for i, game in enumerate(games):
+                self.assertEqual(store.get_game(i), game.move_history())
+            self.assertEqual(store.get_game(-1), games[-1].move_history())
+            with self.assertRaises(IndexError):
+                store.get_game(5)
+
+            states = list(store.replay(2, packed=True))
+            self.assertEqual(len(states), len(games[2].move_history()) + 1)
+            self.assertEqual(states[0], codec.pack_board(Board()))
+            self.assertEqual(states[-1], codec.pack_board(games[2].board))
+            for state in store.replay(3):
+                final = state
+            self.assertEqual(final.board, games[3].board)
+            self.assertTrue(final.is_game_over())
+
+            sliced = list(store.iter_moves(1, 3))
+            self.assertEqual(sliced, [store.moves(1), store.moves(2)])
+
+    def test_passes_are_recorded(self):
+        with GameRecordWriter(self.path, size=4) as writer:
+            writer.append([Position(0, 1), None, Position(3, 2)])
+        with GameRecordStore(self.path) as store:
+            self.assertEqual(store.size, 4)
+            self.assertEqual(store.get_game(0), [Position(0, 1), None, Position(3, 2)])
+
+    def test_reopen_appends_and_recovers_partial_write(self):
+        with GameRecordWriter(self.path) as writer:
+            writer.append_game(random_game(1))
+        # インデックスに載る前に止まった書き込みは切り捨てられる
+        with open(self.path, 'ab') as f:
+            f.write(b'\x13\x14')
+        with open(index_path(self.path), 'ab') as f:
+            f.write(b'\x00\x01')
+        with GameRecordWriter(self.path) as writer:
+            self.assertEqual(len(writer), 1)
+            self.assertEqual(writer.append_game(random_game(2)), 1)
+        with GameRecordStore(self.path) as store:
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.get_game(1), random_game(2).move_history())
+        with self.assertRaises(ValueError):
+            GameRecordWriter(self.path, size=6)
+
+    def test_recover_drops_index_entries_past_data(self):
+        with GameRecordWriter(self.path) as writer:
+            writer.append_game(random_game(1))
+            writer.append_game(random_game(2))
+        # 2 局目のデータが途中までしか書かれずに止まった状態
+        size = os.path.getsize(self.path)
+        with open(self.path, 'r+b') as f:
+            f.truncate(size - 3)
+        with GameRecordWriter(self.path) as writer:
+            self.assertEqual(len(writer), 1)
+        self.assertLess(os.path.getsize(self.path), size - 3)
+        with GameRecordStore(self.path) as store:
+            self.assertEqual(len(store), 1)
+            self.assertEqual(store.get_game(0), random_game(1).move_history())
+
+    def test_missing_index_raises_without_leaking_data_file(self):
+        with GameRecordWriter(self.path) as writer:
+            writer.append_game(random_game(1))
+        size = os.path.getsize(self.path)
+        os.remove(index_path(self.path))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            with self.assertRaises(ValueError):
+                GameRecordWriter(self.path)
+            gc.collect()
+        self.assertFalse([w for w in caught if issubclass(w.category, ResourceWarning)])
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_illegal_record_raises(self):
+        with GameRecordWriter(self.path) as writer:
+            writer.append([Position(0, 0)])
+        with GameRecordStore(self.path) as store:
+            with self.assertRaises(ValueError):
+                list(store.replay(0))
+
+    def test_empty_store(self):
+        GameRecordWriter(self.path).close()
+        with GameRecordStore(self.path) as store:
+            self.assertEqual(len(store), 0)
+            self.assertEqual(list(store.iter_moves()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+
+from src.application.gym_env import PLANES, OthelloEnv, SubprocVectorEnv, gymnasium
+from src.domain.player import Player
+from src.domain.position import Position
+
+
+def random_action(rng, mask):
+    return int(rng.choice(np.flatnonzero(mask)))
+
+
+class TestOthelloEnv(unittest.TestCase):
+    @unittest.skipIf(gymnasium is None, 'gymnasium がインストールされていない')
+    def test_reset_seeds_np_random(self):
+        first, second = OthelloEnv(), OthelloEnv()
+        first.reset(seed=7)
+        second.reset(seed=7)
+        self.assertEqual(first.np_random.integers(1 << 30), second.np_random.integers(1 << 30))
+
+    def test_reset_observation_and_mask(self):
+        env = OthelloEnv()
+        obs, info = env.reset()
+        self.assertEqual(obs.shape, (PLANES, 8, 8))
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertEqual(obs[0, 3, 4], 1.0)   # 黒番なので自分の石は黒
+        self.assertEqual(obs[1, 3, 3], 1.0)
+        self.assertEqual(sorted(np.flatnonzero(info['action_mask'])), [19, 26, 37, 44])
+        np.testing.assert_array_equal(obs[2].reshape(-1) != 0, info['action_mask'])
+
+    def test_step_reuses_buffer_and_switches_perspective(self):
+        env = OthelloEnv()
+        obs, _ = env.reset()
+        buffer = obs
+        obs, reward, terminated, truncated, info = env.step(19)
+        self.assertIs(obs, buffer)
+        self.assertEqual((reward, terminated, truncated), (0.0, False, False))
+        self.assertEqual(info['current_turn'], 'W')
+        # 白番から見ると黒の石は相手の石
+        self.assertEqual(obs[1, 2, 3], 1.0)
+        self.assertEqual(obs[1].sum(), 4)
+        self.assertEqual(obs[0].sum(), 1)
+        with self.assertRaises(ValueError):
+            env.step(0)
+        with self.assertRaises(ValueError):
+            env.step(64)
+
+    def test_episode_reward_matches_calculate_reward(self):
+        rng = np.random.default_rng(3)
+        env = OthelloEnv()
+        _, info = env.reset()
+        terminated = False
+        while not terminated:
+            mover = Player(info['current_turn'])
+            mask = info['action_mask'].copy()
+            _, reward, terminated, _, info = env.step(random_action(rng, mask))
+        self.assertTrue(env.game.is_game_over())
+        self.assertEqual(reward, env.game.calculate_reward(mover))
+        self.assertFalse(info['action_mask'].any())
+
+    def test_mask_matches_legal_moves(self):
+        rng = np.random.default_rng(5)
+        env = OthelloEnv()
+        _, info = env.reset()
+        for _ in range(20):
+            legal = env.game.board.get_valid_moves(env.game.current_turn)
+            self.assertEqual([Position(i // 8, i % 8) for i in np.flatnonzero(info['action_mask'])],
+                             legal)
+            _, _, terminated, _, info = env.step(random_action(rng, info['action_mask']))
+            if terminated:
+                break
+
+
+class TestSubprocVectorEnv(unittest.TestCase):
+    def test_steps_in_workers_and_autoresets(self):
+        rng = np.random.default_rng(0)
+        with SubprocVectorEnv(4, workers=2) as venv:
+            obs, info = venv.reset()
+            self.assertEqual(obs.shape, (4, PLANES, 8, 8))
+            self.assertTrue((obs[:, :2].sum(axis=(1, 2, 3)) == 4).all())
+            episodes = 0
+            for _ in range(80):
+                actions = [random_action(rng, mask) for mask in info['action_mask']]
+                obs, rewards, terminated, truncated, info = venv.step(actions)
+                np.testing.assert_array_equal(obs[:, 2].reshape(4, -1) != 0, info['action_mask'])
+                self.assertTrue(info['action_mask'].any(axis=1).all())
+                self.assertFalse(truncated.any())
+                self.assertTrue((rewards[~terminated] == 0).all())
+                episodes += int(terminated.sum())
+            self.assertGreater(episodes, 0)
+
+            # 1 つでも不正な行動があれば、どの環境も進めない
+            actions = [random_action(rng, mask) for mask in info['action_mask']]
+            actions[1] = int(np.flatnonzero(~info['action_mask'][1])[0])
+            before = obs.copy()
+            with self.assertRaises(ValueError):
+                venv.step(actions)
+            with self.assertRaises(ValueError):
+                venv.step([0, 0, 0, 0])
+            np.testing.assert_array_equal(venv.observations, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from src.application import game_service, metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.enable(False)
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        metrics.enable(False)
+        metrics.count('othello_flips_total', 3)
+        metrics.stages().lap('load')
+        self.assertEqual(metrics.render(), '\n')
+
+    def test_process_move_stages_and_counters(self):
+        metrics.enable(True)
+        data = dict(game_service.get_initial_state(), row=2, col=3)
+        game_service.process_move(data)
+        text = metrics.render()
+        self.assertIn('othello_moves_applied_total 1', text)
+        self.assertIn('othello_flips_total 1', text)
+        self.assertIn('othello_moves_generated_total 3', text)
+        for stage in ('load', 'make_move', 'encode', 'game_over'):
+            self.assertIn(f'othello_stage_duration_seconds_count{{stage="{stage}"}} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.enable(True)
+        metrics.observe('latency', 0.0003, route='/move')
+        metrics.observe('latency', 0.02, route='/move')
+        lines = metrics.render().splitlines()
+        self.assertIn('# TYPE latency histogram', lines)
+        self.assertIn('latency_bucket{route="/move",le="0.0005"} 1', lines)
+        self.assertIn('latency_bucket{route="/move",le="0.025"} 2', lines)
+        self.assertIn('latency_bucket{route="/move",le="+Inf"} 2', lines)
+        self.assertIn('latency_count{route="/move"} 2', lines)
+
+    def test_profile_call(self):
+        result, profile = metrics.profile_call(sorted, [3, 1, 2])
+        self.assertEqual(result, [1, 2, 3])
+        self.assertIn('function calls', profile)
+
+    def test_nested_profile_call_runs_without_profiling(self):
+        # 計測中に別の profile_call が来ても例外にせず、計測なしで実行する
+        result, outer = metrics.profile_call(metrics.profile_call, sorted, [2, 1])
+        self.assertEqual(result, ([1, 2], None))
+        self.assertIn('function calls', outer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import random
+import tempfile
+import unittest
+from src.application.policies import random_policy
+from src.domain import symmetry
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.domain.position import Position
+from src.engine.opening_book import OpeningBook, OpeningBookBuilder
+from src.infrastructure.selfplay import play_game
+
+
+def random_moves(seed):
+    game = OthelloGame()
+    play_game(game, random_policy, random_policy, random.Random(seed))
+    return game.move_history()
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'book.bin')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_first_move_statistics(self):
+        builder = OpeningBookBuilder(max_plies=4)
+        games = [random_moves(seed) for seed in range(30)]
+        for moves in games:
+            builder.add_game(moves)
+        builder.write(self.path)
+
+        with OpeningBook(self.path) as book:
+            moves = book.lookup(Board(), Player.BLACK)
+            # 初手 4 つは対称なので 1 つにまとめられ、すべて同じ統計になる
+            self.assertEqual(sorted((m.position.row, m.position.col) for m in moves),
+                             [(2, 3), (3, 2), (4, 5), (5, 4)])
+            self.assertTrue(all(m.games == 30 for m in moves))
+            rates = [m.win_rate for m in moves]
+            self.assertEqual(rates, sorted(rates, reverse=True))
+
+            # 回転・鏡映した局面でも同じ手 (を変換したもの) が返る
+            game = OthelloGame()
+            for pos in games[0][:2]:
+                game.make_move(pos)
+            expected = book.lookup(game.board, game.current_turn)
+            self.assertTrue(expected)
+            for sym in symmetry.SYMMETRIES:
+                board = Board()
+                board.set_bitboards(symmetry.transform(game.board.black, 8, sym),
+                                    symmetry.transform(game.board.white, 8, sym))
+                got = book.lookup(board, game.current_turn)
+                mapped = sorted(
+                    (symmetry.transform_index(m.position.row * 8 + m.position.col, 8, sym),
+                     m.games) for m in expected)
+                self.assertEqual(sorted((m.position.row * 8 + m.position.col, m.games)
+                                        for m in got), mapped)
+
+            # max_plies より後の局面は載らない
+            game = OthelloGame()
+            for pos in games[0][:6]:
+                if pos is None:
+                    game.pass_turn()
+                else:
+                    game.make_move(pos)
+            self.assertEqual(book.lookup(game.board, game.current_turn), [])
+
+    def test_min_games_filter(self):
+        builder = OpeningBookBuilder(max_plies=3)
+        for seed in range(5):
+            builder.add_game(random_moves(seed))
+        self.assertLess(builder.write(self.path, min_games=5),
+                        builder.write(self.path + '2', min_games=1))
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book.lookup(Board(), Player.BLACK)), 4)
+            self.assertIsNone(book.best_move(Board(size=6), Player.BLACK))
+
+    def test_illegal_game_rejected(self):
+        builder = OpeningBookBuilder()
+        with self.assertRaises(ValueError):
+            builder.add_game([Position(0, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
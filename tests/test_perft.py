@@ -0,0 +1,103 @@
+import contextlib
+import io
+import json
+import random
+import sys
+import unittest
+from unittest import mock
+
+from src.application import codec
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+from src.engine import perft
+from src.engine.endgame import solve_endgame
+
+# 8x8 の初期局面からの既知の perft の値
+REFERENCE_NODES = {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092, 8: 390216}
+
+
+def random_position(seed: int, empties: int) -> OthelloGame:
+    rng = random.Random(seed)
+    while True:
+        game = OthelloGame()
+        while 64 - sum(game.board.count_discs()) > empties and not game.is_game_over():
+            moves = game.board.get_valid_moves(game.current_turn)
+            if moves:
+                game.make_move(rng.choice(moves))
+            else:
+                game.pass_turn()
+        if not game.is_game_over():
+            return game
+
+
+def enumerate_naive(game: OthelloGame, mover: Player, counts: list) -> None:
+    """比較用: make/unmake で終局まで全手順をたどり [葉, パス, 勝ち, 引き分け, 負け] に足す"""
+    moves = game.board.get_valid_moves(game.current_turn)
+    if not moves:
+        if not game.board.has_valid_move(game.current_turn.opponent()):
+            counts[0] += 1
+            winner = game.get_winner()
+            counts[3 if winner is None else 2 if winner == mover else 4] += 1
+            return
+        counts[1] += 1
+        game.pass_turn()
+        enumerate_naive(game, mover, counts)
+        game.unmake_move()
+        return
+    for move in moves:
+        game.make_move(move)
+        enumerate_naive(game, mover, counts)
+        game.unmake_move()
+
+
+class TestPerft(unittest.TestCase):
+    def test_reference_values(self):
+        for depth, nodes in REFERENCE_NODES.items():
+            result = perft.perft(OthelloGame(), depth, workers=1)
+            self.assertEqual(result.nodes, nodes, depth)
+            self.assertEqual((result.passes, result.terminals), (0, 0))
+        self.assertEqual(perft.perft(OthelloGame(), 0, workers=1).nodes, 1)
+
+    def test_process_pool_matches_single_process(self):
+        single = perft.perft(OthelloGame(), 7, workers=1)
+        pooled = perft.perft(OthelloGame(), 7, workers=2)
+        self.assertEqual(pooled.nodes, REFERENCE_NODES[7])
+        self.assertGreater(pooled.tasks, 1)
+        self.assertEqual(pooled[:6], single[:6])
+
+    def test_endgame_enumeration_matches_naive(self):
+        for seed in range(3):
+            game = random_position(seed, empties=9)
+            expected = [0, 0, 0, 0, 0]
+            enumerate_naive(game, game.current_turn, expected)
+            for workers in (1, 2):
+                result = perft.enumerate_endgame(game, workers=workers)
+                self.assertIsNone(result.depth)
+                self.assertEqual(list(result[1:6]), expected)
+                self.assertEqual(result.terminals, result.nodes)
+            # 完全読みで勝ちなら勝ちに終わる手順がある
+            if solve_endgame(game).score > 0:
+                self.assertGreater(result.wins, 0)
+
+    def test_transpositions_are_reused(self):
+        limited = perft.perft(OthelloGame(), 8, workers=1, max_entries=0)
+        cached = perft.perft(OthelloGame(), 8, workers=1)
+        self.assertEqual(limited.transpositions, 0)
+        self.assertGreater(cached.transpositions, 0)
+        self.assertEqual(cached.nodes, limited.nodes)
+
+    def test_cli_json(self):
+        game = random_position(4, empties=8)
+        board = json.dumps(codec.board_to_list(game.board))
+        argv = ['perft', '--board', board, '--turn', game.current_turn.value,
+                '--endgame', '--workers', '1', '--json']
+        out = io.StringIO()
+        with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(out):
+            perft.main()
+        data = json.loads(out.getvalue())
+        self.assertEqual(data['nodes'], perft.enumerate_endgame(game, workers=1).nodes)
+        self.assertEqual(data['terminals'], data['nodes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import multiprocessing
+import random
+import unittest
+from src.application.position_cache import PositionCache, SharedPositionTable
+from src.domain import symmetry
+from src.domain.board import Board
+from src.domain.player import Player
+from src.engine.evaluation import evaluate
+
+
+def random_board(size, plies, seed):
+    rng = random.Random(seed)
+    board = Board(size=size)
+    turn = Player.BLACK
+    for _ in range(plies):
+        moves = board.get_valid_moves(turn)
+        if not moves:
+            break
+        board.apply_move(rng.choice(moves), turn)
+        turn = turn.opponent()
+    return board, turn
+
+
+def transformed(board, sym):
+    result = Board(size=board.size)
+    result.set_bitboards(symmetry.transform(board.black, board.size, sym),
+                         symmetry.transform(board.white, board.size, sym))
+    return result
+
+
+def disc_evaluator(board, turn):
+    black, white = board.count_discs()
+    return black - white if turn == Player.BLACK else white - black
+
+
+def _write_from_child(table, key, value):
+    table.put(key, value)
+    table.close()
+
+
+class TestSymmetry(unittest.TestCase):
+    def test_transform_matches_index_mapping(self):
+        for size in (6, 8, 12):
+            board, _ = random_board(size, 12, seed=size)
+            for sym in symmetry.SYMMETRIES:
+                expected = 0
+                for index in range(size * size):
+                    if board.black >> index & 1:
+                        expected |= 1 << symmetry.transform_index(index, size, sym)
+                self.assertEqual(symmetry.transform(board.black, size, sym), expected)
+                back = symmetry.transform(symmetry.transform(board.black, size, sym),
+                                          size, symmetry.inverse(sym))
+                self.assertEqual(back, board.black)
+
+    def test_tables_grow_linearly_with_squares(self):
+        # 8 マスずつの表なので 16x16 でも 1 変換あたり 32 個 x 256 要素に収まる
+        tables = symmetry._tables(16)
+        self.assertEqual([len(chunk) for chunk in tables.chunks[1]], [256] * 32)
+
+    def test_symmetric_positions_share_canonical_key(self):
+        board, turn = random_board(8, 15, seed=3)
+        key, _ = symmetry.canonical_key(board, turn)
+        for sym in symmetry.SYMMETRIES:
+            self.assertEqual(symmetry.canonical_key(transformed(board, sym), turn)[0], key)
+        self.assertNotEqual(symmetry.canonical_key(board, turn.opponent())[0], key)
+
+
+class TestPositionCache(unittest.TestCase):
+    def test_valid_moves_match_board_in_every_orientation(self):
+        cache = PositionCache()
+        for seed in range(10):
+            board, turn = random_board(8, 20, seed)
+            for sym in symmetry.SYMMETRIES:
+                variant = transformed(board, sym)
+                self.assertEqual(cache.valid_moves(variant, turn), variant.get_valid_moves(turn))
+        # 同じ局面の 8 通りの向きのうち 2 回目以降はヒットする
+        self.assertGreaterEqual(cache.hits, 10 * 7)
+
+    def test_legal_moves_with_flips_in_every_orientation(self):
+        cache = PositionCache()
+        for seed in range(5):
+            board, turn = random_board(8, 16, seed)
+            for sym in symmetry.SYMMETRIES:
+                variant = transformed(board, sym)
+                expected = []
+                for pos in variant.get_valid_moves(turn):
+                    flipped = 0
+                    for flip in variant.get_flips(pos, turn):
+                        flipped |= 1 << (flip.row * 8 + flip.col)
+                    expected.append((pos.row * 8 + pos.col, flipped))
+                self.assertEqual(list(cache.legal_moves_with_flips(variant, turn)),
+                                 sorted(expected))
+        self.assertGreaterEqual(cache.hits, 5 * 7)
+
+    def test_game_over_and_evaluate(self):
+        cache = PositionCache()
+        board, turn = random_board(6, 100, seed=4)
+        self.assertTrue(cache.is_game_over(board))
+        self.assertFalse(cache.is_game_over(Board()))
+
+        def score(b, t):
+            own, opp = b.bitboard(t), b.bitboard(t.opponent())
+            return evaluate(own, opp, b.size)
+
+        board, turn = random_board(8, 10, seed=5)
+        value = cache.evaluate(score, board, turn)
+        self.assertEqual(value, score(board, turn))
+        misses = cache.misses
+        self.assertEqual(cache.evaluate(score, transformed(board, 3), turn), value)
+        self.assertEqual(cache.misses, misses)
+
+    def test_lru_bound_and_stats(self):
+        cache = PositionCache(max_entries=3)
+        for seed in range(6):
+            board, turn = random_board(8, 8, seed)
+            cache.valid_moves(board, turn)
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 3)
+        self.assertEqual(stats['hits'] + stats['misses'], 6)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_shared_table_across_processes(self):
+        with SharedPositionTable(size_bits=8) as table:
+            self.assertIsNone(table.get(12345))
+            process = multiprocessing.Process(
+                target=_write_from_child, args=(table, 12345, -42))
+            process.start()
+            process.join()
+            self.assertEqual(table.get(12345), -42)
+            # 同じスロットに入る別のキーは検証で弾かれる
+            self.assertIsNone(table.get(12345 + 256))
+
+            cache = PositionCache(shared=table)
+            board, turn = random_board(8, 6, seed=6)
+            value = cache.evaluate(disc_evaluator, board, turn)
+            other = PositionCache(shared=table)
+            self.assertEqual(other.evaluate(disc_evaluator, transformed(board, 5), turn), value)
+            self.assertEqual(table.hits, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
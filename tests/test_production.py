@@ -0,0 +1,80 @@
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'pre-fork には fork が必要')
+class TestProductionServer(unittest.TestCase):
+    def setUp(self):
+        self.port = free_port()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'src.infrastructure.production', '--port', str(self.port),
+             '--workers', '2', '--threads', '2', '--max-request-body-size', '2048',
+             '--no-sessions', '--drain-seconds', '1'],
+            cwd=ROOT, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 15
+        while time.time() < deadline:
+            try:
+                if self._request('GET', '/healthz')[0] == 200:
+                    return
+            except OSError:
+                time.sleep(0.1)
+        self.fail('サーバーが起動しませんでした')
+
+    def tearDown(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def _request(self, method, path, body=None, conn=None):
+        conn = conn or http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def test_routes_keepalive_and_graceful_shutdown(self):
+        self.assertEqual(self._request('GET', '/readyz')[0], 200)
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+        _, init = self._request('GET', '/init', conn=conn)
+        body = json.dumps(dict(json.loads(init), row=2, col=3))
+        # 同じ接続で続けて送れる (keep-alive)
+        for _ in range(3):
+            status, data = self._request('POST', '/move', body=body, conn=conn)
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(data)['status'], 'move accepted')
+
+        # 上限を超えるボディは拒否される
+        status, _ = self._request('POST', '/move', body='x' * 4096)
+        self.assertEqual(status, 413)
+
+        # セッションはワーカーごとなので、複数ワーカーでは /games を使えない
+        status, data = self._request('POST', '/games', body='{}')
+        self.assertEqual(status, 404)
+        self.assertEqual(json.loads(data)['status'], 'error')
+
+        # 終了シグナルのあとも drain のあいだは処理を続け、/readyz は 503 を返す
+        self.process.send_signal(signal.SIGTERM)
+        time.sleep(0.3)
+        self.assertEqual(self._request('GET', '/readyz')[0], 503)
+        self.assertEqual(self._request('GET', '/healthz')[0], 200)
+        self.assertIsNone(self.process.poll())
+        self.assertEqual(self.process.wait(timeout=20), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
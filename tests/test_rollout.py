@@ -0,0 +1,77 @@
+import random
+import unittest
+from src.application import rollout as rollout_module
+from src.application.rollout import rollout
+from src.domain.board import Board
+from src.domain.game import OthelloGame
+from src.domain.player import Player
+
+
+def play_until(game, empties, seed):
+    """残り empties マスになるまでランダムに打ち進める"""
+    rng = random.Random(seed)
+    squares = game.board.size * game.board.size
+    while squares - sum(game.board.count_discs()) > empties and not game.is_game_over():
+        moves = game.board.get_valid_moves(game.current_turn)
+        if not moves:
+            game.pass_turn()
+            continue
+        game.make_move(rng.choice(moves))
+    return game
+
+
+class TestRollout(unittest.TestCase):
+    def test_counts_and_determinism(self):
+        game = OthelloGame()
+        result = rollout(game, 300, seed=1)
+        self.assertEqual(result.playouts, 300)
+        self.assertEqual(result.wins + result.draws + result.losses, 300)
+        self.assertEqual(rollout(game, 300, seed=1), result)
+        self.assertNotEqual(rollout(game, 300, seed=2), result)
+        # game 自体は変更しない
+        self.assertEqual(game.board, Board())
+        self.assertTrue(0.0 <= result.win_rate <= 1.0)
+
+    def test_chunks_are_independent_of_workers(self):
+        original = rollout_module.CHUNK
+        rollout_module.CHUNK = 64
+        try:
+            game = play_until(OthelloGame(), 20, seed=3)
+            self.assertEqual(rollout(game, 200, seed=5, workers=1),
+                             rollout(game, 200, seed=5, workers=2))
+        finally:
+            rollout_module.CHUNK = original
+
+    def test_single_empty_square_is_deterministic(self):
+        for seed in range(10):
+            game = play_until(OthelloGame(), 1, seed)
+            if game.is_game_over():
+                continue
+            mover = game.current_turn
+            final = OthelloGame(board=Board(), current_turn=mover)
+            final.board.set_bitboards(game.board.black, game.board.white)
+            if not final.board.has_valid_move(mover):
+                final.pass_turn()
+            final.make_move(final.board.get_valid_moves(final.current_turn)[0])
+            black, white = final.board.count_discs()
+            diff = black - white if mover == Player.BLACK else white - black
+            result = rollout(game, 20, seed=seed)
+            self.assertEqual(result.mean_disc_diff, diff)
+            self.assertEqual(result.wins, 20 if diff > 0 else 0)
+
+    def test_large_board_uses_scalar_loop(self):
+        game = OthelloGame(board=Board(size=10))
+        result = rollout(game, 5, seed=0)
+        self.assertEqual(result.wins + result.draws + result.losses, 5)
+        self.assertEqual(rollout(game, 5, seed=0), result)
+
+    def test_finished_game(self):
+        game = play_until(OthelloGame(board=Board(size=4)), 0, seed=0)
+        self.assertTrue(game.is_game_over())
+        black, white = game.board.count_discs()
+        diff = black - white if game.current_turn == Player.BLACK else white - black
+        self.assertEqual(rollout(game, 10).mean_disc_diff, diff)
+
+
+if __name__ == '__main__':
+    unittest.main()
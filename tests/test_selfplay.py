@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from src.domain.board import Board
+from src.domain.position import Position
+from src.infrastructure.selfplay import PASS_MOVE, read_shard, run_selfplay, shard_path
+
+
+class TestSelfPlay(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self, out):
+        return run_selfplay(out, num_games=6, games_per_shard=2, workers=2, seed=7,
+                            black_policy='greedy', white_policy='random')
+
+    def test_records_are_legal_positions(self):
+        index = self._run(self.out)
+        self.assertEqual(sorted(index['shards']), ['0', '1', '2'])
+        records = list(read_shard(shard_path(self.out, 0)))
+        self.assertEqual(len(records), index['shards']['0']['positions'])
+        self.assertEqual(sum(1 for r in records if r.black == Board().black
+                             and r.white == Board().white), 2)
+        for record in records:
+            board = Board()
+            board.set_bitboards(record.black, record.white)
+            if record.move == PASS_MOVE:
+                self.assertFalse(board.has_valid_move(record.turn))
+            else:
+                pos = Position(record.move // 8, record.move % 8)
+                self.assertTrue(board.is_valid_move(pos, record.turn))
+            self.assertIn(record.outcome, (-1, 0, 1))
+
+    def test_deterministic_and_resumable(self):
+        self._run(self.out)
+        with open(shard_path(self.out, 1), 'rb') as f:
+            expected = f.read()
+
+        # シャードを失っても、再実行で同じ内容が作り直される
+        os.remove(shard_path(self.out, 1))
+        self._run(self.out)
+        with open(shard_path(self.out, 1), 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
+        with tempfile.TemporaryDirectory() as other:
+            self._run(other)
+            with open(shard_path(other, 1), 'rb') as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_config_mismatch_is_rejected(self):
+        self._run(self.out)
+        with self.assertRaises(ValueError):
+            run_selfplay(self.out, num_games=6, games_per_shard=3, workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import unittest
+from src.application.session_store import GameSessionStore
+from src.domain.game import OthelloGame
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGameSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = GameSessionStore(max_sessions=2, ttl_seconds=10, clock=self.clock)
+
+    def test_create_and_get(self):
+        game = OthelloGame()
+        game_id = self.store.create(game)
+        self.assertIs(self.store.get(game_id), game)
+        self.assertIsNone(self.store.get('missing'))
+
+    def test_lru_eviction(self):
+        first = self.store.create(OthelloGame())
+        second = self.store.create(OthelloGame())
+        # first に触れておくと、次に追い出されるのは second
+        self.store.get(first)
+        third = self.store.create(OthelloGame())
+        self.assertEqual(len(self.store), 2)
+        self.assertIsNotNone(self.store.get(first))
+        self.assertIsNone(self.store.get(second))
+        self.assertIsNotNone(self.store.get(third))
+
+    def test_ttl_expiry(self):
+        game_id = self.store.create(OthelloGame())
+        self.clock.now = 5
+        self.assertIsNotNone(self.store.get(game_id))
+        # アクセスで期限が延長される
+        self.clock.now = 14
+        self.assertIsNotNone(self.store.get(game_id))
+        self.clock.now = 25
+        self.assertIsNone(self.store.get(game_id))
+
+    def test_expired_sessions_are_evicted_on_create(self):
+        self.store.create(OthelloGame())
+        self.clock.now = 20
+        self.store.create(OthelloGame())
+        self.assertEqual(len(self.store), 1)
+
+    def test_delete(self):
+        game_id = self.store.create(OthelloGame())
+        self.assertTrue(self.store.delete(game_id))
+        self.assertFalse(self.store.delete(game_id))
+
+    def test_locked_serializes_access_to_one_game(self):
+        game = OthelloGame()
+        game_id = self.store.create(game)
+        other_id = self.store.create(OthelloGame())
+        entered = threading.Event()
+
+        def worker():
+            with self.store.locked(game_id):
+                entered.set()
+
+        with self.store.locked(game_id) as locked_game:
+            self.assertIs(locked_game, game)
+            thread = threading.Thread(target=worker)
+            thread.start()
+            # 同じゲームは待たされるが、別のゲームは取り出せる
+            self.assertFalse(entered.wait(0.1))
+            with self.store.locked(other_id) as other:
+                self.assertIsNotNone(other)
+        thread.join(5)
+        self.assertTrue(entered.is_set())
+        with self.store.locked('missing') as missing:
+            self.assertIsNone(missing)
+
+
+if __name__ == '__main__':
+    unittest.main()